@@ -0,0 +1,111 @@
+"""
+Article persistence throughput: per-row flush vs batched inserts.
+
+Writes ``--articles`` synthetic scraped articles (with their generalised
+description and word count rows) and reports articles/sec for:
+
+- flush:      the old loop, ``add`` + ``flush`` three times per article
+- returning:  ``insert_articles`` with multi-row INSERT ... RETURNING
+- copy:       ``insert_articles`` with COPY (Postgres/asyncpg only)
+
+Every run happens in a transaction that is rolled back, so the database is
+left as it was. Run from the repository root against ``DATABASE_URI``:
+
+    python -m benchmarks.bench_bulk_insert --articles 10000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+
+from faker.providers.lorem.en_US import Provider as LoremProvider
+
+from src.database.articles import insert_articles
+from src.database.connection import (async_engine, async_session,
+                                     prepare_database)
+from src.database.schema import (GeneralisedDescription, GeneralisedWordCount,
+                                 WebScraper)
+
+
+def synthetic_articles(count, rng):
+    vocabulary = list(LoremProvider.word_list)
+    for i in range(count):
+        words = rng.choices(vocabulary, k=rng.randint(15, 40))
+        generalised = [word for word in words if len(word) > 3]
+        yield {
+            "title": " ".join(rng.choices(vocabulary, k=6)).capitalize(),
+            "description": " ".join(words),
+            "image_source": f"bench://{i}.png",
+            "url": f"bench://{i}",
+            "generalised_description": " ".join(generalised),
+            "word_count": dict(Counter(generalised)),
+        }
+
+
+async def per_row_flush(session, articles):
+    for data in articles:
+        new_entry = WebScraper(
+            description=data["description"],
+            image=data["image_source"],
+            titles=data["title"],
+            url=data["url"],
+        )
+        session.add(new_entry)
+        await session.flush()
+        generalised_entry = GeneralisedDescription(
+            description=data["generalised_description"], web_scraper_id=new_entry.id
+        )
+        session.add(generalised_entry)
+        await session.flush()
+        session.add(
+            GeneralisedWordCount(
+                word_count_desc=json.dumps(data["word_count"]),
+                generalised_description_id=generalised_entry.id,
+            )
+        )
+        await session.flush()
+
+
+async def timed(write, articles):
+    async with async_session() as session:
+        start = time.perf_counter()
+        await write(session, articles)
+        elapsed = time.perf_counter() - start
+        await session.rollback()
+    return elapsed
+
+
+async def main(count, batch_size, seed):
+    await prepare_database()
+    articles = list(synthetic_articles(count, random.Random(seed)))
+    methods = {
+        "flush": per_row_flush,
+        "returning": lambda session, rows: insert_articles(
+            session, rows, batch_size, use_copy=False
+        ),
+    }
+    if async_engine.dialect.driver == "asyncpg":
+        methods["copy"] = lambda session, rows: insert_articles(
+            session, rows, batch_size, use_copy=True
+        )
+
+    print(f"{count} articles, batch size {batch_size}, {async_engine.dialect.name}")
+    print(f"{'method':<10} {'seconds':>9} {'articles/s':>11} {'rows/s':>9}")
+    baseline = None
+    for name, write in methods.items():
+        elapsed = await timed(write, articles)
+        baseline = baseline or elapsed
+        print(f"{name:<10} {elapsed:>9.2f} {count / elapsed:>11.0f} "
+              f"{3 * count / elapsed:>9.0f}  x{baseline / elapsed:.1f}")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--articles", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(args.articles, args.batch_size, args.seed))
@@ -0,0 +1,136 @@
+"""
+Concurrency benchmark for the async database layer.
+
+Drives ``GET /api/users/by-detail`` in-process at 1, 16 and 128 concurrent
+clients and reports requests/sec for:
+
+- before: a replica of the old handler calling the blocking ``Session()``
+- after:  the real ``main.app`` route running on ``AsyncSession``
+
+``--db-latency-ms`` adds a simulated network round trip to every statement
+(``time.sleep`` on the sync engine, a non-blocking sleep on the async one),
+approximating a database on another host rather than a local socket.
+
+Run from the repository root against the database in ``DATABASE_URI``:
+
+    python -m benchmarks.bench_concurrency --requests 2000 --db-latency-ms 2
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI, HTTPException, Query, status
+from sqlalchemy import event
+from sqlalchemy.util import await_only
+from starlette.responses import JSONResponse
+
+from main import app
+from src.database.connection import (Session, async_engine, create_schema,
+                                     engine)
+from src.database.models import UserResponse
+from src.database.schema import User
+
+CONCURRENCY_LEVELS = (1, 16, 128)
+BENCH_NAME = "bench-user-0"
+
+before_app = FastAPI()
+
+
+@before_app.get("/api/users/by-detail")
+async def get_user_by_name_blocking(
+    name: str = Query(None), phone_number: str = Query(None)
+) -> JSONResponse:
+    # Body of the handler before the AsyncSession port, kept for comparison
+    session = Session()
+    query = session.query(User)
+    if name:
+        query = query.filter(User.name == name)
+    if phone_number:
+        query = query.filter(User.phone_number == phone_number)
+    users = query.all()
+    session.close()
+
+    if not users:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Users not found"
+        )
+    user_list = [
+        {"id": user.id, "name": user.name, "phone_number": user.phone_number}
+        for user in users
+    ]
+    response = UserResponse(
+        success=True,
+        message="Users found",
+        data=user_list,
+        status_code=status.HTTP_200_OK,
+    )
+    return JSONResponse(content=response.dict(), status_code=status.HTTP_200_OK)
+
+
+def seed_users(count):
+    with engine.begin() as connection:
+        create_schema(connection)
+    session = Session()
+    existing = session.query(User).filter(User.name.like("bench-user-%")).count()
+    session.add_all(
+        User(
+            name=f"bench-user-{i}",
+            email=f"bench-user-{i}@example.com",
+            phone_number=f"+1000{i:08d}",
+            password="not-a-real-hash",
+        )
+        for i in range(existing, count)
+    )
+    session.commit()
+    session.close()
+
+
+def add_db_latency(seconds):
+    @event.listens_for(engine, "before_cursor_execute")
+    def blocking_round_trip(*args):
+        time.sleep(seconds)
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def async_round_trip(*args):
+        await_only(asyncio.sleep(seconds))
+
+
+async def run_level(target, concurrency, total):
+    transport = httpx.ASGITransport(app=target)
+    remaining = iter(range(total))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker():
+            for _ in remaining:
+                response = await client.get(
+                    "/api/users/by-detail", params={"name": BENCH_NAME}
+                )
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return total / elapsed
+
+
+async def main(total, seed, db_latency_ms):
+    seed_users(seed)
+    if db_latency_ms:
+        add_db_latency(db_latency_ms / 1000)
+    print(f"{'clients':>8} {'before rps':>12} {'after rps':>12} {'speedup':>8}")
+    for concurrency in CONCURRENCY_LEVELS:
+        before = await run_level(before_app, concurrency, total)
+        after = await run_level(app, concurrency, total)
+        print(f"{concurrency:>8} {before:>12.1f} {after:>12.1f} {after / before:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=10000)
+    parser.add_argument("--db-latency-ms", type=float, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.seed, args.db_latency_ms))
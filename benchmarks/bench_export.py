@@ -0,0 +1,100 @@
+"""
+Peak memory and throughput of exporting the users table.
+
+Seeds ``--rows`` users, then for each variant reports rows/s and the peak
+Python heap (tracemalloc) while producing the whole file:
+
+- before:   what clients did before the export endpoints: load every user
+            through the ORM and serialise one JSON document
+- csv / xlsx / parquet:  the streamed exports, chunks discarded as sent
+
+Run it at two sizes to see that the streamed exports stay flat. Run from
+the repository root against the database in ``DATABASE_URI``:
+
+    python -m benchmarks.bench_export --rows 200000
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from sqlalchemy import delete, insert, select
+
+from src.common.export import EXPORTS, export_chunks
+from src.database.connection import async_session, prepare_database
+from src.database.schema import User
+
+NAME = "bench-export"
+QUERY = select(User.id, User.name, User.email, User.phone_number).order_by(User.id)
+
+
+async def seed(rows):
+    await prepare_database()
+    async with async_session() as session:
+        await session.execute(delete(User).where(User.name == NAME))
+        for start in range(0, rows, 10000):
+            await session.execute(
+                insert(User),
+                [
+                    {
+                        "name": NAME,
+                        "email": f"bench-export-{n}@example.com",
+                        "phone_number": f"+1777{n:09d}",
+                        "password": "-",
+                    }
+                    for n in range(start, min(start + 10000, rows))
+                ],
+            )
+        await session.commit()
+
+
+async def before():
+    async with async_session() as session:
+        users = (await session.execute(select(User))).scalars().all()
+        body = json.dumps(
+            [
+                {"id": u.id, "name": u.name, "phone_number": u.phone_number}
+                for u in users
+            ]
+        ).encode()
+    return len(body)
+
+
+async def streamed(format):
+    size = 0
+    async for chunk in export_chunks(QUERY, EXPORTS[format](QUERY.selected_columns)):
+        size += len(chunk)
+    return size
+
+
+async def main(rows):
+    await seed(rows)
+    print(f"{rows} seeded users (plus any already stored)")
+    print(f"{'variant':<8} {'rows/s':>10} {'peak heap MB':>13} {'file MB':>8}")
+    try:
+        for name, run in (
+            ("before", before),
+            ("csv", lambda: streamed("csv")),
+            ("xlsx", lambda: streamed("xlsx")),
+            ("parquet", lambda: streamed("parquet")),
+        ):
+            tracemalloc.start()
+            start = time.perf_counter()
+            size = await run()
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{name:<8} {rows / elapsed:>10.0f} {peak / 2**20:>13.1f} "
+                  f"{size / 2**20:>8.1f}")
+    finally:
+        async with async_session() as session:
+            await session.execute(delete(User).where(User.name == NAME))
+            await session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows))
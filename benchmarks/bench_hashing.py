@@ -0,0 +1,129 @@
+"""
+``GET /api/users/get-me`` latency while a burst of sign-ins is running.
+
+A probe calls get-me back to back while ``--signins`` sign-ins are in
+flight (``--burst`` at a time) and reports its p50/p95/p99/max for:
+
+- idle:      no sign-ins running
+- before:    a replica of the old sign-in handler, bcrypt on the event loop
+- after:     the real ``main.app`` route, bcrypt on the hashing executor
+
+Run from the repository root against the database in ``DATABASE_URI``
+(``BCRYPT_ROUNDS`` sets the cost of the seeded password):
+
+    python -m benchmarks.bench_hashing --signins 40 --burst 8
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request, status
+from sqlalchemy import select
+from starlette.responses import JSONResponse
+
+from main import app
+from src.auth.hashing import Hash, hash_password
+from src.auth.token_access import create_access_token
+from src.database.connection import async_session, prepare_database
+from src.database.schema import User
+from src.endpoints.user.user_endpoints import user_router
+
+EMAIL = "bench-signin@example.com"
+PASSWORD = "bench-password"
+
+before_app = FastAPI()
+
+
+@before_app.post("/api/users/signin")
+async def signin_user_blocking(request: Request) -> JSONResponse:
+    # The sign-in handler before hashing moved off the loop, kept for comparison
+    data = await request.json()
+    async with async_session() as session:
+        user = await session.scalar(select(User).where(User.email == data["email"]))
+    if user is None or not Hash.verify(user.password, data["password"]):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    return JSONResponse({"jwt": create_access_token(user.id)})
+
+
+before_app.include_router(user_router, prefix="/api")
+
+
+async def seed_user():
+    await prepare_database()
+    async with async_session() as session:
+        user = await session.scalar(select(User).where(User.email == EMAIL))
+        if user is None:
+            user = User(name="bench-signin", email=EMAIL, phone_number="+19990000")
+            session.add(user)
+        user.password = await hash_password(PASSWORD)
+        await session.commit()
+        return user.id
+
+
+def percentiles(samples):
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98], "max": max(samples)}
+
+
+async def run(target, token, signins, burst):
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        remaining = iter(range(signins))
+        done = asyncio.Event()
+
+        async def signer():
+            for _ in remaining:
+                response = await client.post(
+                    "/api/users/signin", json={"email": EMAIL, "password": PASSWORD}
+                )
+                response.raise_for_status()
+
+        async def burst_of_signins():
+            if signins:
+                await asyncio.gather(*(signer() for _ in range(burst)))
+            done.set()
+
+        async def probe():
+            latencies = []
+            while not done.is_set() or len(latencies) < 50:
+                start = time.perf_counter()
+                response = await client.get(
+                    "/api/users/get-me", headers={"token": f"Bearer {token}"}
+                )
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+            return latencies
+
+        start = time.perf_counter()
+        _, latencies = await asyncio.gather(burst_of_signins(), probe())
+        return percentiles(latencies), signins / (time.perf_counter() - start)
+
+
+async def main(signins, burst):
+    user_id = await seed_user()
+    token = create_access_token(user_id)
+
+    print(f"{signins} sign-ins, {burst} concurrent; get-me latency in ms")
+    print(f"{'variant':<8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} "
+          f"{'signin/s':>9}")
+    for name, target, count in (
+        ("idle", app, 0),
+        ("before", before_app, signins),
+        ("after", app, signins),
+    ):
+        stats, throughput = await run(target, token, count, burst)
+        print(f"{name:<8} {stats['p50']:>8.1f} {stats['p95']:>8.1f} "
+              f"{stats['p99']:>8.1f} {stats['max']:>8.1f} "
+              f"{throughput if count else 0:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--signins", type=int, default=40)
+    parser.add_argument("--burst", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.signins, args.burst))
@@ -0,0 +1,160 @@
+"""
+Per-request and per-query cost of the metrics instrumentation.
+
+Calls a one-route Starlette app directly (no server, no client) and
+times one request through:
+
+- bare:        the app alone
+- metrics:     wrapped in ``MetricsMiddleware``
+- header:      wrapped in a ``BaseHTTPMiddleware`` that sets
+               ``X-Process-Time``, as ``main.py`` once did, for scale
+
+then runs ``SELECT 1`` on an in-memory SQLite engine with no listeners,
+with listeners that do nothing (SQLAlchemy's own cost of dispatching
+cursor events) and with the timing listeners. The differences are the
+overhead per request and per query. Run from the repository root:
+
+    python -m benchmarks.bench_metrics
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import create_engine, event, text
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+from starlette.routing import Route
+
+from src.common.metrics import RequestQueries, instrument_engine, request_queries
+from src.middlewares.MetricsMiddleware import MetricsMiddleware
+
+
+async def item(request):
+    return Response(b"{}", media_type="application/json")
+
+
+async def process_time_header(request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    response.headers["X-Process-Time"] = str(time.perf_counter() - start)
+    return response
+
+
+def scope(app):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/items/7",
+        "raw_path": b"/items/7",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "server": ("bench", 80),
+        "app": app,
+    }
+
+
+def receiver():
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # A client that stays connected; streamed responses cancel this wait
+        await asyncio.Event().wait()
+
+    return receive
+
+
+async def send(message):
+    pass
+
+
+def process_time_middleware(app):
+    return BaseHTTPMiddleware(app, dispatch=process_time_header)
+
+
+VARIANTS = {
+    "bare": lambda app: app,
+    "metrics": MetricsMiddleware,
+    "header": process_time_middleware,
+}
+
+
+async def per_request_us(wrap, budget):
+    """Time requests to a one-route app wrapped by `wrap(app)`."""
+    starlette = Starlette(routes=[Route("/items/{item_id}", item)])
+    asgi = wrap(starlette)
+    for _ in range(1000):
+        await asgi(scope(starlette), receiver(), send)
+    calls, start = 0, time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < budget:
+        await asgi(scope(starlette), receiver(), send)
+        calls += 1
+    return elapsed / calls * 1e6
+
+
+def ignore(*args):
+    pass
+
+
+def per_query_us(listeners, budget):
+    engine = create_engine("sqlite://")
+    if listeners == "timed":
+        instrument_engine(engine)
+    elif listeners == "no-op":
+        event.listen(engine, "before_cursor_execute", ignore)
+        event.listen(engine, "after_cursor_execute", ignore)
+    token = request_queries.set(RequestQueries())
+    try:
+        with engine.connect() as connection:
+            statement = text("SELECT 1")
+            for _ in range(1000):
+                connection.execute(statement)
+            calls, start = 0, time.perf_counter()
+            while (elapsed := time.perf_counter() - start) < budget:
+                connection.execute(statement)
+                calls += 1
+    finally:
+        request_queries.reset(token)
+    return elapsed / calls * 1e6
+
+
+def best_of(measure, variants, rounds, budget):
+    # Rounds interleave the variants so drift on a busy machine hits each
+    best = dict.fromkeys(variants, float("inf"))
+    for _ in range(rounds):
+        for variant in variants:
+            best[variant] = min(best[variant], measure(variant, budget))
+    return best
+
+
+def main(rounds, budget):
+    timings = best_of(
+        lambda name, budget: asyncio.run(per_request_us(VARIANTS[name], budget)),
+        VARIANTS,
+        rounds,
+        budget,
+    )
+    print(f"microseconds per request, best of {rounds}")
+    print(f"{'variant':<10} {'total':>8} {'overhead':>9}")
+    for app, us in timings.items():
+        print(f"{app:<10} {us:>8.2f} {us - timings['bare']:>9.2f}")
+
+    timings = best_of(per_query_us, ("none", "no-op", "timed"), rounds, budget)
+    print(f"microseconds per SELECT 1 on SQLite, best of {rounds}")
+    for listeners, us in timings.items():
+        print(f"{listeners:<10} {us:>8.2f} {us - timings['none']:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=1.0,
+                        help="time budget per variant and round")
+    args = parser.parse_args()
+    main(args.rounds, args.seconds)
@@ -0,0 +1,54 @@
+"""
+Per-request cost of the profiling hook, profiled or not.
+
+Times one request to a one-route Starlette app, called directly, for:
+
+- bare:        the app alone (PROFILE_ENABLED unset: nothing is mounted)
+- skipped:     ``ProfilingMiddleware`` with a token, for a request that
+               does not send it and a sample rate of 0
+- sampled:     the same with ``--sample-rate``
+- profiled:    every request profiled
+
+Run from the repository root:
+
+    python -m benchmarks.bench_profiling --sample-rate 0.01
+"""
+import argparse
+import asyncio
+
+from benchmarks.bench_metrics import best_of, per_request_us
+from src.common.profiling import ProfileStore
+from src.middlewares.ProfilingMiddleware import ProfilingMiddleware
+
+
+def main(rounds, budget, sample_rate):
+    def profiling(rate):
+        store = ProfileStore(keep=10)
+        return lambda app: ProfilingMiddleware(app, "token", rate, store)
+
+    variants = {
+        "bare": lambda app: app,
+        "skipped": profiling(0.0),
+        "sampled": profiling(sample_rate),
+        "profiled": profiling(1.0),
+    }
+    timings = best_of(
+        lambda name, budget: asyncio.run(per_request_us(variants[name], budget)),
+        variants,
+        rounds,
+        budget,
+    )
+    print(f"microseconds per request, best of {rounds}")
+    print(f"{'variant':<10} {'total':>8} {'overhead':>9}")
+    for name, us in timings.items():
+        print(f"{name:<10} {us:>8.2f} {us - timings['bare']:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=1.0,
+                        help="time budget per variant and round")
+    parser.add_argument("--sample-rate", type=float, default=0.01)
+    args = parser.parse_args()
+    main(args.rounds, args.seconds, args.sample_rate)
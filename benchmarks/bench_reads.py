@@ -0,0 +1,160 @@
+"""
+Throughput and memory of the list endpoints' read path.
+
+Seeds ``--rows`` users and ``--rows`` articles, then reads each table in
+full and as ``--page``-row pages, turning every row into the dict the
+endpoint sends, for:
+
+- orm:   ``select(User)`` / ``select(WebScraper)`` entities, as the
+         endpoints did before
+- core:  ``src.database.reads``: a column ``select()`` wrapped in
+         ``__slots__`` records
+
+and reports rows/s and the peak Python heap (tracemalloc) of the full
+read, plus the mean time per page. Run from the repository root against
+the database in ``DATABASE_URI``:
+
+    python -m benchmarks.bench_reads --rows 1000000
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from sqlalchemy import delete, insert, select
+
+from src.common.pagination import keyset_page
+from src.database.connection import async_session, prepare_database
+from src.database.reads import article_rows, user_rows
+from src.database.schema import User, WebScraper
+
+NAME = "bench-reads"
+URL_PREFIX = "https://bench-reads.example.com/"
+BATCH = 10000
+
+
+async def seed(rows):
+    await prepare_database()
+    await cleanup()
+    async with async_session() as session:
+        for start in range(0, rows, BATCH):
+            numbers = range(start, min(start + BATCH, rows))
+            await session.execute(
+                insert(User),
+                [
+                    {
+                        "name": NAME,
+                        "email": f"bench-reads-{n}@example.com",
+                        "phone_number": f"+1888{n:09d}",
+                        "password": "$2b$12$" + "x" * 53,
+                    }
+                    for n in numbers
+                ],
+            )
+            await session.execute(
+                insert(WebScraper),
+                [
+                    {
+                        "description": f"Researchers disclosed flaw {n}. " * 4,
+                        "image": f"https://img.example.com/{n:09d}.jpg",
+                        "titles": f"Vulnerability {n} patched in a popular library",
+                        "url": f"{URL_PREFIX}{n}",
+                    }
+                    for n in numbers
+                ],
+            )
+            await session.commit()
+
+
+async def cleanup():
+    async with async_session() as session:
+        await session.execute(delete(User).where(User.name == NAME))
+        await session.execute(
+            delete(WebScraper).where(WebScraper.url.startswith(URL_PREFIX))
+        )
+        await session.commit()
+
+
+# The list endpoints before the column-projected read path
+async def orm_users(session, after=None, limit=None):
+    result = await session.execute(keyset_page(select(User), User.id, after, limit))
+    return [
+        {"id": user.id, "name": user.name, "phone_number": user.phone_number}
+        for user in result.scalars().all()
+    ]
+
+
+async def orm_articles(session, after=None, limit=None):
+    result = await session.execute(
+        keyset_page(select(WebScraper), WebScraper.id, after, limit)
+    )
+    return [
+        {
+            "id": entry.id,
+            "description": entry.description,
+            "image": entry.image,
+            "titles": entry.titles,
+            "url": entry.url,
+        }
+        for entry in result.scalars().all()
+    ]
+
+
+async def core_users(session, after=None, limit=None):
+    return [user.as_dict() for user in await user_rows(session, after, limit)]
+
+
+async def core_articles(session, after=None, limit=None):
+    return [entry.as_dict() for entry in await article_rows(session, after, limit)]
+
+
+async def full_read(read):
+    async with async_session() as session:
+        tracemalloc.start()
+        start = time.perf_counter()
+        rows = len(await read(session))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return rows / elapsed, peak
+
+
+async def page_reads(read, page, pages):
+    async with async_session() as session:
+        after, start = None, time.perf_counter()
+        for _ in range(pages):
+            rows = await read(session, after, page)
+            if len(rows) < page:
+                break
+            after = rows[-1]["id"]
+        elapsed = time.perf_counter() - start
+    return elapsed / pages * 1000
+
+
+async def main(rows, page, pages):
+    await seed(rows)
+    print(f"{rows} seeded rows per table (plus any already stored); "
+          f"pages of {page}")
+    print(f"{'table':<9} {'variant':<6} {'rows/s':>10} {'peak heap MB':>13} "
+          f"{'ms/page':>8}")
+    try:
+        for table, variants in (
+            ("users", (("orm", orm_users), ("core", core_users))),
+            ("articles", (("orm", orm_articles), ("core", core_articles))),
+        ):
+            for name, read in variants:
+                throughput, peak = await full_read(read)
+                page_ms = await page_reads(read, page, pages)
+                print(f"{table:<9} {name:<6} {throughput:>10.0f} "
+                      f"{peak / 2**20:>13.1f} {page_ms:>8.2f}")
+    finally:
+        await cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.page, args.pages))
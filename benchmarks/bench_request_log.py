@@ -0,0 +1,65 @@
+"""
+Per-request cost of request logging and the X-Process-Time header.
+
+Times one request to a one-route Starlette app, called directly, for:
+
+- bare:      the app alone
+- before:    the ``@app.middleware("http")`` that set ``X-Process-Time``
+             (a ``BaseHTTPMiddleware``), without any logging
+- after:     ``RequestLoggerMiddleware`` logging every request
+- sampled:   ``RequestLoggerMiddleware`` keeping ``--sample-rate`` of them
+
+with the log written to ``os.devnull`` by its background thread, and
+reports records written and dropped. Run from the repository root:
+
+    python -m benchmarks.bench_request_log --sample-rate 0.1
+"""
+import argparse
+import asyncio
+import os
+
+from benchmarks.bench_metrics import (best_of, per_request_us,
+                                      process_time_middleware)
+from src.common.request_log import RequestLog
+from src.middlewares.RequestLoggerMiddleware import RequestLoggerMiddleware
+
+
+def main(rounds, budget, sample_rate, queue_size):
+    logs = {
+        "after": RequestLog(os.devnull, queue_size=queue_size),
+        "sampled": RequestLog(os.devnull, sample_rate, queue_size),
+    }
+    variants = {
+        "bare": lambda app: app,
+        "before": process_time_middleware,
+        "after": lambda app: RequestLoggerMiddleware(app, logs["after"]),
+        "sampled": lambda app: RequestLoggerMiddleware(app, logs["sampled"]),
+    }
+    timings = best_of(
+        lambda name, budget: asyncio.run(per_request_us(variants[name], budget)),
+        variants,
+        rounds,
+        budget,
+    )
+    for log in logs.values():
+        log.close()
+
+    print(f"microseconds per request, best of {rounds}")
+    print(f"{'variant':<10} {'total':>8} {'overhead':>9} {'written':>9} "
+          f"{'dropped':>8} {'sampled out':>11}")
+    for name, us in timings.items():
+        stats = logs[name].stats() if name in logs else {}
+        print(f"{name:<10} {us:>8.2f} {us - timings['bare']:>9.2f} "
+              f"{stats.get('written', ''):>9} {stats.get('dropped', ''):>8} "
+              f"{stats.get('sampled_out', ''):>11}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=1.0,
+                        help="time budget per variant and round")
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    args = parser.parse_args()
+    main(args.rounds, args.seconds, args.sample_rate, args.queue_size)
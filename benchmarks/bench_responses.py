@@ -0,0 +1,112 @@
+"""
+Cost of building and serializing the JSON envelope of each endpoint.
+
+For payloads shaped like each endpoint's ``data``, times building the
+response object, body included, for:
+
+- before:    ``JSONResponse(content=WebscrapResponse(...).dict())``
+- stdlib:    ``envelope_response`` with the stdlib encoder
+- after:     ``envelope_response`` with orjson
+
+and checks that all three send the same bytes. Run from the repository
+root (``--rows`` sizes the list endpoints):
+
+    python -m benchmarks.bench_responses --rows 1000
+"""
+import argparse
+import time
+
+from starlette.responses import JSONResponse
+
+from src.common import responses
+from src.common.responses import envelope_response
+from src.database.models import WebscrapResponse
+
+
+def hackernews_rows(count):
+    return [
+        {
+            "id": i,
+            "description": f"Researchers disclosed a flaw in widget {i}. " * 6,
+            "image": f"https://blogger.googleusercontent.com/img/{i:08d}.jpg",
+            "titles": f"Critical vulnerability number {i} patched in popular library",
+            "url": f"https://thehackernews.com/2024/03/story-{i}.html",
+        }
+        for i in range(count)
+    ]
+
+
+def user_rows(count):
+    return [
+        {"id": i, "name": f"user-{i}", "phone_number": f"+1555{i:07d}"}
+        for i in range(count)
+    ]
+
+
+def endpoint_payloads(rows):
+    return {
+        "GET /hackernews/": hackernews_rows(rows),
+        "GET /users/": user_rows(rows),
+        "GET /hackernews/terms/top": [
+            {"term": f"term{i}", "count": 1000 - i} for i in range(min(rows, 200))
+        ],
+        "GET /hackernews/jobs/{id}": {
+            "job_id": 12,
+            "status": "running",
+            "pages_requested": 20,
+            "pages_fetched": 7,
+            "errors": [],
+            "stage_seconds": {"fetch": 1.25, "parse": 0.5, "persist": 0.75},
+            "started_at": "2024-03-14T10:00:00+00:00",
+        },
+        "GET /users/get-me": [
+            {"user_name": "bench", "email": "bench@example.com", "phone_number": "1"}
+        ],
+    }
+
+
+def before(data):
+    response = WebscrapResponse(
+        success=True, message="Web Scrap found", data=data, status_code=200
+    )
+    return JSONResponse(content=response.dict(), status_code=200)
+
+
+def after(data):
+    return envelope_response(message="Web Scrap found", data=data, status_code=200)
+
+
+def per_call_us(build, data, budget=0.5):
+    calls, start = 0, time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < budget:
+        build(data)
+        calls += 1
+    return elapsed / calls * 1e6
+
+
+def main(rows):
+    orjson = responses.orjson
+    if orjson is None:
+        print("orjson is not installed; 'after' uses the stdlib encoder too")
+
+    print(f"{rows} rows in list payloads; microseconds per response")
+    print(f"{'endpoint':<27} {'before':>10} {'stdlib':>10} {'after':>10} "
+          f"{'speedup':>8} {'bytes':>9}")
+    for endpoint, data in endpoint_payloads(rows).items():
+        expected = before(data).body
+        timings = [per_call_us(before, data)]
+        for encoder in (None, orjson):
+            responses.orjson = encoder
+            assert after(data).body == expected, f"{endpoint}: bodies differ"
+            timings.append(per_call_us(after, data))
+        responses.orjson = orjson
+        print(f"{endpoint:<27} {timings[0]:>10.1f} {timings[1]:>10.1f} "
+              f"{timings[2]:>10.1f} {timings[0] / timings[2]:>7.1f}x "
+              f"{len(expected):>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.rows)
@@ -0,0 +1,127 @@
+"""
+Full-text search vs ``ilike`` on a synthetic corpus.
+
+Seeds ``webscraps`` with up to ``--rows`` synthetic articles (url prefix
+``bench://``, topped up on re-runs) and times, per keyword:
+
+- ilike:    the old ``description ILIKE '%kw%'`` query (sequential scan)
+- fts:      the ranked full-text query behind /api/hackernews/search/
+- fts@20:   the same query limited to the first page of 20
+
+Run from the repository root against the database in ``DATABASE_URI``:
+
+    python -m benchmarks.bench_search --rows 1000000
+"""
+import argparse
+import io
+import random
+import statistics
+import time
+
+from faker.providers.lorem.en_US import Provider as LoremProvider
+from sqlalchemy import func, select
+
+from src.database.connection import create_schema, engine
+from src.database.schema import WebScraper
+from src.database.search import search_statement
+
+KEYWORDS = ("ransomware", "router vulnerability", "phishing campaign", "government")
+DOMAIN_TERMS = (
+    "ransomware", "router", "vulnerability", "phishing", "campaign", "malware",
+    "botnet", "exploit", "patch", "breach", "credential", "firmware",
+)
+REPEATS = 5
+
+
+def synthetic_rows(count, start, rng):
+    vocabulary = list(LoremProvider.word_list)
+    for i in range(start, start + count):
+        words = rng.choices(vocabulary, k=rng.randint(15, 40))
+        words += rng.sample(DOMAIN_TERMS, k=rng.randint(0, 2))
+        rng.shuffle(words)
+        title = " ".join(rng.choices(vocabulary, k=6)).capitalize()
+        yield title, " ".join(words), f"bench://{i}"
+
+
+def seed(rows):
+    with engine.begin() as connection:
+        create_schema(connection)
+    with engine.connect() as connection:
+        existing = connection.execute(
+            select(func.count()).where(WebScraper.url.like("bench://%"))
+        ).scalar()
+    missing = rows - existing
+    if missing <= 0:
+        return
+    print(f"seeding {missing} rows ...")
+    rng = random.Random(existing)
+    data = synthetic_rows(missing, existing, rng)
+
+    if engine.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        for title, description, url in data:
+            buffer.write(f"{title}\t{description}\t\t{url}\n")
+        buffer.seek(0)
+        raw = engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            cursor.copy_expert(
+                "COPY webscraps (titles, description, image, url) FROM STDIN", buffer
+            )
+            cursor.execute("ANALYZE webscraps")
+            raw.commit()
+        finally:
+            raw.close()
+    else:
+        with engine.begin() as connection:
+            connection.execute(
+                WebScraper.__table__.insert(),
+                [
+                    {"titles": t, "description": d, "image": "", "url": u}
+                    for t, d, u in data
+                ],
+            )
+
+
+def timed(connection, statement, params):
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        matched = len(connection.execute(statement, params).all())
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), matched
+
+
+def main(rows):
+    seed(rows)
+    dialect = engine.dialect.name
+    print(f"{'keyword':<22} {'ilike ms':>10} {'fts ms':>10} {'fts@20 ms':>10} "
+          f"{'ilike hits':>10} {'fts hits':>9}")
+    with engine.connect() as connection:
+        for keyword in KEYWORDS:
+            ilike_ms, ilike_hits = timed(
+                connection,
+                select(WebScraper.url).where(
+                    WebScraper.description.ilike(f"%{keyword}%")
+                ),
+                {},
+            )
+            statement, match = search_statement(dialect, keyword)
+            everything = -1 if dialect == "sqlite" else None
+            fts_ms, fts_hits = timed(
+                connection,
+                statement,
+                {"keyword": match, "limit": everything, "offset": 0},
+            )
+            page_ms, _ = timed(
+                connection, statement, {"keyword": match, "limit": 20, "offset": 0}
+            )
+            print(f"{keyword:<22} {ilike_ms:>10.1f} {fts_ms:>10.1f} {page_ms:>10.1f} "
+                  f"{ilike_hits:>10} {fts_hits:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    main(args.rows)
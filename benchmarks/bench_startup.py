@@ -0,0 +1,107 @@
+"""
+Application start-up time: ``import main`` and time to the first request.
+
+Each run starts a fresh interpreter and measures:
+
+- import:         wall time of ``import main``, plus which heavy optional
+                  dependencies (nltk, httpx, bs4) it pulled in
+- first request:  from launching ``uvicorn main:app`` until
+                  ``GET /api/users/by-detail`` is answered (any status), which
+                  includes the lifespan's schema checks
+
+Pass ``--max-import-ms`` / ``--max-first-request-ms`` to exit non-zero when
+the median exceeds a budget, e.g. in CI. Run from the repository root
+against the database in ``DATABASE_URI``:
+
+    python -m benchmarks.bench_startup --runs 5 --max-import-ms 1000
+"""
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+HEAVY_MODULES = ("nltk", "httpx", "bs4")
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def measure_import():
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def measure_first_request(timeout=30.0):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/users/by-detail?name=startup-probe"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                urllib.request.urlopen(url, timeout=1)
+                return time.perf_counter() - start
+            except urllib.error.HTTPError:
+                return time.perf_counter() - start  # served, just not a 2xx
+            except OSError:
+                if server.poll() is not None:
+                    raise RuntimeError("uvicorn exited before serving a request")
+                time.sleep(0.005)
+        raise RuntimeError(f"no response within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(runs, max_import_ms, max_first_request_ms):
+    imports = [measure_import() for _ in range(runs)]
+    first_requests = [measure_first_request() for _ in range(runs)]
+
+    import_ms = statistics.median(run["seconds"] for run in imports) * 1000
+    first_request_ms = statistics.median(first_requests) * 1000
+    loaded = sorted({module for run in imports for module in run["loaded"]})
+    print(f"import main      median {import_ms:8.1f} ms  "
+          f"(min {min(run['seconds'] for run in imports) * 1000:.1f})")
+    print(f"first request    median {first_request_ms:8.1f} ms  "
+          f"(min {min(first_requests) * 1000:.1f})")
+    print(f"heavy modules loaded at import: {', '.join(loaded) or 'none'}")
+
+    failures = []
+    if max_import_ms and import_ms > max_import_ms:
+        failures.append(f"import {import_ms:.0f} ms > {max_import_ms} ms")
+    if max_first_request_ms and first_request_ms > max_first_request_ms:
+        failures.append(
+            f"first request {first_request_ms:.0f} ms > {max_first_request_ms} ms"
+        )
+    if failures:
+        sys.exit("start-up regression: " + "; ".join(failures))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-first-request-ms", type=float)
+    args = parser.parse_args()
+    main(args.runs, args.max_import_ms, args.max_first_request_ms)
@@ -0,0 +1,79 @@
+"""
+Description processing throughput: NLTK helpers vs the text-processing module.
+
+Generates ``--descriptions`` Faker paragraphs and reports descriptions/sec
+for producing the generalised description and word count with:
+
+- nltk:     the old helpers (stop-word corpus re-read and ``word_tokenize``
+            per call, per-character word-count scan)
+- single:   ``process_description`` called once per description
+- batch:    ``process_descriptions`` in-process
+- pool:     ``process_descriptions`` over ``--workers`` processes
+
+Every variant is checked to produce exactly the nltk output. Run from the
+repository root:
+
+    python -m benchmarks.bench_text_processing --descriptions 5000 --workers 4
+"""
+import argparse
+import time
+
+from faker import Faker
+from nltk.corpus import stopwords
+from nltk.tokenize import word_tokenize
+
+from src.common.text_processing import (process_description,
+                                        process_descriptions, process_pool)
+
+
+def nltk_helpers(description):
+    stop_words = set(stopwords.words("english"))
+    words = word_tokenize(description)
+    generalised = " ".join(word for word in words if word.lower() not in stop_words)
+
+    ignore_chars = {".", ",", ":", ";", "'", '"', "`"}
+    hmap = {}
+    for word in generalised.split():
+        if any(char in ignore_chars for char in word):
+            continue
+        if word not in hmap:
+            hmap[word] = 1
+        else:
+            hmap[word] += 1
+    sorted_hmap = dict(sorted(hmap.items(), key=lambda item: item[1], reverse=True))
+    return generalised, sorted_hmap
+
+
+def main(count, workers, seed):
+    fake = Faker()
+    Faker.seed(seed)
+    descriptions = [fake.paragraph(nb_sentences=5) for _ in range(count)]
+    process_pool(workers).submit(int).result()  # start the workers untimed
+
+    variants = {
+        "nltk": lambda: [nltk_helpers(text) for text in descriptions],
+        "single": lambda: [process_description(text) for text in descriptions],
+        "batch": lambda: process_descriptions(descriptions, workers=0),
+        "pool": lambda: process_descriptions(descriptions, workers=workers),
+    }
+    print(f"{count} descriptions, pool of {workers} processes")
+    print(f"{'variant':<8} {'seconds':>8} {'desc/s':>9}")
+    expected, baseline = None, None
+    for name, run in variants.items():
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        expected = expected or [(text, list(counts.items())) for text, counts in result]
+        assert [(text, list(counts.items())) for text, counts in result] == expected
+        baseline = baseline or elapsed
+        print(f"{name:<8} {elapsed:>8.2f} {count / elapsed:>9.0f}  "
+              f"x{baseline / elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--descriptions", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.descriptions, args.workers, args.seed)
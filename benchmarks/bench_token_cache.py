@@ -0,0 +1,100 @@
+"""
+Cost of resolving the ``verify_token`` dependency, with and without the cache.
+
+Each variant is measured two ways: calling the dependency directly, and
+requesting a minimal FastAPI route that depends on it (so the figure also
+includes FastAPI's dependency resolution):
+
+- before:    a replica of the old sync dependency, which FastAPI runs in
+             its threadpool and which decodes the JWT on every call
+- no cache:  the real ``verify_token`` with the token cache disabled
+- cached:    the real ``verify_token`` with the token cache
+
+Run from the repository root:
+
+    python -m benchmarks.bench_token_cache --calls 20000 --requests 2000
+"""
+import argparse
+import asyncio
+import time
+from typing import Annotated
+
+import httpx
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, status
+from jose import JWTError, jwt
+
+from src.auth import token_access
+from src.auth.token_access import TokenCache, create_access_token, verify_token
+from src.common.configuration import ALGORITHM, SECRET_KEY
+
+
+def verify_token_before(
+    request: Request, token: Annotated[str | None, Header()] = None
+):
+    # verify_token before the cache (less its print), kept for comparison
+    try:
+        if token is None or not token.startswith("Bearer "):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        payload = jwt.decode(
+            token.split(" ")[1], SECRET_KEY, algorithms=[ALGORITHM]
+        )
+        return payload["user_id"]
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+
+def route_app(dependency):
+    app = FastAPI()
+
+    @app.get("/")
+    async def whoami(user_id: Annotated[int, Depends(dependency)]):
+        return user_id
+
+    return app
+
+
+async def per_call(dependency, header, calls):
+    start = time.perf_counter()
+    if asyncio.iscoroutinefunction(dependency):
+        for _ in range(calls):
+            await dependency(None, header)
+    else:
+        for _ in range(calls):
+            dependency(None, header)
+    return (time.perf_counter() - start) / calls
+
+
+async def per_request(dependency, header, requests):
+    transport = httpx.ASGITransport(app=route_app(dependency))
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        await client.get("/", headers={"token": header})  # warm up
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get("/", headers={"token": header})
+            response.raise_for_status()
+        return (time.perf_counter() - start) / requests
+
+
+async def main(calls, requests):
+    header = f"Bearer {create_access_token(1)}"
+    print(f"{'variant':<9} {'call µs':>9} {'request µs':>11}")
+    for name, dependency, cache in (
+        ("before", verify_token_before, TokenCache(maxsize=0)),
+        ("no cache", verify_token, TokenCache(maxsize=0)),
+        ("cached", verify_token, TokenCache()),
+    ):
+        token_access.token_cache = cache
+        call = await per_call(dependency, header, calls)
+        request = await per_request(dependency, header, requests)
+        print(f"{name:<9} {call * 1e6:>9.1f} {request * 1e6:>11.1f}")
+    print(f"cache: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.requests))
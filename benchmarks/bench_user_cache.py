@@ -0,0 +1,121 @@
+"""
+``GET /api/users/get-me`` latency with and without the user profile cache.
+
+A single client calls get-me back to back and reports its
+p50/p95/p99/max, requests per second and the cache's hit ratio for:
+
+- before:   a replica of the old handler, one primary-key query per call
+- memory:   the real route with the in-process LRU backend
+- redis:    the real route with the Redis backend (only with ``--redis-url``)
+
+Run from the repository root against the database in ``DATABASE_URI``:
+
+    python -m benchmarks.bench_user_cache --requests 2000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Annotated
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import JSONResponse
+
+from main import app
+from src.auth.token_access import create_access_token, verify_token
+from src.common.cache import MemoryBackend, RedisBackend
+from src.common.configuration import USER_CACHE_SIZE, USER_CACHE_TTL
+from src.database.connection import async_session, get_session, prepare_database
+from src.database.schema import User
+from src.database.user_cache import UserCache, user_profile
+from src.endpoints.user import user_endpoints, user_extra
+
+EMAIL = "bench-cache@example.com"
+
+before_app = FastAPI()
+
+
+@before_app.get("/api/users/get-me")
+async def get_me_uncached(
+    user_id: Annotated[int, Depends(verify_token)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> JSONResponse:
+    # The get-me handler before the cache, kept for comparison
+    user = await session.get(User, user_id)
+    return JSONResponse({"data": [user_profile(user)]})
+
+
+async def seed_user():
+    await prepare_database()
+    async with async_session() as session:
+        user = await session.scalar(select(User).where(User.email == EMAIL))
+        if user is None:
+            user = User(
+                name="bench-cache", email=EMAIL, phone_number="+19990001", password="-"
+            )
+            session.add(user)
+            await session.commit()
+        return user.id
+
+
+def use_cache(cache):
+    for module in (user_endpoints, user_extra):
+        module.user_cache = cache
+
+
+def percentiles(samples):
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98], "max": max(samples)}
+
+
+async def run(target, token, requests):
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        headers = {"token": f"Bearer {token}"}
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(requests):
+            request_start = time.perf_counter()
+            response = await client.get("/api/users/get-me", headers=headers)
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - request_start) * 1000)
+        return percentiles(latencies), requests / (time.perf_counter() - start)
+
+
+async def main(requests, redis_url):
+    token = create_access_token(await seed_user())
+    variants = [
+        ("before", before_app, None),
+        ("memory", app, UserCache(MemoryBackend(USER_CACHE_SIZE, USER_CACHE_TTL))),
+    ]
+    if redis_url:
+        variants.append(
+            ("redis", app, UserCache(RedisBackend(redis_url, USER_CACHE_TTL)))
+        )
+
+    print(f"{requests} sequential requests; latency in ms")
+    print(f"{'variant':<8} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7} "
+          f"{'req/s':>8} {'hit ratio':>9}")
+    for name, target, cache in variants:
+        if cache is not None:
+            use_cache(cache)
+        stats, throughput = await run(target, token, requests)
+        hit_ratio = f"{cache.stats()['hit_ratio']:.3f}" if cache else "-"
+        print(f"{name:<8} {stats['p50']:>7.2f} {stats['p95']:>7.2f} "
+              f"{stats['p99']:>7.2f} {stats['max']:>7.2f} {throughput:>8.1f} "
+              f"{hit_ratio:>9}")
+        if cache is not None:
+            await cache.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--redis-url")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.redis_url))
@@ -0,0 +1,92 @@
+"""
+Onboarding throughput: one sign-up request per user vs the bulk import.
+
+Creates ``--users`` new users (at the ``BCRYPT_ROUNDS`` cost) with:
+
+- signup:   ``POST /api/users/signup`` once per user, ``--concurrency`` at a time
+- import:   one streamed JSONL upload to ``POST /api/users/import``
+
+Run from the repository root against the database in ``DATABASE_URI``:
+
+    BCRYPT_ROUNDS=4 python -m benchmarks.bench_user_import --users 2000
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+from sqlalchemy import delete
+
+from main import app
+from src.auth.token_access import create_access_token
+from src.database.connection import async_session, prepare_database
+from src.database.schema import User
+
+
+def users(count, tag):
+    for n in range(count):
+        yield {
+            "name": f"bench-import-{tag}",
+            "email": f"bench-{tag}-{n}@example.com",
+            "phone_number": f"+1{tag}{n}",
+            "password": f"password-{n}",
+        }
+
+
+async def signup(client, count, concurrency):
+    pending = iter(users(count, uuid.uuid4().hex[:8]))
+
+    async def worker():
+        for user in pending:
+            response = await client.post("/api/users/signup", json=user)
+            response.raise_for_status()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def bulk_import(client, count):
+    async def body():
+        for user in users(count, uuid.uuid4().hex[:8]):
+            yield json.dumps(user).encode() + b"\n"
+
+    response = await client.post(
+        "/api/users/import",
+        content=body(),
+        headers={
+            "token": f"Bearer {create_access_token(1)}",
+            "Content-Type": "application/x-ndjson",
+        },
+    )
+    response.raise_for_status()
+    assert response.json()["data"]["created"] == count
+
+
+async def main(count, concurrency):
+    await prepare_database()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        for name, run in (
+            ("signup", lambda: signup(client, count, concurrency)),
+            ("import", lambda: bulk_import(client, count)),
+        ):
+            start = time.perf_counter()
+            await run()
+            elapsed = time.perf_counter() - start
+            print(f"{name:<7} {count} users in {elapsed:6.2f} s  "
+                  f"{count / elapsed:8.1f} users/s")
+
+    async with async_session() as session:
+        await session.execute(delete(User).where(User.name.like("bench-import-%")))
+        await session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.concurrency))
@@ -0,0 +1,143 @@
+"""
+Faker-generated users and articles for the benchmark suite and replays.
+
+``seed(scale)`` tops the database in ``DATABASE_URI`` up to ``scale``
+users and ``scale`` articles, so a dataset is generated once and reused
+by later runs. Articles are stored with their word counts and term
+aggregates, as a scrape would leave them. Every seeded user has the
+password ``PASSWORD``. Run from the repository root to seed ahead of time:
+
+    python -m benchmarks.datasets --scale 100000
+"""
+import argparse
+import asyncio
+import re
+
+from faker import Faker
+from sqlalchemy import func, insert, select
+
+from src.auth.hashing import hash_password
+from src.common.text_processing import count_words, stop_words
+from src.database.connection import async_session, prepare_database
+from src.database.schema import User, WebScraper
+from src.database.term_stats import top_terms
+from src.scraping.pipeline import persist_articles
+
+SCALES = (10_000, 100_000, 1_000_000)
+EMAIL_DOMAIN = "suite.example.com"
+URL_PREFIX = "https://suite.example.com/"
+PASSWORD = "suite-password"
+BATCH = 1000
+
+# Cheap stand-in for the NLTK tokenizer, which would dominate seeding
+NOT_A_WORD = re.compile(r"[^\w\s]")
+
+
+class Dataset:
+    """What scenarios need to know about the seeded data."""
+
+    def __init__(self, scale, users, terms, article_ids):
+        self.scale = scale
+        self.user_ids = [user.id for user in users]
+        self.names = [user.name for user in users]
+        self.emails = [user.email for user in users]
+        self.terms = terms
+        self.article_ids = article_ids
+
+
+def fake_user(faker, n, password):
+    return {
+        "name": faker.name(),
+        "email": f"{faker.user_name()}.{n}@{EMAIL_DOMAIN}",
+        "phone_number": f"+1{n:010d}",
+        "password": password,
+    }
+
+
+def fake_article(faker, n):
+    description = faker.paragraph(nb_sentences=4)
+    ignored = stop_words()
+    generalised = " ".join(
+        word
+        for word in NOT_A_WORD.sub("", description.lower()).split()
+        if word not in ignored
+    )
+    return {
+        "title": faker.sentence(nb_words=8).rstrip("."),
+        "description": description,
+        "image_source": faker.image_url(),
+        "url": f"{URL_PREFIX}{n}/{faker.slug()}",
+        "generalised_description": generalised,
+        "word_count": count_words(generalised),
+    }
+
+
+async def seeded_count(session, column, pattern):
+    return await session.scalar(select(func.count()).where(column.like(pattern)))
+
+
+async def seed(scale: int, faker_seed: int = 0, progress=None) -> Dataset:
+    await prepare_database()
+    async with async_session() as session:
+        users = await seeded_count(session, User.email, f"%@{EMAIL_DOMAIN}")
+        articles = await seeded_count(session, WebScraper.url, f"{URL_PREFIX}%")
+    # Seeded per starting point so a top-up does not repeat earlier rows
+    faker = Faker()
+    faker.seed_instance(f"{faker_seed}:{users}:{articles}")
+
+    password = await hash_password(PASSWORD)
+    for start in range(users, scale, BATCH):
+        async with async_session() as session:
+            await session.execute(
+                insert(User),
+                [
+                    fake_user(faker, n, password)
+                    for n in range(start, min(start + BATCH, scale))
+                ],
+            )
+            await session.commit()
+        if progress:
+            progress("users", min(start + BATCH, scale))
+    for start in range(articles, scale, BATCH):
+        async with async_session() as session:
+            batch = range(start, min(start + BATCH, scale))
+            await persist_articles(session, [fake_article(faker, n) for n in batch])
+            await session.commit()
+        if progress:
+            progress("articles", min(start + BATCH, scale))
+    return await load(scale)
+
+
+async def load(scale: int) -> Dataset:
+    async with async_session() as session:
+        users = (
+            await session.execute(
+                select(User.id, User.name, User.email)
+                .where(User.email.like(f"%@{EMAIL_DOMAIN}"))
+                .order_by(User.id)
+                .limit(1000)
+            )
+        ).all()
+        terms = [row["term"] for row in await top_terms(session, 20)]
+        article_ids = (
+            await session.scalars(
+                select(WebScraper.id)
+                .where(WebScraper.url.like(f"{URL_PREFIX}%"))
+                .order_by(WebScraper.id)
+                .limit(1000)
+            )
+        ).all()
+    return Dataset(scale, users, terms, article_ids)
+
+
+def print_progress(table, rows):
+    print(f"{table}: {rows} rows", end="\r", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=SCALES[0])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(seed(args.scale, args.seed, print_progress))
+    print(f"\n{args.scale} users and articles seeded")
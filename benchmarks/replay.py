@@ -0,0 +1,317 @@
+"""
+Replay a JSONL request log against the API to find where it saturates.
+
+Each line of the log is one request::
+
+    {"ts": 12.5, "method": "GET", "path": "/api/users/?limit=100"}
+    {"ts": 12.7, "method": "POST", "path": "/api/users/signin",
+     "body": {"email": "a@example.com", "password": "..."}, "status": 200}
+
+``ts`` (seconds, any origin) sets when the request is sent. ``method``
+defaults to GET. Optional fields: ``body`` (JSON), ``headers`` and
+``status`` (the recorded status, which is then not counted as an
+error). ``benchmarks/traffic/sample.jsonl`` is a read-heavy example.
+
+Replay is open loop: requests leave on schedule whether or not earlier
+ones have answered. Timestamps are divided by ``--time-scale`` (2 plays
+the log twice as fast), or ``--rate`` replaces them with Poisson
+arrivals at that many requests/s. ``--max-in-flight`` caps concurrent
+requests; a request held back by the cap is timed from when it was due,
+so queueing shows up in its latency. Requests without a ``token``
+header get one for ``--user-id`` (by default the first user in
+``DATABASE_URI``). Repeat ``--time-scale`` or ``--rate`` to sweep load
+levels in one run.
+
+Reports HDR-style latency histograms (overall percentile distribution,
+per-route percentiles and error rates), optionally saved with
+``--output``. Run from the repository root, in-process against the
+database in ``DATABASE_URI`` or over HTTP with ``--url``:
+
+    python -m benchmarks.replay benchmarks/traffic/sample.jsonl --rate 200 --rate 400
+    python -m benchmarks.replay log.jsonl --url http://127.0.0.1:8000 --time-scale 4
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from collections import defaultdict
+
+import httpx
+from sqlalchemy import func, select
+from starlette.routing import Match
+
+from main import app
+from src.auth.token_access import create_access_token
+from src.database.connection import async_engine, async_session
+from src.database.schema import User
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class Histogram:
+    """
+    Latency histogram with HdrHistogram's log-linear buckets: microsecond
+    values are exact below 256 and kept to 8 significant bits above, so
+    every percentile is within 0.8% of the recorded latency.
+    """
+
+    SUB_BUCKET_BITS = 8
+
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self.total = 0
+        self.max = 0
+
+    def bucket(self, micros: int):
+        shift = max(0, micros.bit_length() - self.SUB_BUCKET_BITS)
+        return shift, micros >> shift
+
+    def record(self, seconds: float):
+        micros = max(0, round(seconds * 1e6))
+        self.counts[self.bucket(micros)] += 1
+        self.total += 1
+        self.max = max(self.max, micros)
+
+    def buckets(self):
+        """(upper bound in ms, count) in increasing order."""
+        for shift, sub in sorted(self.counts, key=lambda key: key[1] << key[0]):
+            upper = min(((sub + 1) << shift) - 1, self.max)
+            yield upper / 1000, self.counts[shift, sub]
+
+    def percentile(self, percentile: float) -> float:
+        """Latency in ms at or below which `percentile` % of requests fell."""
+        if not self.total:
+            return 0.0
+        wanted = max(1, round(self.total * percentile / 100))
+        seen = 0
+        for upper, count in self.buckets():
+            seen += count
+            if seen >= wanted:
+                return upper
+        return self.max / 1000
+
+    def distribution(self, ticks_per_half: int = 4):
+        """
+        HdrHistogram-style rows (value ms, percentile, count, 1/(1-p)) at
+        percentiles that step ever closer to 100: `ticks_per_half` rows
+        between 0 and 50%, as many between 50 and 75%, and so on.
+        """
+        if not self.total:
+            return []
+        buckets = list(self.buckets())
+        rows, index, seen, level, half = [], 0, 0, 0.0, 50.0
+        while True:
+            wanted = max(1, math.ceil(self.total * level / 100))
+            while seen < wanted:
+                seen += buckets[index][1]
+                index += 1
+            fraction = seen / self.total
+            if not rows or rows[-1][2] != seen:
+                inverse = 1 / (1 - fraction) if fraction < 1 else None
+                rows.append((buckets[index - 1][0], fraction, seen, inverse))
+            if seen == self.total:
+                return rows
+            level += half / ticks_per_half
+            if level >= 100 - half:
+                half /= 2
+
+
+class RouteStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.requests = 0
+        self.errors = 0
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": self.errors / self.requests if self.requests else 0.0,
+            **{f"p{p}_ms": self.latency.percentile(p) for p in PERCENTILES},
+            "max_ms": self.latency.max / 1000,
+        }
+
+
+def read_log(path):
+    entries = []
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                entries.append(json.loads(line))
+    return entries
+
+
+def schedule(entries, time_scale=1.0, rate=None, seed=0):
+    """Send offsets in seconds from the start, one per entry."""
+    if rate:
+        generator, offset, offsets = random.Random(seed), 0.0, []
+        for _ in entries:
+            offset += generator.expovariate(rate)
+            offsets.append(offset)
+        return offsets
+    first = min((entry.get("ts", 0.0) for entry in entries), default=0.0)
+    return [(entry.get("ts", 0.0) - first) / time_scale for entry in entries]
+
+
+def route_name(method, path):
+    """The route template a request hits, e.g. `GET /api/users/{user_id}`."""
+    scope = {"type": "http", "method": method, "path": path.split("?")[0]}
+    for route in app.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return f"{method} {route.path}"
+    return f"{method} {scope['path']} (no route)"
+
+
+class Replay:
+    def __init__(self, client, token, max_in_flight):
+        self.client = client
+        self.token = token
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.routes = defaultdict(RouteStats)
+        self.overall = Histogram()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def send(self, entry, due):
+        method = entry.get("method", "GET").upper()
+        headers = {"token": f"Bearer {self.token}", **entry.get("headers", {})}
+        stats = self.routes[route_name(method, entry["path"])]
+        async with self.slots:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                response = await self.client.request(
+                    method, entry["path"], json=entry.get("body"), headers=headers
+                )
+                status = response.status_code
+                failed = status >= 400 and status != entry.get("status")
+            except httpx.HTTPError:
+                failed = True
+            finally:
+                self.in_flight -= 1
+        # Timed from when the request was due, not when a slot freed up
+        latency = time.perf_counter() - due
+        stats.requests += 1
+        stats.errors += failed
+        stats.latency.record(latency)
+        self.overall.record(latency)
+
+    async def run(self, entries, offsets):
+        start = time.perf_counter()
+        tasks = []
+        for entry, offset in sorted(zip(entries, offsets), key=lambda pair: pair[1]):
+            due = start + offset
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self.send(entry, due)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+        return {
+            "requests": self.overall.total,
+            "errors": sum(stats.errors for stats in self.routes.values()),
+            "seconds": elapsed,
+            "offered_per_second": len(entries) / max(offsets) if max(offsets) else None,
+            "achieved_per_second": self.overall.total / elapsed,
+            "peak_in_flight": self.peak_in_flight,
+            **{f"p{p}_ms": self.overall.percentile(p) for p in PERCENTILES},
+            "max_ms": self.overall.max / 1000,
+            "routes": {
+                name: stats.as_dict() for name, stats in sorted(self.routes.items())
+            },
+            "distribution": self.overall.distribution(),
+        }
+
+
+async def first_user_id():
+    async with async_session() as session:
+        user_id = await session.scalar(select(func.min(User.id)))
+    # Pooled connections belong to this event loop, which is about to end
+    await async_engine.dispose()
+    return user_id or 1
+
+
+async def replay(entries, offsets, url=None, user_id=None, max_in_flight=64):
+    """Replay `entries` at `offsets` in-process, or against `url` over HTTP."""
+    token = create_access_token(user_id or await first_user_id())
+    if url:
+        limits = httpx.Limits(max_connections=max_in_flight)
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+            return await Replay(client, token, max_in_flight).run(entries, offsets)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://replay", timeout=60
+        ) as client:
+            return await Replay(client, token, max_in_flight).run(entries, offsets)
+
+
+def print_report(label, result, distribution=False):
+    offered = result["offered_per_second"]
+    print(f"== {label}: {result['requests']} requests in {result['seconds']:.1f} s, "
+          f"offered {offered or 0:.0f}/s, achieved "
+          f"{result['achieved_per_second']:.0f}/s, peak in flight "
+          f"{result['peak_in_flight']}")
+    if distribution:
+        print(f"{'Value(ms)':>12} {'Percentile':>12} {'TotalCount':>10} "
+              f"{'1/(1-Percentile)':>16}")
+        for upper, fraction, seen, inverse in result["distribution"]:
+            inverse = "inf" if inverse is None else f"{inverse:.2f}"
+            print(f"{upper:>12.3f} {fraction:>12.6f} {seen:>10} {inverse:>16}")
+    print(f"{'route':<52} {'count':>6} {'err%':>6} "
+          + " ".join(f"{'p' + str(p):>8}" for p in PERCENTILES) + f" {'max':>8}")
+    for name, route in result["routes"].items():
+        print(f"{name:<52} {route['requests']:>6} {route['error_rate'] * 100:>6.1f} "
+              + " ".join(f"{route[f'p{p}_ms']:>8.2f}" for p in PERCENTILES)
+              + f" {route['max_ms']:>8.2f}")
+
+
+def main(args):
+    entries = read_log(args.log)
+    levels = [("rate", rate) for rate in args.rate or ()] or [
+        ("time scale", scale) for scale in args.time_scale or (1.0,)
+    ]
+    results = {}
+    for kind, level in levels:
+        offsets = (
+            schedule(entries, rate=level, seed=args.seed)
+            if kind == "rate"
+            else schedule(entries, time_scale=level)
+        )
+        result = asyncio.run(
+            replay(entries, offsets, args.url, args.user_id, args.max_in_flight)
+        )
+        label = f"{kind} {level:g}"
+        print_report(label, result, args.distribution)
+        results[label] = result
+
+    if len(levels) > 1:
+        print(f"{'load':<16} {'offered/s':>10} {'achieved/s':>11} {'p99 ms':>9} "
+              f"{'errors':>7}")
+        for label, result in results.items():
+            print(f"{label:<16} {result['offered_per_second'] or 0:>10.0f} "
+                  f"{result['achieved_per_second']:>11.0f} {result['p99_ms']:>9.2f} "
+                  f"{result['errors']:>7}")
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("log", help="JSONL request log")
+    parser.add_argument("--url", help="replay over HTTP to this server instead")
+    parser.add_argument("--time-scale", type=float, action="append")
+    parser.add_argument("--rate", type=float, action="append", help="requests/s")
+    parser.add_argument("--max-in-flight", type=int, default=64)
+    parser.add_argument(
+        "--user-id", type=int, help="token subject (default: the lowest user id)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--distribution", action="store_true",
+                        help="print the full percentile distribution")
+    parser.add_argument("--output")
+    main(parser.parse_args())
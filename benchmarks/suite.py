@@ -0,0 +1,309 @@
+"""
+Latency and throughput of every API route, served in-process.
+
+Seeds (or reuses) a Faker dataset of ``--scale`` users and articles (see
+``benchmarks.datasets``; 10k, 100k and 1M are the usual scales), starts
+``main.app`` with its lifespan and drives it through an ASGI client.
+Each scenario sends ``--requests`` requests, ``--concurrency`` at a time,
+after ``--warmup`` unmeasured ones, and reports p50/p95/p99 latency,
+requests/s and errors (responses other than the expected status).
+
+``--output`` saves the results as JSON. ``--baseline`` compares them with
+an earlier file and exits non-zero when a route's p95 grew or its
+throughput fell by more than ``--tolerance``, or it started failing.
+Routes without a scenario are listed. Run from the repository root
+against the database in ``DATABASE_URI``:
+
+    python -m benchmarks.suite --scale 100000 --output bench.json
+    python -m benchmarks.suite --scale 100000 --baseline bench.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+from fastapi.routing import APIRoute
+
+from benchmarks.datasets import PASSWORD, SCALES, seed
+from main import app
+from src.auth import token_access
+from src.auth.token_access import create_access_token
+from src.database.connection import async_engine
+
+
+def pick(values, n):
+    return values[n % len(values)]
+
+
+class Scenario:
+    """
+    One route under load. `url`, `params` and `body` build the n-th
+    request from the dataset; every request carries a valid token.
+    """
+
+    def __init__(self, method, route, url=None, params=None, body=None, status=200):
+        self.method = method
+        self.route = route
+        self.name = f"{method} {route}"
+        self.url = url
+        self.params = params
+        self.body = body
+        self.status = status
+
+    def request(self, dataset, n) -> dict:
+        arguments = {"url": self.url(dataset, n) if self.url else self.route}
+        if self.params:
+            arguments["params"] = self.params(dataset, n)
+        if self.body:
+            arguments["json"] = self.body(dataset, n)
+        return arguments
+
+
+def signup_body(dataset, n):
+    # Unique across runs, since sign-ups stay in the database
+    stamp = f"{time.time_ns()}{n}"
+    return {
+        "name": "suite signup",
+        "email": f"signup.{stamp}@signup.example.com",
+        "phone_number": f"+{stamp}",
+        "password": PASSWORD,
+    }
+
+
+def term_url(suffix):
+    return lambda d, n: f"/api/hackernews/terms/{pick(d.terms, n)}/{suffix}"
+
+
+SCENARIOS = [
+    Scenario("GET", "/api/users/", params=lambda d, n: {"limit": 100}),
+    Scenario(
+        "GET", "/api/users/by-detail", params=lambda d, n: {"name": pick(d.names, n)}
+    ),
+    Scenario("POST", "/api/users/signup", body=signup_body, status=201),
+    Scenario(
+        "POST",
+        "/api/users/signin",
+        body=lambda d, n: {"email": pick(d.emails, n), "password": PASSWORD},
+    ),
+    Scenario("GET", "/api/users/get-me"),
+    Scenario(
+        "GET",
+        "/api/users/{user_id}",
+        url=lambda d, n: f"/api/users/{pick(d.user_ids, n)}",
+    ),
+    # Sets the token user's name to what it already is, so the dataset stays
+    Scenario(
+        "PUT",
+        "/api/users/{user_id}",
+        url=lambda d, n: f"/api/users/{d.user_ids[0]}",
+        body=lambda d, n: {"name": d.names[0]},
+    ),
+    Scenario("GET", "/api/hackernews/", params=lambda d, n: {"limit": 100}),
+    Scenario(
+        "GET",
+        "/api/hackernews/search/",
+        params=lambda d, n: {"keyword": pick(d.terms, n), "limit": 20},
+    ),
+    Scenario("GET", "/api/hackernews/articles", params=lambda d, n: {"limit": 100}),
+    Scenario(
+        "GET",
+        "/api/hackernews/articles/{article_id}",
+        url=lambda d, n: f"/api/hackernews/articles/{pick(d.article_ids, n)}",
+    ),
+    Scenario("GET", "/api/hackernews/terms/top"),
+    Scenario(
+        "GET", "/api/hackernews/terms/{term}/timeline", url=term_url("timeline")
+    ),
+    Scenario(
+        "GET",
+        "/api/hackernews/terms/{term}/document-frequency",
+        url=term_url("document-frequency"),
+    ),
+    Scenario("GET", "/api/admin/pool"),
+    Scenario("GET", "/api/admin/token-cache"),
+    Scenario("GET", "/api/admin/user-cache"),
+    Scenario("GET", "/api/admin/profiles"),
+    Scenario("GET", "/metrics"),
+]
+
+# Routes left out on purpose: bulk transfers have their own benchmarks,
+# the rest reach the network, cancel work or wipe state
+NOT_BENCHMARKED = {
+    "GET /api/users/export": "benchmarks.bench_export",
+    "GET /api/hackernews/export": "benchmarks.bench_export",
+    "POST /api/users/import": "benchmarks.bench_user_import",
+    "POST /api/hackernews/": "scrapes the live site",
+    "GET /api/hackernews/jobs/{job_id}": "needs a running scrape",
+    "GET /api/admin/profiles/{profile_id}": "needs a profiled request",
+    "DELETE /api/hackernews/jobs/{job_id}": "cancels a scrape",
+    "DELETE /api/users/{user_id}": "shrinks the dataset",
+    "DELETE /api/admin/token-cache": "empties the token cache",
+    "POST /api/admin/term-stats/rebuild": "maintenance, rebuilds every aggregate",
+}
+
+
+def app_routes():
+    return {
+        f"{method} {route.path}"
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+
+
+def summarize(latencies, errors, elapsed):
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    else:
+        cuts = (latencies or [0.0]) * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": cuts[49],
+        "p95_ms": cuts[94],
+        "p99_ms": cuts[98],
+        "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+    }
+
+
+async def run_scenario(client, scenario, dataset, requests, concurrency, warmup):
+    headers = {"token": f"Bearer {create_access_token(dataset.user_ids[0])}"}
+    for n in range(warmup):
+        arguments = scenario.request(dataset, n)
+        await client.request(scenario.method, headers=headers, **arguments)
+
+    latencies, errors = [], 0
+    numbers = iter(range(warmup, warmup + requests))
+
+    async def worker():
+        nonlocal errors
+        for n in numbers:
+            arguments = scenario.request(dataset, n)
+            start = time.perf_counter()
+            response = await client.request(
+                scenario.method, headers=headers, **arguments
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != scenario.status:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def run(scale, requests, concurrency, warmup, only=None):
+    """Seed, then benchmark every scenario (or those named in `only`)."""
+    dataset = await seed(scale)
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    # Every scenario sends the first user's token, the admin ones included
+    admins = token_access.ADMIN_USER_IDS
+    token_access.ADMIN_USER_IDS = admins | {dataset.user_ids[0]}
+    try:
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://suite"
+            ) as client:
+                for scenario in SCENARIOS:
+                    if only and scenario.name not in only:
+                        continue
+                    results[scenario.name] = await run_scenario(
+                        client, scenario, dataset, requests, concurrency, warmup
+                    )
+    finally:
+        token_access.ADMIN_USER_IDS = admins
+    return {
+        "meta": {
+            "scale": scale,
+            "requests": requests,
+            "concurrency": concurrency,
+            "database": async_engine.dialect.name,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "routes": results,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of `results` against `baseline`, one message per route."""
+    regressions = []
+    for name, now in results["routes"].items():
+        before = baseline["routes"].get(name)
+        if before is None:
+            continue
+        if now["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {before['p95_ms']:.2f} -> {now['p95_ms']:.2f} ms"
+            )
+        if now["requests_per_second"] < before["requests_per_second"] / (1 + tolerance):
+            regressions.append(
+                f"{name}: {before['requests_per_second']:.0f} -> "
+                f"{now['requests_per_second']:.0f} req/s"
+            )
+        if now["errors"] and not before["errors"]:
+            regressions.append(f"{name}: {now['errors']} errors")
+    return regressions
+
+
+def print_results(results, baseline=None):
+    meta = results["meta"]
+    print(f"scale {meta['scale']} on {meta['database']}, {meta['requests']} "
+          f"requests per route, {meta['concurrency']} concurrent; ms")
+    print(f"{'route':<52} {'p50':>7} {'p95':>7} {'p99':>7} {'req/s':>8} "
+          f"{'errors':>6} {'p95 vs base':>11}")
+    for name, route in results["routes"].items():
+        before = (baseline or {}).get("routes", {}).get(name)
+        change = (
+            f"{(route['p95_ms'] / before['p95_ms'] - 1) * 100:>+10.0f}%"
+            if before and before["p95_ms"]
+            else f"{'':>11}"
+        )
+        print(f"{name:<52} {route['p50_ms']:>7.2f} {route['p95_ms']:>7.2f} "
+              f"{route['p99_ms']:>7.2f} {route['requests_per_second']:>8.0f} "
+              f"{route['errors']:>6} {change}")
+
+
+def main(args):
+    results = asyncio.run(
+        run(args.scale, args.requests, args.concurrency, args.warmup, args.route)
+    )
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    print_results(results, baseline)
+
+    covered = {scenario.name for scenario in SCENARIOS} | set(NOT_BENCHMARKED)
+    missing = sorted(app_routes() - covered)
+    if missing:
+        print(f"routes without a scenario: {', '.join(missing)}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            sys.exit("regressions:\n  " + "\n  ".join(regressions))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=SCALES[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--route", action="append", help="only this scenario")
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    main(parser.parse_args())
@@ -0,0 +1,261 @@
+import hashlib
+import os
+import pathlib
+import socketserver
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+# Point the app at a throwaway database before anything imports it.
+# Set TEST_DATABASE_URI to run the suite against Postgres instead.
+os.environ["DATABASE_URI"] = os.environ.get(
+    "TEST_DATABASE_URI", f"sqlite:///{tempfile.mkdtemp()}/test.db"
+)
+os.environ["BCRYPT_ROUNDS"] = "4"  # the cheapest cost keeps auth tests fast
+os.environ["ADMIN_USER_IDS"] = "1"  # the user of `auth_headers`
+os.environ["REQUEST_LOG_PATH"] = os.devnull
+os.environ["PROFILE_ENABLED"] = "true"
+os.environ["PROFILE_TOKEN"] = "test-profile-token"
+
+from src.auth.token_access import create_access_token  # noqa: E402
+from src.database.connection import (Session, async_engine,  # noqa: E402
+                                     create_schema, engine)
+from src.common.cache import MemoryBackend  # noqa: E402
+from src.database.schema import Base  # noqa: E402
+from src.database.user_cache import user_cache  # noqa: E402
+
+RECORDED_SITE = "https://thehackernews.com"
+RECORDED_PAGES = {
+    "/": "index.html",
+    "/search?updated-max=2024-03-14T10:00:00%2B05:30&max-results=12": "page-2.html",
+    "/search?updated-max=2024-03-13T10:00:00%2B05:30&max-results=12": "page-3.html",
+}
+FIXTURES = pathlib.Path(__file__).parent / "test_fixtures" / "thehackernews"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    # The app creates its schema in its lifespan; tests that only use the
+    # database directly need it too
+    with engine.begin() as connection:
+        create_schema(connection)
+
+
+@pytest.fixture(autouse=True)
+def clean_database():
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    yield
+
+
+@pytest.fixture(autouse=True)
+def fresh_user_cache(monkeypatch):
+    # Ids are reused once the tables are emptied, so no profile may survive,
+    # and the counters only count the current test's lookups
+    monkeypatch.setattr(user_cache, "backend", MemoryBackend(1000, 60))
+    for counter in ("hits", "misses", "errors", "hit_seconds", "miss_seconds"):
+        monkeypatch.setattr(user_cache, counter, 0)
+
+
+@pytest.fixture
+def client():
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+    # Pooled async connections are bound to the TestClient's event loop
+    async_engine.sync_engine.dispose(close=False)
+
+
+@pytest.fixture
+def record_statements():
+    """
+    `record_statements(keep=None)` returns a list that collects the SQL the
+    app's async engine runs until the test ends, only the statements
+    `keep` accepts if it is given.
+    """
+    listeners = []
+
+    def start(keep=None):
+        recorded = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if keep is None or keep(statement):
+                recorded.append(statement)
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+        listeners.append(record)
+        return recorded
+
+    yield start
+    for record in listeners:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def session():
+    db = Session()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def auth_headers():
+    return {"token": f"Bearer {create_access_token(1)}"}
+
+
+class StubSite:
+    """Serves the recorded Hacker News pages with links rewritten to itself."""
+
+    def __init__(self):
+        self.failures = {}  # path -> number of 503s to answer before the page
+        self.delays = {}  # path -> seconds to wait before answering
+        self.etags = True  # answer If-None-Match with 304 when unchanged
+        self.not_modified = []
+        self.requests = []
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site.requests.append(self.path)
+                time.sleep(site.delays.get(self.path, 0))
+                if site.failures.get(self.path, 0) > 0:
+                    site.failures[self.path] -= 1
+                    self.send_error(503)
+                    return
+                if self.path not in RECORDED_PAGES:
+                    self.send_error(404)
+                    return
+                page = (FIXTURES / RECORDED_PAGES[self.path]).read_text()
+                body = page.replace(RECORDED_SITE, site.url).encode()
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                if site.etags and self.headers.get("If-None-Match") == etag:
+                    site.not_modified.append(self.path)
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                if site.etags:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except ConnectionError:
+                    pass  # the scraper was cancelled mid-request
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+
+@pytest.fixture
+def stub_site(monkeypatch):
+    import src.endpoints.webscrap.hackernews as hackernews
+    import src.scraping.pipeline as pipeline
+
+    site = StubSite()
+    thread = threading.Thread(target=site.server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(hackernews, "HACKERNEWS_URL", site.url + "/")
+    monkeypatch.setattr(pipeline, "SCRAPE_RETRY_BACKOFF", 0.01)
+    yield site
+    site.server.shutdown()
+    site.server.server_close()
+
+
+@pytest.fixture
+def scrape_job(client, auth_headers, stub_site):
+    """Queue a scrape of the stub site and wait for the job to finish."""
+
+    def run(pages, incremental=False):
+        response = client.post(
+            "/api/hackernews/",
+            params={"n": pages, "incremental": incremental},
+            headers=auth_headers,
+        )
+        assert response.status_code == 202
+        job_id = response.json()["data"]["job_id"]
+        for _ in range(1000):
+            job = client.get(f"/api/hackernews/jobs/{job_id}", headers=auth_headers)
+            if job.json()["data"]["status"] not in ("queued", "running"):
+                return job.json()["data"]
+            time.sleep(0.01)
+        raise AssertionError(f"scrape job {job_id} did not finish")
+
+    return run
+
+
+class RedisStandIn:
+    """
+    Speaks enough of the Redis protocol for the cache backend: PING, GET,
+    SET (with EX and NX), DEL and SELECT, on a dict. Commands are recorded.
+    """
+
+    def __init__(self):
+        self.data = {}  # key -> (value, expires_at)
+        self.commands = []
+        self.reply_delay = 0.0  # seconds to wait before answering a command
+        stand_in = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def read_command(self):
+                header = self.rfile.readline()
+                if not header:
+                    return None
+                args = []
+                for _ in range(int(header[1:])):
+                    length = int(self.rfile.readline()[1:])
+                    args.append(self.rfile.read(length + 2)[:-2])
+                return args
+
+            def handle(self):
+                while (args := self.read_command()) is not None:
+                    reply = stand_in.execute(args)
+                    time.sleep(stand_in.reply_delay)
+                    self.wfile.write(reply)
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"redis://127.0.0.1:{self.server.server_address[1]}/1"
+
+    def execute(self, args):
+        command = args[0].decode().upper()
+        self.commands.append(command)
+        if command in ("PING", "SELECT"):
+            return b"+OK\r\n"
+        if command == "GET":
+            value, expires_at = self.data.get(args[1], (None, None))
+            if value is None or expires_at is not None and expires_at <= time.time():
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == "SET":
+            options = [arg.upper() for arg in args[3:]]
+            ttl = int(options[options.index(b"EX") + 1]) if b"EX" in options else None
+            if b"NX" in options and self.execute([b"GET", args[1]]) != b"$-1\r\n":
+                return b"$-1\r\n"
+            self.data[args[1]] = (args[2], ttl and time.time() + ttl)
+            return b"+OK\r\n"
+        if command == "DEL":
+            removed = [self.data.pop(key, None) for key in args[1:]]
+            return b":%d\r\n" % sum(entry is not None for entry in removed)
+        return b"-ERR unknown command\r\n"
+
+
+@pytest.fixture
+def redis_stand_in():
+    stand_in = RedisStandIn()
+    thread = threading.Thread(target=stand_in.server.serve_forever, daemon=True)
+    thread.start()
+    yield stand_in
+    stand_in.server.shutdown()
+    stand_in.server.server_close()
@@ -1,29 +1,46 @@
-import time
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi_sqlalchemy import DBSessionMiddleware
 
-from src.common.configuration import DATABASE_URI
+from src.common.configuration import PROFILE_ENABLED
+from src.common.request_log import request_log
+from src.database.connection import dispose_engines, prepare_database
+from src.database.user_cache import user_cache
+from src.endpoints.admin.admin_endpoints import admin_router
+from src.endpoints.metrics.metrics_endpoints import metrics_router
 from src.endpoints.user.user_endpoints import user_router
 from src.endpoints.user.user_extra import user_router_extra
 from src.endpoints.webscrap.hackernews import hacker_news_router
+from src.endpoints.webscrap.term_analytics import term_analytics_router
+from src.middlewares.MetricsMiddleware import MetricsMiddleware
+from src.middlewares.ProfilingMiddleware import ProfilingMiddleware
+from src.middlewares.RequestLoggerMiddleware import RequestLoggerMiddleware
+from src.scraping.jobs import scrape_jobs
 
-app = FastAPI(title="User Project")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Database work happens here rather than at import, so workers boot
+    # quickly and a database outage fails startup instead of the import
+    await prepare_database()
+    await scrape_jobs.recover()
+    yield
+    await scrape_jobs.shutdown()
+    await user_cache.close()
+    await dispose_engines()
+    request_log.close()
 
 
-# Middleware for FastAPI to handle database sessions
-app.add_middleware(DBSessionMiddleware, db_url=DATABASE_URI)
+app = FastAPI(title="User Project", lifespan=lifespan)
 
 
-# Middleware for logging requests
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    start_time = time.perf_counter()
-    response = await call_next(request)
-    process_time = time.perf_counter() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
+# Innermost, so a profile holds the request's own work; off by default so
+# requests pay nothing for it
+if PROFILE_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Middleware for logging requests and the X-Process-Time header
+app.add_middleware(RequestLoggerMiddleware)
 
 
 # Middleware for FastAPI to handle CORS
@@ -40,8 +57,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so the latency it records covers every other middleware
+app.add_middleware(MetricsMiddleware)
+
 
 # Include the router from your endpoint file
 app.include_router(user_router, prefix="/api")
 app.include_router(user_router_extra, prefix="/api")
 app.include_router(hacker_news_router, prefix="/api")
+app.include_router(term_analytics_router, prefix="/api")
+app.include_router(admin_router, prefix="/api")
+app.include_router(metrics_router)
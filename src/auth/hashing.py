@@ -1,6 +1,26 @@
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-pwd_cxt = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from src.common.configuration import (BCRYPT_ROUNDS, HASH_QUEUE_SIZE,
+                                      HASH_WORKERS)
+from src.common.metrics import (PASSWORD_HASH_SECONDS,
+                                PASSWORD_HASH_WAIT_SECONDS,
+                                PASSWORD_HASHES_PENDING, registry)
+
+# min == max == default, so any stored cost other than BCRYPT_ROUNDS is
+# flagged for a rehash on the next successful login
+pwd_cxt = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 
 
 class Hash:
@@ -10,3 +30,129 @@ class Hash:
 
     def verify(hashed_password, plain_password):
         return pwd_cxt.verify(plain_password, hashed_password)
+
+
+class HashQueueFull(HTTPException):
+    def __init__(self, pending: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{pending} password hashes already pending, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+
+def timed(function, submitted: float, *args):
+    # Runs on a bcrypt worker: time since `submitted` was spent queueing
+    operation = function.__name__
+    start = time.perf_counter()
+    PASSWORD_HASH_WAIT_SECONDS.labels(operation).observe(start - submitted)
+    try:
+        return function(*args)
+    finally:
+        PASSWORD_HASH_SECONDS.labels(operation).observe(time.perf_counter() - start)
+
+
+class HashExecutor:
+    """
+    Runs bcrypt on a small thread pool so hashing never blocks the event
+    loop (bcrypt releases the GIL). At most `workers + queue_size` calls
+    may be pending; beyond that `HashQueueFull` is raised instead of
+    letting a burst of logins queue up without bound (a 503 for the
+    client).
+    """
+
+    def __init__(self, workers: int = HASH_WORKERS, queue_size: int = HASH_QUEUE_SIZE):
+        self.workers = workers
+        self.limit = workers + queue_size
+        self.pending = 0
+        self.executor = None
+
+    async def run(self, function, *args):
+        if self.pending >= self.limit:
+            raise HashQueueFull(self.pending)
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(self.workers, "bcrypt")
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, timed, function, time.perf_counter(), *args
+            )
+        finally:
+            self.pending -= 1
+
+
+hash_executor = HashExecutor()
+
+
+@registry.on_collect
+def collect_hash_metrics():
+    PASSWORD_HASHES_PENDING.set(hash_executor.pending)
+
+
+async def hash_password(password: str) -> str:
+    return await hash_executor.run(pwd_cxt.hash, password)
+
+
+async def hash_passwords(passwords: list[str]) -> list[str]:
+    """
+    Hash a batch in parallel, `workers` at a time so interactive sign-ins
+    keep getting slots on the executor; waits rather than failing while
+    its queue is full.
+    """
+
+    async def hash_when_free(password):
+        while True:
+            try:
+                return await hash_password(password)
+            except HashQueueFull:
+                await asyncio.sleep(0.05)
+
+    hashes = []
+    for start in range(0, len(passwords), hash_executor.workers):
+        wave = passwords[start : start + hash_executor.workers]
+        hashes += await asyncio.gather(*map(hash_when_free, wave))
+    return hashes
+
+
+async def verify_password(hashed_password: str, plain_password: str):
+    """
+    Check a password off the event loop.
+
+    Returns `(valid, new_hash)`; `new_hash` is set when the password is
+    valid but the stored hash uses a different cost than BCRYPT_ROUNDS.
+    """
+    return await hash_executor.run(
+        pwd_cxt.verify_and_update, plain_password, hashed_password
+    )
+
+
+def calibrate_rounds(target_seconds: float, min_rounds: int = 4, max_rounds: int = 16):
+    """
+    The highest bcrypt cost whose hash takes at most `target_seconds` on
+    this machine (at least `min_rounds`), with the measured time.
+    """
+    CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("warm-up")
+    best = None
+    for rounds in range(min_rounds, max_rounds + 1):
+        context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+        start = time.perf_counter()
+        context.hash("calibration")
+        elapsed = time.perf_counter() - start
+        if elapsed > target_seconds and best is not None:
+            break
+        best = (rounds, elapsed)
+        # Each extra round doubles the cost; stop before a run overshoots
+        if elapsed * 2 > target_seconds:
+            break
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pick BCRYPT_ROUNDS for a target hashing latency"
+    )
+    parser.add_argument("--target-ms", type=float, default=250)
+    args = parser.parse_args()
+    rounds, seconds = calibrate_rounds(args.target_ms / 1000)
+    print(f"BCRYPT_ROUNDS={rounds}  # {seconds * 1000:.0f} ms per hash here")
@@ -1,14 +1,62 @@
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
 
-from fastapi import HTTPException, Header, Request, status
+from fastapi import Depends, HTTPException, Header, Request, status
 from jose import JWTError, jwt
 
-from src.common.configuration import (ACCESS_TOKEN_EXPIRE_DAYS, ALGORITHM,
-                                      SECRET_KEY)
+from src.common.cache import LRUCache
+from src.common.configuration import (ACCESS_TOKEN_EXPIRE_DAYS,
+                                      ADMIN_USER_IDS, ALGORITHM, SECRET_KEY,
+                                      TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
 from src.database.models import TokenData
 
 
+class TokenCache:
+    """
+    Tokens that already passed signature and expiry checks, mapped to their
+    user id, so repeat requests skip the JWT crypto.
+
+    Keyed by the SHA-256 digest of the token, so raw tokens are not kept in
+    memory. An entry expires at the token's `exp`, or after `ttl` seconds
+    if that comes first.
+    """
+
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE, ttl: int = TOKEN_CACHE_TTL):
+        self.ttl = ttl
+        self.entries = LRUCache(maxsize)
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str):
+        return self.entries.get(self.key(token))
+
+    def add(self, token: str, user_id: int, exp: float = None):
+        expires_at = time.time() + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        self.entries.set(self.key(token), user_id, expires_at)
+
+    def invalidate(self, token: str):
+        self.entries.delete(self.key(token))
+
+    def invalidate_user(self, user_id: int) -> int:
+        """Forget every cached token of `user_id`; returns how many."""
+        return self.entries.delete_where(lambda cached: cached == user_id)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        return self.entries.stats()
+
+
+token_cache = TokenCache()
+
+
 def create_access_token(user_id: int, expires_delta: timedelta | None = None):
     to_encode = {"user_id": user_id}
     if expires_delta:
@@ -20,7 +68,7 @@ def create_access_token(user_id: int, expires_delta: timedelta | None = None):
     return encoded_jwt
 
 
-def verify_token(
+async def verify_token(
     request: Request,
     token: Annotated[str | None, Header(description="Bearer token")] = None,
 ):
@@ -39,12 +87,24 @@ def verify_token(
             raise bearer_exception
 
         bearer_token = token.split(" ")[1]
-        payload = jwt.decode(bearer_token, SECRET_KEY, algorithms=[ALGORITHM])
+        user_id = token_cache.get(bearer_token)
+        if user_id is not None:
+            return user_id
 
-        print(payload)
+        payload = jwt.decode(bearer_token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: int = payload.get("user_id")
         if user_id is None:
             raise credentials_exception
+        token_cache.add(bearer_token, user_id, payload.get("exp"))
         return user_id
     except JWTError:
         raise credentials_exception
+
+
+async def verify_admin(user_id: Annotated[int, Depends(verify_token)]):
+    """`verify_token`, for users listed in ADMIN_USER_IDS only."""
+    if user_id not in ADMIN_USER_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
+        )
+    return user_id
@@ -0,0 +1,220 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+
+class LRUCache:
+    """
+    A bounded, thread-safe LRU map whose entries may carry an absolute
+    expiry time (`time.time()` seconds), with hit/miss/eviction counters.
+    """
+
+    def __init__(self, maxsize: int, clock=time.time):
+        self.maxsize = maxsize
+        self.clock = clock
+        self.entries = OrderedDict()  # key -> (value, expires_at)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= self.clock():
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, expires_at: float = None):
+        if self.maxsize <= 0:
+            return
+        with self.lock:
+            self._store(key, value, expires_at)
+
+    def add(self, key, value, expires_at: float = None) -> bool:
+        """`set`, unless `key` holds an unexpired value; returns whether it did."""
+        if self.maxsize <= 0:
+            return False
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > self.clock()):
+                return False
+            self._store(key, value, expires_at)
+            return True
+
+    def _store(self, key, value, expires_at):
+        self.entries[key] = (value, expires_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def delete_where(self, predicate) -> int:
+        """Drop every entry whose value matches `predicate`; returns how many."""
+        with self.lock:
+            keys = [key for key, (value, _) in self.entries.items() if predicate(value)]
+            for key in keys:
+                del self.entries[key]
+        return len(keys)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class CacheError(Exception):
+    pass
+
+
+class MemoryBackend:
+    """Per-process cache backend: an `LRUCache` of bytes with a TTL."""
+
+    name = "memory"
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.ttl = ttl
+        self.entries = LRUCache(maxsize)
+
+    async def get(self, key: str):
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float = None):
+        self.entries.set(key, value, time.time() + (ttl or self.ttl))
+
+    async def add(self, key: str, value: bytes) -> bool:
+        """Store `value` only if `key` holds none; returns whether it did."""
+        return self.entries.add(key, value, time.time() + self.ttl)
+
+    async def delete(self, key: str):
+        self.entries.delete(key)
+
+    async def close(self):
+        self.entries.clear()
+
+
+def encode_command(*args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader):
+    line = await reader.readuntil(b"\r\n")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        raise CacheError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        return None if length < 0 else (await reader.readexactly(length + 2))[:-2]
+    if kind == b"*":
+        length = int(rest)
+        return None if length < 0 else [await read_reply(reader) for _ in range(length)]
+    raise CacheError(f"unexpected reply {line!r}")
+
+
+class RedisBackend:
+    """
+    Cache backend on a Redis-protocol server, shared by every worker process
+    pointed at it. Only GET, SET with EX (and NX) and DEL are used, over
+    one connection per event loop that is opened on first use.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, ttl: float, timeout: float = 1.0):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.db = int(parts.path.strip("/") or 0)
+        self.password = parts.password
+        self.ttl = max(1, int(ttl))
+        self.timeout = timeout
+        self.loop = None
+        self.lock = None
+        self.reader = self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self._send("AUTH", self.password)
+        if self.db:
+            await self._send("SELECT", self.db)
+
+    async def _send(self, *args):
+        self.writer.write(encode_command(*args))
+        await self.writer.drain()
+        return await read_reply(self.reader)
+
+    async def command(self, *args):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            # Streams and locks belong to the loop that created them
+            self.loop, self.lock = loop, asyncio.Lock()
+            self.reader = self.writer = None
+        async with self.lock:
+            try:
+                if self.writer is None:
+                    await asyncio.wait_for(self._connect(), self.timeout)
+                return await asyncio.wait_for(self._send(*args), self.timeout)
+            except (OSError, EOFError, asyncio.TimeoutError) as e:
+                self._disconnect()
+                raise CacheError(f"{self.host}:{self.port}: {e!r}") from e
+            except BaseException:
+                # Cancelled, say, between sending the command and reading its
+                # reply: the next command on this connection would read it
+                self._disconnect()
+                raise
+
+    def _disconnect(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def get(self, key: str):
+        return await self.command("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl: float = None):
+        ttl = max(1, int(ttl)) if ttl else self.ttl
+        await self.command("SET", key, value, "EX", ttl)
+
+    async def add(self, key: str, value: bytes) -> bool:
+        """Store `value` only if `key` holds none; returns whether it did."""
+        return await self.command("SET", key, value, "EX", self.ttl, "NX") is not None
+
+    async def delete(self, key: str):
+        await self.command("DEL", key)
+
+    async def close(self):
+        if self.writer is not None and self.loop is asyncio.get_running_loop():
+            self.writer.close()
+        self.reader = self.writer = None
@@ -0,0 +1,210 @@
+import csv
+import io
+import re
+import tempfile
+from datetime import datetime
+
+from anyio.to_thread import run_sync
+from starlette.responses import StreamingResponse
+
+from src.common.configuration import (EXPORT_FILE_CHUNK,
+                                      EXPORT_PARQUET_ROW_GROUP,
+                                      STREAM_YIELD_PER)
+from src.database.connection import async_session
+
+# Control characters the XLSX format cannot store
+XLSX_ILLEGAL_CHARACTERS = re.compile(r"[\000-\010]|[\013-\014]|[\016-\037]")
+# Spreadsheets may evaluate text starting with these as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class ChunkSink:
+    """Write-only file object whose contents are handed out between writes."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+class CsvExport:
+    media_type = "text/csv"  # Starlette adds the utf-8 charset
+    extension = "csv"
+
+    def __init__(self, columns):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.writer.writerow([column.name for column in columns])
+
+    @staticmethod
+    def cell(value):
+        if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+            return "'" + value  # shown as text, the way a spreadsheet quotes it
+        return value
+
+    def write(self, rows) -> bytes:
+        self.writer.writerows([self.cell(value) for value in row] for row in rows)
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data.encode()
+
+    def finish(self):
+        yield self.write([])
+
+    def close(self):
+        pass
+
+
+class XlsxExport:
+    """
+    openpyxl's write-only mode keeps rows in a temporary file rather than
+    in memory (given lxml; without it the sheet is built in memory); the
+    workbook is zipped into a second file once complete.
+    """
+
+    media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    extension = "xlsx"
+
+    def __init__(self, columns, title="export"):
+        from openpyxl import Workbook
+
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(title)
+        self.sheet.append([column.name for column in columns])
+        self.file = tempfile.TemporaryFile()
+
+    def cell(self, value):
+        if not isinstance(value, str):
+            return value
+        value = XLSX_ILLEGAL_CHARACTERS.sub("", value)
+        if value.startswith(FORMULA_PREFIXES):
+            # Stored as quoted text; openpyxl would write "=..." as a formula,
+            # and spreadsheets would read the others as one once edited
+            from openpyxl.cell import WriteOnlyCell
+
+            cell = WriteOnlyCell(self.sheet, value)
+            cell.data_type = "s"
+            cell.quotePrefix = True
+            return cell
+        return value
+
+    def write(self, rows) -> bytes:
+        for row in rows:
+            self.sheet.append([self.cell(value) for value in row])
+        return b""
+
+    def finish(self):
+        self.workbook.save(self.file)
+        self.file.seek(0)
+        while chunk := self.file.read(EXPORT_FILE_CHUNK):
+            yield chunk
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetExport:
+    """Rows are buffered up to one row group, which is written and sent."""
+
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self, columns, row_group_size: int = None):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        arrow_types = {
+            int: pa.int64(),
+            float: pa.float64(),
+            bool: pa.bool_(),
+            datetime: pa.timestamp("us", tz="UTC"),
+        }
+        self.schema = pa.schema(
+            [
+                (column.name, arrow_types.get(column.type.python_type, pa.string()))
+                for column in columns
+            ]
+        )
+        self.row_group_size = row_group_size or EXPORT_PARQUET_ROW_GROUP
+        self.sink = ChunkSink()
+        self.writer = pq.ParquetWriter(self.sink, self.schema)
+        self.batches = []
+        self.buffered = 0
+
+    def write(self, rows) -> bytes:
+        if rows:
+            arrays = [
+                self.pa.array(values, type=field.type)
+                for values, field in zip(zip(*rows), self.schema)
+            ]
+            self.batches.append(self.pa.record_batch(arrays, schema=self.schema))
+            self.buffered += len(rows)
+        if self.buffered >= self.row_group_size:
+            self.writer.write_table(self.pa.Table.from_batches(self.batches))
+            self.batches, self.buffered = [], 0
+        return self.sink.drain()
+
+    def finish(self):
+        if self.batches:
+            self.writer.write_table(self.pa.Table.from_batches(self.batches))
+        self.writer.close()
+        yield self.sink.drain()
+
+    def close(self):
+        pass
+
+
+EXPORTS = {
+    export.extension: export for export in (CsvExport, XlsxExport, ParquetExport)
+}
+
+
+async def export_chunks(query, export):
+    # A session of its own: the response outlives the request's session
+    try:
+        async with async_session() as session:
+            result = await session.stream(
+                query.execution_options(yield_per=STREAM_YIELD_PER)
+            )
+            async for rows in result.partitions():
+                if data := await run_sync(export.write, rows):
+                    yield data
+        chunks = export.finish()
+        while (data := await run_sync(next, chunks, None)) is not None:
+            if data:
+                yield data
+    finally:
+        export.close()
+
+
+def export_response(query, format: str, name: str) -> StreamingResponse:
+    """
+    Stream every row of `query` as a `format` file ("csv", "xlsx" or
+    "parquet") from a server-side cursor, with chunked transfer encoding.
+    """
+    export = EXPORTS[format](query.selected_columns)
+    return StreamingResponse(
+        export_chunks(query, export),
+        media_type=export.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'},
+    )
@@ -0,0 +1,318 @@
+import bisect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+# Upper bounds in seconds; wide enough for a cached read and a bcrypt login
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1, 0.5, 2.5
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Starlette appends "; charset=utf-8" to text/* media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e16:
+        return f"{value:.1f}"
+    return repr(value)
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def format_labels(names, values, extra="") -> str:
+    pairs = [
+        f'{name}="{escape_label(str(value))}"' for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Value:
+    """A counter or gauge sample; `set` replaces it, `inc`/`dec` adjust it."""
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Buckets:
+    """Observation counts per bucket, plus their sum, for one label set."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last one is +Inf
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        # bisect_left, since a bucket counts values less than *or equal to* it
+        index = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Metric(ABC):
+    """
+    One metric family: a sample per combination of label values, created
+    on first use by `labels()` and kept for the life of the process.
+    """
+
+    type = None
+
+    def __init__(self, name: str, help: str, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.children = {}
+        self.lock = threading.Lock()
+        if not self.label_names:
+            self.default = self.labels()
+
+    @abstractmethod
+    def child(self):
+        """A new sample, for one combination of label values."""
+
+    def labels(self, *values):
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} takes labels {self.label_names}")
+            with self.lock:
+                child = self.children.setdefault(values, self.child())
+        return child
+
+    def samples(self, values, child):
+        labels = format_labels(self.label_names, values)
+        yield f"{self.name}{labels} {format_value(child.value)}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for values, child in sorted(self.children.items()):
+            lines.extend(self.samples(values, child))
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def child(self):
+        return Value()
+
+    def inc(self, amount: float = 1.0):
+        self.default.inc(amount)
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def child(self):
+        return Value()
+
+    def inc(self, amount: float = 1.0):
+        self.default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self.default.dec(amount)
+
+    def set(self, value: float):
+        self.default.set(value)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.bounds = tuple(sorted(map(float, buckets)))
+        super().__init__(name, help, labels)
+
+    def child(self):
+        return Buckets(self.bounds)
+
+    def observe(self, value: float):
+        self.default.observe(value)
+
+    def samples(self, values, child):
+        with child.lock:
+            counts, total = list(child.counts), child.sum
+        cumulative = 0
+        for bound, count in zip(self.bounds + (math.inf,), counts):
+            cumulative += count
+            le = format_labels(self.label_names, values, f'le="{format_value(bound)}"')
+            yield f"{self.name}_bucket{le} {cumulative}"
+        labels = format_labels(self.label_names, values)
+        yield f"{self.name}_sum{labels} {format_value(total)}"
+        yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    """
+    The metrics of this worker process. Collectors registered with
+    `on_collect` refresh gauges read from elsewhere (pool sizes, queue
+    depths) just before each scrape.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def on_collect(self, collector):
+        self.collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        for collector in self.collectors:
+            collector()
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time to serve a request, by route template.",
+        ("method", "route", "status"),
+    )
+)
+REQUESTS_IN_FLIGHT = registry.register(
+    Gauge("http_requests_in_flight", "Requests being served.", ("method",))
+)
+REQUEST_DB_QUERIES = registry.register(
+    Histogram(
+        "http_request_db_queries",
+        "Database queries run while serving a request.",
+        ("method", "route"),
+        QUERY_COUNT_BUCKETS,
+    )
+)
+REQUEST_DB_SECONDS = registry.register(
+    Histogram(
+        "http_request_db_seconds",
+        "Time spent in database queries while serving a request.",
+        ("method", "route"),
+    )
+)
+DB_QUERY_SECONDS = registry.register(
+    Histogram(
+        "db_query_duration_seconds",
+        "Time to execute one statement, from cursor execute to its return.",
+        buckets=QUERY_BUCKETS,
+    )
+)
+DB_POOL_CONNECTIONS = registry.register(
+    Gauge(
+        "db_pool_connections",
+        "Pooled connections by engine and state.",
+        ("engine", "state"),
+    )
+)
+PASSWORD_HASH_SECONDS = registry.register(
+    Histogram(
+        "password_hash_duration_seconds",
+        "Time bcrypt spends on one hash or verification.",
+        ("operation",),
+    )
+)
+PASSWORD_HASH_WAIT_SECONDS = registry.register(
+    Histogram(
+        "password_hash_wait_seconds",
+        "Time a hash or verification waits for a free bcrypt worker.",
+        ("operation",),
+    )
+)
+PASSWORD_HASHES_PENDING = registry.register(
+    Gauge("password_hashes_pending", "Hashes running or waiting for a worker.")
+)
+SCRAPE_STAGE_SECONDS = registry.register(
+    Histogram(
+        "scrape_stage_duration_seconds",
+        "Time one scraped page spends in each pipeline stage.",
+        ("stage",),
+        STAGE_BUCKETS,
+    )
+)
+REQUEST_LOG_RECORDS = registry.register(
+    Counter(
+        "request_log_records_total",
+        "Request log records by outcome: written, dropped or sampled out.",
+        ("outcome",),
+    )
+)
+
+
+class RequestQueries:
+    """Queries run on behalf of the current request."""
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Set by MetricsMiddleware; tasks and threads the request starts inherit it
+request_queries: ContextVar[RequestQueries] = ContextVar("request_queries")
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    DB_QUERY_SECONDS.observe(elapsed)
+    queries = request_queries.get(None)
+    if queries is not None:
+        queries.count += 1
+        queries.seconds += elapsed
+
+
+def handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+
+def instrument_engine(engine):
+    """Time every statement `engine` (a sync Engine) runs."""
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
@@ -0,0 +1,39 @@
+import json
+
+from starlette.responses import StreamingResponse
+
+from src.common.configuration import STREAM_YIELD_PER
+from src.database.connection import async_session
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def keyset_page(query, id_column, after: int | None, limit: int | None):
+    """Order `query` by `id_column` and keep rows strictly after the cursor."""
+    if after is not None:
+        query = query.where(id_column > after)
+    query = query.order_by(id_column)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def next_page_headers(rows: list[dict], limit: int | None) -> dict:
+    # A full page means there may be more rows; hand back the cursor for them
+    if limit is None or len(rows) < limit:
+        return {}
+    return {"X-Next-After": str(rows[-1]["id"])}
+
+
+async def ndjson_rows(query):
+    # Own session: the stream outlives the handler that built the query
+    async with async_session() as session:
+        result = await session.stream(
+            query.execution_options(yield_per=STREAM_YIELD_PER)
+        )
+        async for row in result.mappings():
+            yield json.dumps(dict(row)) + "\n"
+
+
+def ndjson_response(query) -> StreamingResponse:
+    return StreamingResponse(ndjson_rows(query), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,181 @@
+import cProfile
+import io
+import itertools
+import marshal
+import pstats
+import threading
+import time
+import types
+from collections import OrderedDict, defaultdict
+
+from src.common.configuration import PROFILE_KEEP
+
+# Paths whose share of their root's time is below this are left out of
+# collapsed stacks, which keeps the output to what a flame graph can show
+COLLAPSED_MIN_FRACTION = 0.0005
+COLLAPSED_MAX_DEPTH = 200
+
+
+@types.coroutine
+def profiled(coroutine, profiler: cProfile.Profile):
+    """
+    Await `coroutine` with `profiler` enabled only while it is running.
+
+    The profiler is switched off whenever the coroutine suspends, so other
+    requests served by the event loop in the meantime are not recorded,
+    and time spent waiting (on the database, the network) is not counted
+    as time spent in the function that awaited.
+    """
+    send, value = coroutine.send, None
+    while True:
+        profiler.enable()
+        try:
+            suspended = send(value)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            profiler.disable()
+        try:
+            value = yield suspended
+            send = coroutine.send
+        except GeneratorExit:
+            coroutine.close()
+            raise
+        except BaseException as error:
+            value = error
+            send = coroutine.throw
+
+
+def function_name(function) -> str:
+    filename, line, name = function
+    if filename == "~":
+        return name  # a builtin, e.g. <method 'execute' of ...>
+    return f"{name} ({filename}:{line})"
+
+
+def collapsed_stacks(stats: dict) -> str:
+    """
+    Brendan Gregg's collapsed-stack format ("a;b;c <microseconds>") for
+    flamegraph.pl or speedscope, rebuilt from cProfile's caller graph.
+
+    cProfile keeps one caller level, not whole stacks, so a function
+    called from several places has its time split between them in
+    proportion to the time each call site spent in it.
+    """
+    callees = defaultdict(list)
+    for function, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees[caller].append((function, edge[3]))
+    roots = [
+        function
+        for function, (_, _, _, _, callers) in stats.items()
+        if not any(caller in stats for caller in callers)
+    ]
+
+    total = sum(stats[root][3] for root in roots) or 1.0
+    totals = defaultdict(float)
+    on_path = set()
+
+    def walk(function, path, fraction, depth):
+        _, _, inline, cumulative, _ = stats[function]
+        path = path + (function_name(function),)
+        totals[path] += inline * fraction
+        if depth >= COLLAPSED_MAX_DEPTH:
+            return
+        for callee, edge_seconds in callees[function]:
+            callee_cumulative = stats[callee][3]
+            if not callee_cumulative or callee in on_path:
+                continue
+            share = fraction * edge_seconds / callee_cumulative
+            if share * callee_cumulative < COLLAPSED_MIN_FRACTION * total:
+                continue
+            on_path.add(callee)
+            walk(callee, path, share, depth + 1)
+            on_path.discard(callee)
+
+    for root in roots:
+        on_path.add(root)
+        walk(root, (), 1.0, 0)
+        on_path.discard(root)
+    return "".join(
+        f"{';'.join(path)} {round(seconds * 1e6)}\n"
+        for path, seconds in totals.items()
+        if round(seconds * 1e6) > 0
+    )
+
+
+class Profile:
+    """One profiled request: what it was, its timings and its raw stats."""
+
+    def __init__(self, profile_id: int, method: str, path: str):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.status = None
+        self.trigger = None
+        self.started_at = time.time()
+        self.wall_seconds = 0.0
+        self.db_queries = None
+        self.db_seconds = None
+        self.stats = {}
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "trigger": self.trigger,
+            "started_at": self.started_at,
+            "wall_ms": self.wall_seconds * 1000,
+            # Time the request's own task ran; the rest of wall_ms it waited
+            "profiled_ms": sum(entry[2] for entry in self.stats.values()) * 1000,
+            "db_queries": self.db_queries,
+            "db_ms": None if self.db_seconds is None else self.db_seconds * 1000,
+        }
+
+    def pstats_bytes(self) -> bytes:
+        """The stats as `pstats.Stats.dump_stats` writes them."""
+        return marshal.dumps(self.stats)
+
+    def text(self, sort: str = "cumulative", limit: int = 50) -> str:
+        # pstats.Stats takes over the stats of a profiler-like object
+        source = types.SimpleNamespace(
+            stats=dict(self.stats), create_stats=lambda: None
+        )
+        output = io.StringIO()
+        pstats.Stats(source, stream=output).sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+    def collapsed(self) -> str:
+        return collapsed_stacks(self.stats)
+
+
+class ProfileStore:
+    """The last `keep` profiles of this worker process, oldest dropped first."""
+
+    def __init__(self, keep: int = PROFILE_KEEP):
+        self.keep = keep
+        self.profiles = OrderedDict()
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def new(self, method: str, path: str) -> Profile:
+        return Profile(next(self.ids), method, path)
+
+    def add(self, profile: Profile):
+        with self.lock:
+            self.profiles[profile.id] = profile
+            while len(self.profiles) > self.keep:
+                self.profiles.popitem(last=False)
+
+    def get(self, profile_id: int) -> Profile:
+        return self.profiles.get(profile_id)
+
+    def summaries(self) -> list[dict]:
+        with self.lock:
+            profiles = list(self.profiles.values())
+        return [profile.summary() for profile in reversed(profiles)]
+
+
+profile_store = ProfileStore()
@@ -0,0 +1,97 @@
+import csv
+import json
+
+from src.common.configuration import USER_IMPORT_MAX_LINE_BYTES
+
+# (line number, record, error): a record is None when the line is rejected
+
+
+async def lines(chunks, max_length: int = None):
+    """
+    Lines of a streamed byte body, without their line endings, and None in
+    place of lines longer than `max_length` bytes, which are not buffered.
+    """
+    max_length = max_length or USER_IMPORT_MAX_LINE_BYTES
+    pending, length = [], 0  # the unfinished line, split across chunks
+    async for chunk in chunks:
+        *complete, rest = chunk.split(b"\n")
+        for end in complete:
+            if length + len(end) > max_length:
+                yield None
+            else:
+                pending.append(end)
+                yield b"".join(pending).rstrip(b"\r")
+            pending, length = [], 0
+        length += len(rest)
+        if length > max_length:
+            pending.clear()
+        else:
+            pending.append(rest)
+    if length > max_length:
+        yield None
+    elif length:
+        yield b"".join(pending).rstrip(b"\r")
+
+
+def too_long() -> str:
+    return f"line longer than {USER_IMPORT_MAX_LINE_BYTES} bytes"
+
+
+async def jsonl_records(chunks):
+    """One JSON object per line; blank lines are skipped."""
+    number = 0
+    async for line in lines(chunks):
+        number += 1
+        if line is None:
+            yield number, None, too_long()
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "expected a JSON object"
+            continue
+        yield number, record, None
+
+
+async def csv_records(chunks):
+    """
+    Rows of a CSV upload keyed by its header row. Quoted fields may span
+    lines; empty fields become None.
+    """
+    header = None
+    pending, quotes, number = [], 0, 0
+    async for line in lines(chunks):
+        number += 1
+        if line is None:
+            pending, quotes = [], 0
+            yield number, None, too_long()
+            continue
+        try:
+            pending.append(line.decode("utf-8"))
+        except UnicodeDecodeError as e:
+            pending, quotes = [], 0
+            yield number, None, f"invalid UTF-8: {e}"
+            continue
+        quotes += pending[-1].count('"')
+        if quotes % 2:
+            continue  # inside a quoted field
+        first, text = number - len(pending) + 1, "\n".join(pending)
+        pending, quotes = [], 0
+        if not text.strip():
+            continue
+
+        fields = next(csv.reader([text]))
+        if header is None:
+            header = [field.strip() for field in fields]
+        elif len(fields) != len(header):
+            yield first, None, f"expected {len(header)} fields, got {len(fields)}"
+        else:
+            record = {key: value or None for key, value in zip(header, fields)}
+            yield first, record, None
+    if pending:
+        yield number - len(pending) + 1, None, "unterminated quoted field"
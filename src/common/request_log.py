@@ -0,0 +1,116 @@
+import random
+import sys
+import threading
+from collections import deque
+
+from src.common.configuration import (REQUEST_LOG_FLUSH_INTERVAL,
+                                      REQUEST_LOG_PATH, REQUEST_LOG_QUEUE_SIZE,
+                                      REQUEST_LOG_SAMPLE_RATE)
+from src.common.metrics import REQUEST_LOG_RECORDS, registry
+from src.common.responses import dumps
+
+FIELDS = ("ts", "method", "path", "status", "duration_ms", "client", "bytes")
+
+
+class RequestLog:
+    """
+    Request records queued in memory and written as JSON lines by a
+    background thread, so the event loop never waits on the log file.
+
+    `add` is the only call on the request path: it keeps a sample of
+    `sample_rate` of the requests (and every 5xx) and appends a tuple to
+    a bounded queue. A full queue drops the record and counts it rather
+    than letting a slow disk hold requests up.
+    """
+
+    def __init__(
+        self,
+        path: str = REQUEST_LOG_PATH,
+        sample_rate: float = REQUEST_LOG_SAMPLE_RATE,
+        queue_size: int = REQUEST_LOG_QUEUE_SIZE,
+        flush_interval: float = REQUEST_LOG_FLUSH_INTERVAL,
+    ):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.queue_size = queue_size
+        self.flush_interval = flush_interval
+        self.queue = deque()
+        self.written = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.stopping = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def add(self, record: tuple):
+        """Queue `record`, a tuple of FIELDS, unless sampled out or full."""
+        sampled = self.sample_rate >= 1.0 or random.random() < self.sample_rate
+        if not sampled and record[3] < 500:
+            self.sampled_out += 1
+            return
+        if len(self.queue) >= self.queue_size:
+            self.dropped += 1
+            return
+        self.queue.append(record)
+        if self.thread is None:
+            self.start()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.stopping = threading.Event()
+                self.thread = threading.Thread(
+                    target=self.run, args=(self.stopping,), name="request-log",
+                    daemon=True,
+                )
+                self.thread.start()
+
+    def run(self, stopping: threading.Event):
+        stream = sys.stderr.buffer if self.path == "-" else open(self.path, "ab")
+        try:
+            while not stopping.wait(self.flush_interval):
+                self.flush(stream)
+            self.flush(stream)
+        finally:
+            if stream is not sys.stderr.buffer:
+                stream.close()
+
+    def flush(self, stream):
+        lines = []
+        while True:
+            try:
+                record = self.queue.popleft()
+            except IndexError:
+                break
+            lines.append(dumps(dict(zip(FIELDS, record))))
+        if lines:
+            stream.write(b"\n".join(lines) + b"\n")
+            stream.flush()
+            self.written += len(lines)
+
+    def close(self):
+        """Write what is queued and stop the writer thread."""
+        with self.lock:
+            thread, self.thread = self.thread, None
+            if thread is not None:
+                self.stopping.set()
+        if thread is not None:
+            thread.join()
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self.queue),
+            "written": self.written,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+        }
+
+
+request_log = RequestLog()
+
+
+@registry.on_collect
+def collect_request_log_metrics():
+    for outcome, count in request_log.stats().items():
+        if outcome != "queued":
+            REQUEST_LOG_RECORDS.labels(outcome).set(count)
@@ -0,0 +1,67 @@
+import json
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder writes the same document
+    orjson = None
+
+
+def dumps_stdlib(content) -> bytes:
+    # Exactly what Starlette's JSONResponse renders
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def dumps(content) -> bytes:
+    """
+    Compact UTF-8 JSON, the same document `JSONResponse` would send.
+
+    orjson is used when it is installed; content it rejects (integers
+    beyond 64 bits, non-string keys) goes through the stdlib encoder.
+    The two spell floats below 1e-4 or from 1e16 up differently
+    ("1e-5" / "1e-05"), which parse to the same value.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content)
+        except orjson.JSONEncodeError:
+            pass
+    return dumps_stdlib(content)
+
+
+class EnvelopeResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def envelope_response(
+    message: str,
+    data=None,
+    status_code: int = 200,
+    success: bool = True,
+    headers: dict = None,
+) -> EnvelopeResponse:
+    """
+    The `success/message/data/status_code` envelope of `UserResponse`,
+    `WebscrapResponse` and `AdminResponse`, built as a plain dict.
+
+    Same JSON as `JSONResponse(content=response.dict())`, without
+    validating the model and copying `data` on the way.
+    """
+    return EnvelopeResponse(
+        {
+            "success": success,
+            "message": message,
+            "data": data,
+            "status_code": status_code,
+        },
+        status_code=status_code,
+        headers=headers,
+    )
@@ -0,0 +1,107 @@
+import multiprocessing
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+
+from src.common.configuration import TEXT_PROCESS_WORKERS
+
+# Characters that exclude a word from the description word count
+IGNORE_CHARS = frozenset(".,:;'\"`")
+
+# A sentence of plain words, optionally followed by "," or ":", ending in an
+# optional ".". For these NLTK's Treebank rules reduce to splitting the
+# punctuation off, so one precompiled regex gives identical tokens.
+SIMPLE_SENTENCE = re.compile(
+    r"[A-Za-z0-9]+(?:-[A-Za-z0-9]+)*"
+    r"(?:[,:]?\s+[A-Za-z0-9]+(?:-[A-Za-z0-9]+)*)*\.?"
+)
+SIMPLE_TOKEN = re.compile(r"[A-Za-z0-9]+(?:-[A-Za-z0-9]+)*|[,:.]")
+# Words the Treebank tokenizer splits in two ("cannot" -> "can", "not")
+CONTRACTION_WORD = re.compile(r"(?i)\b(?:cannot|gimme|gonna|gotta|lemme|wanna)\b")
+
+
+# NLTK takes a few hundred milliseconds to import, so it is loaded on the
+# first description rather than at application start
+@lru_cache(maxsize=None)
+def stop_words() -> frozenset:
+    from nltk.corpus import stopwords
+
+    return frozenset(stopwords.words("english"))
+
+
+@lru_cache(maxsize=None)
+def sentence_tokenizer():
+    import nltk.data
+
+    return nltk.data.load("tokenizers/punkt/english.pickle")
+
+
+@lru_cache(maxsize=None)
+def word_tokenizer():
+    from nltk.tokenize import NLTKWordTokenizer
+
+    return NLTKWordTokenizer()
+
+
+@lru_cache(maxsize=None)
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    # Lives as long as the process so worker start-up is paid once; spawned
+    # rather than forked because the server process runs threads
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def tokenize(text: str) -> list[str]:
+    """Same tokens as `nltk.word_tokenize(text)`."""
+    tokens = []
+    for sentence in sentence_tokenizer().tokenize(text):
+        stripped = sentence.strip()
+        if SIMPLE_SENTENCE.fullmatch(stripped) and not CONTRACTION_WORD.search(
+            stripped
+        ):
+            tokens += SIMPLE_TOKEN.findall(stripped)
+        else:
+            tokens += word_tokenizer().tokenize(sentence)
+    return tokens
+
+
+def generalise_description(description: str) -> str:
+    """The description without English stop words, tokens joined by spaces."""
+    ignored = stop_words()
+    return " ".join(
+        word for word in tokenize(description) if word.lower() not in ignored
+    )
+
+
+def count_words(description: str) -> dict[str, int]:
+    """Word counts, most frequent first, skipping words with punctuation."""
+    counts = Counter(
+        word for word in description.split() if IGNORE_CHARS.isdisjoint(word)
+    )
+    # sorted() is stable, so ties keep their first-seen order
+    return dict(sorted(counts.items(), key=itemgetter(1), reverse=True))
+
+
+def process_description(description: str) -> tuple[str, dict[str, int]]:
+    generalised = generalise_description(description)
+    return generalised, count_words(generalised)
+
+
+def process_descriptions(
+    descriptions: list[str], workers: int = None, chunksize: int = None
+) -> list[tuple[str, dict[str, int]]]:
+    """
+    Generalised description and word count for each description, in order.
+
+    With `workers` > 1 the batch is spread over a shared process pool,
+    which pays off for thousands of descriptions; tiny batches run
+    in-process.
+    """
+    workers = TEXT_PROCESS_WORKERS if workers is None else workers
+    if workers <= 1 or len(descriptions) < 2 * workers:
+        return [process_description(description) for description in descriptions]
+
+    chunksize = chunksize or max(1, len(descriptions) // (workers * 4))
+    pool = process_pool(workers)
+    return list(pool.map(process_description, descriptions, chunksize=chunksize))
@@ -0,0 +1,245 @@
+import json
+from datetime import date, datetime, timezone
+
+from sqlalchemy import inspect, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.common.configuration import ARTICLE_INSERT_BATCH_SIZE, ARTICLE_INSERT_COPY
+from src.database.schema import (GeneralisedDescription, GeneralisedWordCount,
+                                 ScrapedPage, WebScraper)
+
+SCRAPER_COLUMNS = ("description", "image", "titles", "url", "scraped_on")
+DESCRIPTION_COLUMNS = ("id", "description", "web_scraper_id")
+WORD_COUNT_COLUMNS = ("word_count_desc", "generalised_description_id")
+
+# COPY cannot skip conflicting rows, so articles are staged and moved over
+POSTGRES_STAGING = """
+    CREATE TEMPORARY TABLE IF NOT EXISTS webscraps_incoming (
+        description text, image text, titles text, url text, scraped_on date
+    ) ON COMMIT DELETE ROWS
+"""
+POSTGRES_MOVE_STAGED = """
+    WITH moved AS (
+        DELETE FROM webscraps_incoming
+        RETURNING description, image, titles, url, scraped_on
+    )
+    INSERT INTO webscraps (description, image, titles, url, scraped_on)
+    SELECT description, image, titles, url, scraped_on FROM moved
+    ON CONFLICT (url) DO NOTHING
+    RETURNING url, id
+"""
+
+
+# Whether webscraps has its unique URL index. Databases holding duplicate
+# URLs from before it existed only get a plain index until they are
+# deduplicated (see src.database.migrations); meanwhile known URLs are
+# looked up before inserting instead of being skipped by ON CONFLICT
+unique_urls = True
+
+
+def check_url_index(connection):
+    global unique_urls
+    indexes = inspect(connection).get_indexes(WebScraper.__tablename__)
+    unique_urls = any(index["name"] == "ux_webscraps_url" for index in indexes)
+
+
+def scraper_row(article: dict, scraped_on: date) -> dict:
+    return {
+        "description": article["description"],
+        "image": article["image_source"],
+        "titles": article["title"],
+        "url": article["url"],
+        "scraped_on": scraped_on,
+    }
+
+
+def unique_by_url(articles: list[dict]) -> list[dict]:
+    first = {}
+    for article in articles:
+        first.setdefault(article["url"], article)
+    return list(first.values())
+
+
+async def known_urls(session, urls: list[str]) -> set[str]:
+    """The subset of `urls` that is already stored."""
+    if not urls:
+        return set()
+    result = await session.execute(
+        select(WebScraper.url).where(WebScraper.url.in_(urls))
+    )
+    return set(result.scalars())
+
+
+async def returning_ids(session, model, rows: list[dict]) -> list[int]:
+    if session.bind.dialect.name == "postgresql":
+        statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+        return (await session.execute(statement, rows)).scalars().all()
+    # SQLite numbers the rows of one VALUES list in order but does not
+    # promise RETURNING order, and asking SQLAlchemy to sort the result
+    # makes it fall back to one statement per row
+    statement = insert(model).values(rows).returning(model.id)
+    return sorted((await session.execute(statement)).scalars())
+
+
+async def insert_dependents(session, articles: list[dict], scraper_ids: dict):
+    """Generalised description and word count rows of newly inserted articles."""
+    articles = [article for article in articles if article["url"] in scraper_ids]
+    if not articles:
+        return
+    description_ids = await returning_ids(
+        session,
+        GeneralisedDescription,
+        [
+            {
+                "description": article["generalised_description"],
+                "web_scraper_id": scraper_ids[article["url"]],
+            }
+            for article in articles
+        ],
+    )
+    await session.execute(
+        insert(GeneralisedWordCount),
+        [
+            {
+                "word_count_desc": json.dumps(article["word_count"]),
+                "generalised_description_id": description_id,
+            }
+            for article, description_id in zip(articles, description_ids)
+        ],
+    )
+
+
+async def insert_returning(
+    session, articles: list[dict], scraped_on: date
+) -> dict[str, int]:
+    """One multi-row INSERT per table; known URLs are skipped by ON CONFLICT."""
+    dialect = session.bind.dialect.name
+    upsert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = upsert(WebScraper).returning(WebScraper.url, WebScraper.id)
+    if unique_urls:
+        statement = statement.on_conflict_do_nothing(index_elements=["url"])
+    rows = [scraper_row(article, scraped_on) for article in articles]
+    scraper_ids = dict((await session.execute(statement, rows)).all())
+    await insert_dependents(session, articles, scraper_ids)
+    return scraper_ids
+
+
+async def insert_copy(
+    session, articles: list[dict], scraped_on: date
+) -> dict[str, int]:
+    """
+    COPY the three tables on asyncpg.
+
+    Articles are copied into a staging table and moved with ON CONFLICT,
+    while the dependent rows, which never conflict, are copied directly
+    with ids drawn from their table's sequence up front.
+    """
+    # Statements go through the session so the transaction is open before
+    # the raw connection COPYs (asyncpg itself would autocommit)
+    await session.execute(text(POSTGRES_STAGING))
+    connection = await session.connection()
+    raw = (await connection.get_raw_connection()).driver_connection
+    await raw.copy_records_to_table(
+        "webscraps_incoming",
+        records=[
+            tuple(scraper_row(article, scraped_on).values()) for article in articles
+        ],
+        columns=SCRAPER_COLUMNS,
+    )
+    scraper_ids = dict((await session.execute(text(POSTGRES_MOVE_STAGED))).all())
+    articles = [article for article in articles if article["url"] in scraper_ids]
+    if not articles:
+        return scraper_ids
+
+    description_ids = (
+        await session.execute(
+            text(
+                "SELECT nextval(pg_get_serial_sequence(:table, 'id')) "
+                "FROM generate_series(1, :count)"
+            ),
+            {"table": GeneralisedDescription.__tablename__, "count": len(articles)},
+        )
+    ).scalars().all()
+    await raw.copy_records_to_table(
+        GeneralisedDescription.__tablename__,
+        records=[
+            (
+                description_id,
+                article["generalised_description"],
+                scraper_ids[article["url"]],
+            )
+            for article, description_id in zip(articles, description_ids)
+        ],
+        columns=DESCRIPTION_COLUMNS,
+    )
+    await raw.copy_records_to_table(
+        GeneralisedWordCount.__tablename__,
+        records=[
+            (json.dumps(article["word_count"]), description_id)
+            for article, description_id in zip(articles, description_ids)
+        ],
+        columns=WORD_COUNT_COLUMNS,
+    )
+    return scraper_ids
+
+
+async def insert_articles(
+    session,
+    articles: list[dict],
+    batch_size: int = None,
+    use_copy: bool = None,
+    scraped_on: date = None,
+) -> dict[str, int]:
+    """
+    Insert scraped articles with their generalised description and word
+    count rows, `batch_size` articles per statement, dated `scraped_on`
+    (today by default).
+
+    Articles whose URL is already stored are left untouched. Runs inside
+    the caller's transaction and returns the new `webscraps` ids by URL,
+    in the order of `articles`.
+    """
+    batch_size = batch_size or ARTICLE_INSERT_BATCH_SIZE
+    scraped_on = scraped_on or date.today()
+    if use_copy is None:
+        use_copy = ARTICLE_INSERT_COPY
+    use_copy = use_copy and session.bind.dialect.driver == "asyncpg"
+
+    articles = unique_by_url(articles)
+    if not unique_urls:
+        # COPY moves articles over with ON CONFLICT as well
+        known = await known_urls(session, [article["url"] for article in articles])
+        articles = [article for article in articles if article["url"] not in known]
+        use_copy = False
+    write = insert_copy if use_copy else insert_returning
+
+    ids = {}
+    for start in range(0, len(articles), batch_size):
+        batch = articles[start : start + batch_size]
+        ids.update(await write(session, batch, scraped_on))
+    return {
+        article["url"]: ids[article["url"]]
+        for article in articles
+        if article["url"] in ids
+    }
+
+
+async def page_validators(session, url: str):
+    return await session.get(ScrapedPage, url)
+
+
+async def save_page_validators(
+    session, url: str, etag: str, last_modified: str, next_url: str
+):
+    dialect = session.bind.dialect.name
+    upsert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    values = {
+        "etag": etag,
+        "last_modified": last_modified,
+        "next_url": next_url,
+        "fetched_at": datetime.now(timezone.utc),
+    }
+    statement = upsert(ScrapedPage).values(url=url, **values)
+    await session.execute(
+        statement.on_conflict_do_update(index_elements=["url"], set_=values)
+    )
@@ -1,9 +1,150 @@
+import time
+
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
-from src.common.configuration import DATABASE_URI
+from src.common.configuration import (ASYNC_DATABASE_URI, DATABASE_URI,
+                                      DB_MAX_OVERFLOW, DB_POOL_PRE_PING,
+                                      DB_POOL_RECYCLE, DB_POOL_SIZE,
+                                      DB_POOL_TIMEOUT)
+from src.common.metrics import DB_POOL_CONNECTIONS, instrument_engine, registry
+from src.database.articles import check_url_index
+from src.database.migrations import add_missing_columns, create_missing_indexes
 from src.database.schema import Base
+from src.database.search import install_search
+
+
+class PoolWaitStats:
+    """Counters for the time callers spend waiting on a pooled connection."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float):
+        self.checkouts += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+    def as_dict(self):
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_total_seconds": self.wait_total,
+            "wait_avg_seconds": self.wait_total / self.checkouts
+            if self.checkouts
+            else 0.0,
+            "wait_max_seconds": self.wait_max,
+        }
+
+
+class TimedPoolMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            self.wait_stats.timeouts += 1
+            raise
+        finally:
+            self.wait_stats.record(time.perf_counter() - start)
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(uri: str, poolclass):
+    # SQLite picks its own single-connection pools, which take no sizing
+    if uri.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
 
-engine = create_engine(DATABASE_URI)
-Base.metadata.create_all(engine)
+
+def pool_status(bind):
+    pool = bind.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    if isinstance(pool, TimedPoolMixin):
+        status.update(pool.wait_stats.as_dict())
+    return status
+
+
+# Engines connect lazily, so importing this module never touches the database
+engine = create_engine(DATABASE_URI, **pool_options(DATABASE_URI, TimedQueuePool))
 Session = sessionmaker(bind=engine)
+
+# Async engine used by the request handlers so DB waits don't block the loop
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URI, **pool_options(ASYNC_DATABASE_URI, TimedAsyncQueuePool)
+)
+async_session = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+
+@registry.on_collect
+def collect_pool_metrics():
+    for name, bind in (("async", async_engine), ("sync", engine)):
+        status = pool_status(bind)
+        for state in ("checked_out", "checked_in", "overflow"):
+            if state in status:
+                DB_POOL_CONNECTIONS.labels(name, state).set(status[state])
+
+
+async def get_session():
+    """Yield one AsyncSession per request and always release its connection."""
+    async with async_session() as session:
+        yield session
+
+
+def create_schema(connection):
+    """
+    Create missing tables and the full-text search index, and bring tables
+    created by older versions up to date. Nothing is deleted: duplicate
+    rows left by older versions keep their unique index from being
+    created until `python -m src.database.migrations` removes them.
+    """
+    Base.metadata.create_all(connection)
+    add_missing_columns(connection)
+    install_search(connection)
+    create_missing_indexes(connection)
+    check_url_index(connection)
+
+
+async def prepare_database():
+    """Schema checks run once by the application lifespan, before serving."""
+    async with async_engine.begin() as connection:
+        await connection.run_sync(create_schema)
+
+
+async def dispose_engines():
+    await async_engine.dispose()
+    engine.dispose()
@@ -0,0 +1,174 @@
+"""
+Upgrades for databases created by an older version of the schema.
+
+`create_all` only creates missing tables, so columns and indexes added to
+existing tables are applied here. Both steps are idempotent and run with
+every `create_schema`. Deleting data is left to this module's script,
+which first removes duplicate articles (keeping the first of each URL,
+and taking the others out of the term aggregates that counted them) so
+that their unique URL index can be created. Run it from the repository root
+against the database in ``DATABASE_URI``, e.g. ahead of a deploy:
+
+    python -m src.database.migrations
+"""
+import json
+import logging
+
+from sqlalchemy import Date, String, func, inspect, literal, select, text
+
+from src.database.schema import Base
+from src.database.term_stats import forget_terms
+
+logger = logging.getLogger(__name__)
+
+# Every article but the first (lowest id) stored under the same URL
+DUPLICATE_ARTICLES = """
+    SELECT w.id FROM webscraps AS w
+    WHERE EXISTS (
+        SELECT 1 FROM webscraps AS k WHERE k.url = w.url AND k.id < w.id
+    )
+"""
+DUPLICATE_WORD_COUNTS = f"""
+    SELECT w.scraped_on, c.word_count_desc FROM webscraps AS w
+    JOIN generalised_descriptions AS d ON d.web_scraper_id = w.id
+    JOIN generalised_word_counts AS c ON c.generalised_description_id = d.id
+    WHERE w.id IN ({DUPLICATE_ARTICLES})
+"""
+DEDUPLICATE_ARTICLES = [
+    f"""
+    DELETE FROM generalised_word_counts WHERE generalised_description_id IN (
+        SELECT id FROM generalised_descriptions
+        WHERE web_scraper_id IN ({DUPLICATE_ARTICLES})
+    )
+    """,
+    f"""
+    DELETE FROM generalised_descriptions
+    WHERE web_scraper_id IN ({DUPLICATE_ARTICLES})
+    """,
+    f"DELETE FROM webscraps WHERE id IN ({DUPLICATE_ARTICLES})",
+]
+
+
+def column_ddl(column, dialect) -> str:
+    ddl = f"{dialect.identifier_preparer.format_column(column)} "
+    ddl += column.type.compile(dialect=dialect)
+    if column.default is not None and column.default.is_scalar:
+        value = literal(column.default.arg, column.type).compile(
+            dialect=dialect, compile_kwargs={"literal_binds": True}
+        )
+        ddl += f" DEFAULT {value}"
+    elif not column.nullable:
+        raise RuntimeError(
+            f"{column.table.name}.{column.name} is NOT NULL without a default "
+            "and has to be added by hand"
+        )
+    if not column.nullable:
+        ddl += " NOT NULL"
+    return ddl
+
+
+def add_missing_columns(connection):
+    """Add columns declared in the schema but missing from existing tables."""
+    inspector = inspect(connection)
+    preparer = connection.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            statement = (
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"ADD COLUMN {column_ddl(column, connection.dialect)}"
+            )
+            connection.exec_driver_sql(statement)
+            logger.info(statement)
+
+
+def has_duplicates(connection, index) -> bool:
+    columns = list(index.columns)
+    query = (
+        select(*columns)
+        .where(*(column.is_not(None) for column in columns))
+        .group_by(*columns)
+        .having(func.count() > 1)
+        .limit(1)
+    )
+    return connection.execute(query).first() is not None
+
+
+def fallback_name(index) -> str:
+    return "ix_" + index.name.removeprefix("ux_")
+
+
+def create_missing_indexes(connection):
+    """
+    Create indexes declared in the schema but missing from existing tables.
+
+    A unique index is not created while the table holds duplicate values;
+    a plain index on the same columns stands in for it, keeping lookups
+    indexed, and is replaced on the first start after the duplicates are
+    resolved.
+    """
+    inspector = inspect(connection)
+    preparer = connection.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name in existing:
+                continue
+            fallback = fallback_name(index) if index.unique else None
+            if index.unique and has_duplicates(connection, index):
+                logger.warning(
+                    "%s not created: %s has duplicate values", index.name, table.name
+                )
+                if fallback not in existing:
+                    columns = ", ".join(
+                        preparer.format_column(column) for column in index.columns
+                    )
+                    statement = (
+                        f"CREATE INDEX {preparer.quote(fallback)} "
+                        f"ON {preparer.format_table(table)} ({columns})"
+                    )
+                    connection.exec_driver_sql(statement)
+                    logger.info(statement)
+                continue
+
+            index.create(connection)
+            logger.info("CREATE INDEX %s", index.name)
+            if fallback in existing:
+                connection.exec_driver_sql(f"DROP INDEX {preparer.quote(fallback)}")
+                logger.info("DROP INDEX %s", fallback)
+
+
+def deduplicate_articles(connection) -> int:
+    """
+    Delete all but the first article of each URL, along with their counts
+    in the term aggregates; returns how many. Expects the tables and
+    columns of the current schema.
+    """
+    counted = connection.execute(
+        text(DUPLICATE_WORD_COUNTS).columns(scraped_on=Date, word_count_desc=String)
+    ).all()
+    forget_terms(
+        connection,
+        [(scraped_on, json.loads(raw)) for scraped_on, raw in counted if raw],
+    )
+    for statement in DEDUPLICATE_ARTICLES:
+        result = connection.execute(text(statement))
+    removed = result.rowcount  # the last statement deletes the articles
+    if removed:
+        logger.info("deleted %d duplicate articles", removed)
+    return removed
+
+
+if __name__ == "__main__":
+    from src.database.connection import create_schema, engine
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    with engine.begin() as connection:
+        Base.metadata.create_all(connection)
+        add_missing_columns(connection)
+        deduplicate_articles(connection)
+        create_schema(connection)
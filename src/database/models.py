@@ -48,6 +48,13 @@ class WebscrapResponse(BaseModel):
     status_code: int = Field(description="HTTP status code of the response.")
 
 
+class AdminResponse(BaseModel):
+    success: bool = Field(description="Indicates if the operation was successful.")
+    message: str = Field(description="Message describing the result of the operation.")
+    data: Any = Field(description="Data associated with the operation result.")
+    status_code: int = Field(description="HTTP status code of the response.")
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str
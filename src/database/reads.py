@@ -0,0 +1,135 @@
+import json
+from operator import attrgetter
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from src.common.pagination import keyset_page
+from src.database.schema import GeneralisedDescription, User, WebScraper
+
+
+class UserRow:
+    """The public columns of a user, read without the ORM."""
+
+    __slots__ = ("id", "name", "phone_number")
+
+    def __init__(self, id, name, phone_number):
+        self.id = id
+        self.name = name
+        self.phone_number = phone_number
+
+    def as_dict(self) -> dict:
+        return {"id": self.id, "name": self.name, "phone_number": self.phone_number}
+
+
+class ArticleRow:
+    """A scraped entry as listed by the API, read without the ORM."""
+
+    __slots__ = ("id", "description", "image", "titles", "url")
+
+    def __init__(self, id, description, image, titles, url):
+        self.id = id
+        self.description = description
+        self.image = image
+        self.titles = titles
+        self.url = url
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "description": self.description,
+            "image": self.image,
+            "titles": self.titles,
+            "url": self.url,
+        }
+
+
+# Column order matches the record constructors
+USER_ROW_COLUMNS = select(User.id, User.name, User.phone_number)
+ARTICLE_ROW_COLUMNS = select(
+    WebScraper.id,
+    WebScraper.description,
+    WebScraper.image,
+    WebScraper.titles,
+    WebScraper.url,
+)
+
+# Articles with their generalised descriptions and those with their word
+# counts, in one query per level however many articles there are; lazy
+# loading would run 1 + 2N
+ARTICLE_DETAILS = select(WebScraper).options(
+    selectinload(WebScraper.generalised_descriptions).selectinload(
+        GeneralisedDescription.word_counts
+    )
+)
+
+by_id = attrgetter("id")
+
+
+async def fetch_rows(session, query, record) -> list:
+    """
+    Run a column `select()` on the session's connection and wrap each row
+    in `record`, skipping ORM entity loading and the identity map.
+    """
+    connection = await session.connection()
+    result = await connection.execute(query)
+    # One fetch: the asyncpg adapter pops rows off the front of a list,
+    # which makes row-by-row iteration quadratic
+    return [record(*row) for row in result.all()]
+
+
+async def user_rows(session, after: int = None, limit: int = None) -> list[UserRow]:
+    query = keyset_page(USER_ROW_COLUMNS, User.id, after, limit)
+    return await fetch_rows(session, query, UserRow)
+
+
+async def users_by_detail(
+    session, name: str = None, phone_number: str = None
+) -> list[UserRow]:
+    query = USER_ROW_COLUMNS
+    if name:
+        query = query.where(User.name == name)
+    if phone_number:
+        query = query.where(User.phone_number == phone_number)
+    return await fetch_rows(session, query, UserRow)
+
+
+async def article_rows(
+    session, after: int = None, limit: int = None
+) -> list[ArticleRow]:
+    query = keyset_page(ARTICLE_ROW_COLUMNS, WebScraper.id, after, limit)
+    return await fetch_rows(session, query, ArticleRow)
+
+
+def article_detail_dict(article: WebScraper) -> dict:
+    return {
+        "id": article.id,
+        "description": article.description,
+        "image": article.image,
+        "titles": article.titles,
+        "url": article.url,
+        "generalised_descriptions": [
+            {
+                "id": generalised.id,
+                "description": generalised.description,
+                "word_counts": [
+                    json.loads(word_count.word_count_desc or "{}")
+                    for word_count in sorted(generalised.word_counts, key=by_id)
+                ],
+            }
+            for generalised in sorted(article.generalised_descriptions, key=by_id)
+        ],
+    }
+
+
+async def article_details(
+    session, after: int = None, limit: int = None
+) -> list[dict]:
+    query = keyset_page(ARTICLE_DETAILS, WebScraper.id, after, limit)
+    articles = (await session.scalars(query)).all()
+    return [article_detail_dict(article) for article in articles]
+
+
+async def article_detail(session, article_id: int) -> dict | None:
+    article = await session.scalar(ARTICLE_DETAILS.where(WebScraper.id == article_id))
+    return None if article is None else article_detail_dict(article)
@@ -1,4 +1,5 @@
-from sqlalchemy import JSON, Column, ForeignKey, Integer, String
+from sqlalchemy import (JSON, Boolean, Column, Date, DateTime, ForeignKey, Index,
+                        Integer, String)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -9,11 +10,17 @@ class User(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True)
-    name = Column(String)
+    name = Column(String, index=True)
     email = Column(String)
     phone_number = Column(String)
     password = Column(String)
 
+    # Sign-up and sign-in look users up by either; both identify one user
+    __table_args__ = (
+        Index("ux_users_email", "email", unique=True),
+        Index("ux_users_phone_number", "phone_number", unique=True),
+    )
+
 
 class WebScraper(Base):
     __tablename__ = "webscraps"
@@ -23,18 +30,24 @@ class WebScraper(Base):
     image = Column(String)
     titles = Column(String)
     url = Column(String)
+    # Day the term aggregates counted the article under; NULL for articles
+    # scraped before it was recorded
+    scraped_on = Column(Date, index=True)
 
     generalised_descriptions = relationship(
         "GeneralisedDescription", back_populates="web_scraper"
     )
 
+    # One row per article; scrapes rely on it for ON CONFLICT (url)
+    __table_args__ = (Index("ux_webscraps_url", "url", unique=True),)
+
 
 class GeneralisedDescription(Base):
     __tablename__ = "generalised_descriptions"
 
     id = Column(Integer, primary_key=True)
     description = Column(String)
-    web_scraper_id = Column(Integer, ForeignKey("webscraps.id"))
+    web_scraper_id = Column(Integer, ForeignKey("webscraps.id"), index=True)
 
     web_scraper = relationship("WebScraper", back_populates="generalised_descriptions")
     word_counts = relationship(
@@ -53,7 +66,7 @@ class GeneralisedWordCount(Base):
     id = Column(Integer, primary_key=True)
     word_count_desc = Column(String)
     generalised_description_id = Column(
-        Integer, ForeignKey("generalised_descriptions.id")
+        Integer, ForeignKey("generalised_descriptions.id"), index=True
     )
 
     generalised_description = relationship(
@@ -62,3 +75,71 @@ class GeneralisedWordCount(Base):
 
     def __repr__(self):
         return f"<GeneralisedWordCount(id={self.id}, word_count_desc={self.word_count_desc})>"
+
+
+class TermFrequency(Base):
+    """Corpus-wide counts per term, maintained as articles are inserted."""
+
+    __tablename__ = "term_frequencies"
+
+    term = Column(String, primary_key=True)
+    total_count = Column(Integer, nullable=False, default=0, index=True)
+    document_count = Column(Integer, nullable=False, default=0)
+
+
+class TermDailyFrequency(Base):
+    """Per-day counts per term, keyed (term, day) for timeline lookups."""
+
+    __tablename__ = "term_daily_frequencies"
+
+    term = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True, index=True)
+    total_count = Column(Integer, nullable=False, default=0)
+    document_count = Column(Integer, nullable=False, default=0)
+
+
+class CorpusDailyStats(Base):
+    """Articles and term occurrences ingested per day."""
+
+    __tablename__ = "corpus_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    document_count = Column(Integer, nullable=False, default=0)
+    term_count = Column(Integer, nullable=False, default=0)
+
+
+class ScrapeJob(Base):
+    """A background Hacker News scrape and its last reported progress."""
+
+    __tablename__ = "scrape_jobs"
+
+    id = Column(Integer, primary_key=True)
+    status = Column(String, nullable=False, index=True)
+    start_url = Column(String, nullable=False)
+    pages_requested = Column(Integer, nullable=False)
+    incremental = Column(Boolean, nullable=False, default=False)
+    pages_fetched = Column(Integer, nullable=False, default=0)
+    pages_unchanged = Column(Integer, nullable=False, default=0)
+    pages_persisted = Column(Integer, nullable=False, default=0)
+    entries_inserted = Column(Integer, nullable=False, default=0)
+    entries_skipped = Column(Integer, nullable=False, default=0)
+    errors = Column(String, nullable=False, default="[]")
+    stage_seconds = Column(String, nullable=False, default="{}")
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    worker = Column(String)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class ScrapedPage(Base):
+    """HTTP validators of a listing page, for conditional re-fetching."""
+
+    __tablename__ = "scraped_pages"
+
+    url = Column(String, primary_key=True)
+    etag = Column(String)
+    last_modified = Column(String)
+    next_url = Column(String)
+    fetched_at = Column(DateTime(timezone=True), nullable=False)
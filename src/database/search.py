@@ -0,0 +1,120 @@
+import re
+
+from sqlalchemy import inspect, text
+
+# Postgres: a generated tsvector over titles + description with a GIN index,
+# so the column can never drift from the row it describes.
+POSTGRES_DDL = [
+    """
+    ALTER TABLE webscraps ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(titles, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_webscraps_search_vector
+    ON webscraps USING GIN (search_vector)
+    """,
+]
+
+POSTGRES_SEARCH = """
+    SELECT w.id, w.url, ts_rank_cd(w.search_vector, q) AS rank
+    FROM webscraps AS w, plainto_tsquery('english', :keyword) AS q
+    WHERE w.search_vector @@ q
+    ORDER BY rank DESC, w.id
+    LIMIT :limit OFFSET :offset
+"""
+
+# SQLite (tests): an external-content FTS5 table kept in sync by triggers
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS webscraps_fts USING fts5(
+        titles, description,
+        content='webscraps', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS webscraps_fts_insert AFTER INSERT ON webscraps
+    BEGIN
+        INSERT INTO webscraps_fts(rowid, titles, description)
+        VALUES (new.id, new.titles, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS webscraps_fts_delete AFTER DELETE ON webscraps
+    BEGIN
+        INSERT INTO webscraps_fts(webscraps_fts, rowid, titles, description)
+        VALUES ('delete', old.id, old.titles, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS webscraps_fts_update AFTER UPDATE ON webscraps
+    BEGIN
+        INSERT INTO webscraps_fts(webscraps_fts, rowid, titles, description)
+        VALUES ('delete', old.id, old.titles, old.description);
+        INSERT INTO webscraps_fts(rowid, titles, description)
+        VALUES (new.id, new.titles, new.description);
+    END
+    """,
+]
+
+SQLITE_SEARCH = """
+    SELECT w.id, w.url, -bm25(webscraps_fts, 2.0, 1.0) AS rank
+    FROM webscraps_fts JOIN webscraps AS w ON w.id = webscraps_fts.rowid
+    WHERE webscraps_fts MATCH :keyword
+    ORDER BY rank DESC, w.id
+    LIMIT :limit OFFSET :offset
+"""
+
+FALLBACK_SEARCH = """
+    SELECT w.id, w.url, 0 AS rank
+    FROM webscraps AS w
+    WHERE lower(w.description) LIKE lower(:keyword)
+    ORDER BY w.id
+    LIMIT :limit OFFSET :offset
+"""
+
+TERM_PATTERN = re.compile(r"\w+")
+
+
+def install_search(connection):
+    """Create the full-text search column/index or FTS table if missing."""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            connection.execute(text(statement))
+    elif dialect == "sqlite":
+        created = inspect(connection).has_table("webscraps_fts")
+        for statement in SQLITE_DDL:
+            connection.execute(text(statement))
+        if not created:
+            # Index the rows that were scraped before the FTS table existed
+            connection.execute(
+                text("INSERT INTO webscraps_fts(webscraps_fts) VALUES ('rebuild')")
+            )
+
+
+def search_statement(dialect: str, keyword: str):
+    """Ranked search for every term in `keyword` (terms are ANDed)."""
+    if dialect == "postgresql":
+        return text(POSTGRES_SEARCH), keyword
+    if dialect == "sqlite":
+        terms = TERM_PATTERN.findall(keyword)
+        return text(SQLITE_SEARCH), " AND ".join(f'"{term}"' for term in terms)
+    return text(FALLBACK_SEARCH), f"%{keyword}%"
+
+
+async def search_webscraps(
+    session, keyword: str, limit: int | None = None, offset: int = 0
+):
+    dialect = session.bind.dialect.name
+    statement, match = search_statement(dialect, keyword)
+    if not match.strip('%"'):
+        return []
+    if limit is None and dialect != "postgresql":
+        limit = -1  # SQLite's "no limit"; Postgres treats LIMIT NULL the same
+    result = await session.execute(
+        statement, {"keyword": match, "limit": limit, "offset": offset}
+    )
+    return result.mappings().all()
@@ -0,0 +1,205 @@
+import json
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Iterable
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.database.schema import (CorpusDailyStats, GeneralisedDescription,
+                                 GeneralisedWordCount, TermDailyFrequency,
+                                 TermFrequency, WebScraper)
+
+# Rows per multi-row upsert; keeps bind parameters well under driver limits
+UPSERT_CHUNK = 1000
+
+
+def count_terms(word_counts: Iterable[dict[str, int]]):
+    """Fold per-article word histograms into corpus totals and document counts."""
+    totals, documents = Counter(), Counter()
+    for word_count in word_counts:
+        terms = Counter()
+        for word, count in word_count.items():
+            terms[word.lower()] += count
+        totals.update(terms)
+        documents.update(terms.keys())
+    return totals, documents
+
+
+def upsert_increment(dialect: str, table, keys: list[str], rows: list[dict]):
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = insert(table).values(rows)
+    counters = [column for column in rows[0] if column not in keys]
+    return statement.on_conflict_do_update(
+        index_elements=keys,
+        set_={
+            column: table.c[column] + statement.excluded[column]
+            for column in counters
+        },
+    )
+
+
+def term_updates(dialect: str, word_counts: list[dict[str, int]], day=None, sign=1):
+    """
+    Upserts adding a batch of articles to the corpus-wide totals and, when
+    `day` is given, to that day's rows; `sign=-1` takes them back out.
+    """
+    if not word_counts:
+        return
+    totals, documents = count_terms(word_counts)
+
+    # Sorted keys give concurrent scrapes the same lock order
+    rows = [
+        {
+            "term": term,
+            "total_count": sign * totals[term],
+            "document_count": sign * documents[term],
+        }
+        for term in sorted(totals)
+    ]
+    for start in range(0, len(rows), UPSERT_CHUNK):
+        chunk = rows[start : start + UPSERT_CHUNK]
+        yield upsert_increment(dialect, TermFrequency.__table__, ["term"], chunk)
+        if day is not None:
+            yield upsert_increment(
+                dialect,
+                TermDailyFrequency.__table__,
+                ["term", "day"],
+                [dict(row, day=day) for row in chunk],
+            )
+    if day is not None:
+        yield upsert_increment(
+            dialect,
+            CorpusDailyStats.__table__,
+            ["day"],
+            [
+                {
+                    "day": day,
+                    "document_count": sign * len(word_counts),
+                    "term_count": sign * sum(totals.values()),
+                }
+            ],
+        )
+
+
+async def record_terms(session, word_counts: list[dict[str, int]], day: date = None):
+    """
+    Add a batch of freshly inserted articles to the term aggregates.
+
+    Runs inside the caller's transaction, so the aggregates commit or roll
+    back together with the articles they describe.
+    """
+    dialect = session.bind.dialect.name
+    for statement in term_updates(dialect, word_counts, day or date.today()):
+        await session.execute(statement)
+
+
+def forget_terms(connection, articles: list[tuple[date, dict[str, int]]]):
+    """
+    Take deleted articles, as (scraped_on, word count) pairs, back out of
+    the aggregates. Articles without a date only leave the corpus-wide
+    totals, since the day that counted them is unknown.
+    """
+    by_day = defaultdict(list)
+    for day, word_count in articles:
+        by_day[day].append(word_count)
+    for day, word_counts in by_day.items():
+        for statement in term_updates(connection.dialect.name, word_counts, day, -1):
+            connection.execute(statement)
+    for model in (TermFrequency, TermDailyFrequency, CorpusDailyStats):
+        connection.execute(delete(model).where(model.document_count <= 0))
+
+
+async def rebuild_term_stats(session, batch_size: int = 1000):
+    """
+    Recompute the aggregates from the stored word counts: the corpus-wide
+    totals from every article, and each day's rows from the articles
+    scraped that day.
+
+    Articles scraped before their day was recorded cannot be placed on
+    the timeline, so days without dated articles keep their rows, and so
+    does the first dated day while undated articles remain, as it may
+    have counted some of them too.
+    """
+    scraped_on = WebScraper.scraped_on
+    undated = await session.scalar(
+        select(WebScraper.id).where(scraped_on.is_(None)).limit(1)
+    )
+    kept = await session.scalar(select(func.min(scraped_on))) if undated else None
+    rebuilt = select(scraped_on).where(scraped_on.is_not(None))
+    if kept is not None:
+        rebuilt = rebuilt.where(scraped_on != kept)
+
+    await session.execute(delete(TermFrequency))
+    for model in (TermDailyFrequency, CorpusDailyStats):
+        await session.execute(delete(model).where(model.day.in_(rebuilt)))
+
+    dialect = session.bind.dialect.name
+    result = await session.stream(
+        select(scraped_on, GeneralisedWordCount.word_count_desc)
+        .select_from(GeneralisedWordCount)
+        .outerjoin(GeneralisedWordCount.generalised_description)
+        .outerjoin(GeneralisedDescription.web_scraper)
+        .execution_options(yield_per=batch_size)
+    )
+    async for partition in result.partitions():
+        by_day = defaultdict(list)
+        for day, raw in partition:
+            if raw:
+                by_day[None if day == kept else day].append(json.loads(raw))
+        for day, word_counts in by_day.items():
+            for statement in term_updates(dialect, word_counts, day):
+                await session.execute(statement)
+    await session.commit()
+
+
+async def top_terms(session, limit: int, since: date = None, until: date = None):
+    if since is None and until is None:
+        query = select(TermFrequency.term, TermFrequency.total_count).order_by(
+            TermFrequency.total_count.desc(), TermFrequency.term
+        )
+    else:
+        total = func.sum(TermDailyFrequency.total_count).label("total_count")
+        query = (
+            select(TermDailyFrequency.term, total)
+            .group_by(TermDailyFrequency.term)
+            .order_by(total.desc(), TermDailyFrequency.term)
+        )
+        if since is not None:
+            query = query.where(TermDailyFrequency.day >= since)
+        if until is not None:
+            query = query.where(TermDailyFrequency.day <= until)
+    result = await session.execute(query.limit(limit))
+    return [dict(row) for row in result.mappings()]
+
+
+async def term_timeline(session, term: str, since: date = None, until: date = None):
+    query = (
+        select(
+            TermDailyFrequency.day,
+            TermDailyFrequency.total_count,
+            TermDailyFrequency.document_count,
+        )
+        .where(TermDailyFrequency.term == term.lower())
+        .order_by(TermDailyFrequency.day)
+    )
+    if since is not None:
+        query = query.where(TermDailyFrequency.day >= since)
+    if until is not None:
+        query = query.where(TermDailyFrequency.day <= until)
+    result = await session.execute(query)
+    return [dict(row, day=row["day"].isoformat()) for row in result.mappings()]
+
+
+async def document_frequency(session, term: str):
+    documents = await session.scalar(
+        select(TermFrequency.document_count).where(TermFrequency.term == term.lower())
+    )
+    corpus = await session.scalar(select(func.sum(CorpusDailyStats.document_count)))
+    documents, corpus = documents or 0, corpus or 0
+    return {
+        "term": term.lower(),
+        "document_count": documents,
+        "total_documents": corpus,
+        "document_frequency": documents / corpus if corpus else 0.0,
+    }
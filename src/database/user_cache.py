@@ -0,0 +1,109 @@
+import json
+import logging
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.common.cache import CacheError, MemoryBackend, RedisBackend
+from src.common.configuration import (USER_CACHE_BACKEND, USER_CACHE_SIZE,
+                                      USER_CACHE_TOMBSTONE_TTL, USER_CACHE_TTL,
+                                      USER_CACHE_URL)
+from src.database.schema import User
+
+logger = logging.getLogger(__name__)
+
+# Stored over an invalidated profile; never a valid profile encoding
+TOMBSTONE = b""
+
+
+def user_profile(user: User) -> dict:
+    return {
+        "user_name": user.name,
+        "email": user.email,
+        "phone_number": user.phone_number,
+    }
+
+
+def cache_backend(kind: str = USER_CACHE_BACKEND):
+    if kind == "memory":
+        return MemoryBackend(USER_CACHE_SIZE, USER_CACHE_TTL)
+    if kind == "redis":
+        return RedisBackend(USER_CACHE_URL, USER_CACHE_TTL)
+    raise ValueError(f"unknown USER_CACHE_BACKEND {kind!r}")
+
+
+class UserCache:
+    """
+    Read-through cache of user profiles keyed by user id.
+
+    Writers must call `invalidate` after committing. It replaces the
+    profile with a tombstone for `tombstone_ttl` seconds, and profiles are
+    only stored where nothing is, so a read that loaded the old row before
+    the write cannot put it back, in this worker or any other sharing the
+    backend, unless it took longer than that. An unreachable backend is
+    treated as a miss and counted in `errors`, so requests fall back to
+    the database.
+    """
+
+    def __init__(self, backend, tombstone_ttl: int = USER_CACHE_TOMBSTONE_TTL):
+        self.backend = backend
+        self.tombstone_ttl = tombstone_ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.hit_seconds = 0.0
+        self.miss_seconds = 0.0
+
+    @staticmethod
+    def key(user_id: int) -> str:
+        return f"user:{user_id}"
+
+    async def _backend_call(self, operation, *args):
+        try:
+            return await operation(*args)
+        except CacheError as e:
+            self.errors += 1
+            logger.warning("user cache %s failed: %s", self.backend.name, e)
+            return None
+
+    async def profile(self, session: AsyncSession, user_id: int):
+        """The user's profile dict, or None if there is no such user."""
+        start = time.perf_counter()
+        cached = await self._backend_call(self.backend.get, self.key(user_id))
+        if cached:  # neither a miss (None) nor a TOMBSTONE
+            self.hits += 1
+            self.hit_seconds += time.perf_counter() - start
+            return json.loads(cached)
+
+        user = await session.get(User, user_id)
+        profile = None if user is None else user_profile(user)
+        if profile is not None:
+            await self._backend_call(
+                self.backend.add, self.key(user_id), json.dumps(profile).encode()
+            )
+        self.misses += 1
+        self.miss_seconds += time.perf_counter() - start
+        return profile
+
+    async def invalidate(self, user_id: int):
+        await self._backend_call(
+            self.backend.set, self.key(user_id), TOMBSTONE, self.tombstone_ttl
+        )
+
+    async def close(self):
+        await self.backend.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "hit_ms": self.hit_seconds * 1000 / self.hits if self.hits else None,
+            "miss_ms": self.miss_seconds * 1000 / self.misses if self.misses else None,
+        }
+
+
+user_cache = UserCache(cache_backend())
@@ -0,0 +1,143 @@
+from operator import itemgetter
+
+from pydantic import ValidationError
+from sqlalchemy import or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from src.auth.hashing import hash_passwords
+from src.common.configuration import USER_IMPORT_BATCH_SIZE
+from src.database.models import UserSignUp
+from src.database.schema import User
+
+CREATED = "created"
+CONFLICT = "conflict"
+INVALID = "invalid"
+
+
+def conflicting_field(error: IntegrityError) -> str:
+    """Which unique user column a write violated, from the driver message."""
+    return "phone_number" if "phone_number" in str(error.orig) else "email"
+
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in error.errors()
+    )
+
+
+async def registered(session, emails: list[str], phones: list[str]):
+    """The given emails and phone numbers that already belong to users."""
+    result = await session.execute(
+        select(User.email, User.phone_number).where(
+            or_(User.email.in_(emails), User.phone_number.in_(phones))
+        )
+    )
+    taken_emails, taken_phones = set(), set()
+    for email, phone_number in result:
+        taken_emails.add(email)
+        taken_phones.add(phone_number)
+    taken_phones.discard(None)
+    return taken_emails, taken_phones
+
+
+async def insert_users(session, rows: list[dict]) -> dict[str, int]:
+    """One multi-row INSERT; rows hitting a unique index are skipped."""
+    dialect = session.bind.dialect.name
+    upsert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = upsert(User).on_conflict_do_nothing().returning(User.email, User.id)
+    return dict((await session.execute(statement, rows)).all())
+
+
+async def import_batch(session, batch: list[tuple[int, UserSignUp]]) -> list[dict]:
+    results, candidates = [], []
+    first_row = {}  # email / phone number -> row that claimed it in this batch
+    for number, user in batch:
+        keys = [("email", user.email)]
+        if user.phone_number is not None:
+            keys.append(("phone_number", user.phone_number))
+        repeated = [(field, key) for field, key in keys if key in first_row]
+        if repeated:
+            field, key = repeated[0]
+            error = f"{field} repeats row {first_row[key]}"
+            results.append({"row": number, "status": CONFLICT, "error": error})
+            continue
+        first_row.update((key, number) for _, key in keys)
+        candidates.append((number, user))
+    if not candidates:
+        return results
+
+    taken_emails, taken_phones = await registered(
+        session,
+        [user.email for _, user in candidates],
+        [user.phone_number for _, user in candidates if user.phone_number],
+    )
+    # Nothing is held while bcrypt runs; rows registered meanwhile are
+    # skipped by the INSERT's ON CONFLICT DO NOTHING
+    await session.commit()
+    fresh = []
+    for number, user in candidates:
+        if user.email in taken_emails or user.phone_number in taken_phones:
+            field = "email" if user.email in taken_emails else "phone_number"
+            error = f"{field} already registered"
+            results.append({"row": number, "status": CONFLICT, "error": error})
+        else:
+            fresh.append((number, user))
+    if not fresh:
+        return results
+
+    hashes = await hash_passwords([user.password for _, user in fresh])
+    ids = await insert_users(
+        session,
+        [
+            {
+                "name": user.name,
+                "email": user.email,
+                "phone_number": user.phone_number,
+                "password": hashed,
+            }
+            for (_, user), hashed in zip(fresh, hashes)
+        ],
+    )
+    await session.commit()
+    for number, user in fresh:
+        if user.email in ids:
+            results.append({"row": number, "status": CREATED, "id": ids[user.email]})
+        else:
+            # Registered concurrently, after the conflict check
+            error = "already registered"
+            results.append({"row": number, "status": CONFLICT, "error": error})
+    return results
+
+
+async def import_users(session, records, batch_size: int = None) -> dict:
+    """
+    Create users from `(line, record, error)` tuples, as produced by
+    `src.common.record_stream`, and report the outcome of every row.
+
+    Rows are validated as sign-ups and handled in batches: one query finds
+    emails and phone numbers that are already registered, passwords are
+    hashed in parallel, and one INSERT adds the rest. Every batch is
+    committed on its own, so rows are never held for the whole upload.
+    """
+    batch_size = batch_size or USER_IMPORT_BATCH_SIZE
+    rows, batch = [], []
+    async for number, record, error in records:
+        if error is None:
+            try:
+                batch.append((number, UserSignUp(**record)))
+            except ValidationError as e:
+                error = validation_message(e)
+        if error is not None:
+            rows.append({"row": number, "status": INVALID, "error": error})
+        if len(batch) >= batch_size:
+            rows += await import_batch(session, batch)
+            batch = []
+    if batch:
+        rows += await import_batch(session, batch)
+
+    rows.sort(key=itemgetter("row"))
+    counts = {status: 0 for status in (CREATED, CONFLICT, INVALID)}
+    for row in rows:
+        counts[row["status"]] += 1
+    return {**counts, "rows": rows}
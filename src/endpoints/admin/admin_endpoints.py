@@ -0,0 +1,173 @@
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+
+from src.auth.token_access import token_cache, verify_admin
+from src.common.profiling import profile_store
+from src.common.responses import envelope_response
+from src.database.connection import (async_engine, engine, get_session,
+                                     pool_status)
+from src.database.models import AdminResponse
+from src.database.term_stats import rebuild_term_stats
+from src.database.user_cache import user_cache
+
+# Every endpoint is limited to the users in ADMIN_USER_IDS
+admin_router = APIRouter(
+    tags=["admin"], prefix="/admin", dependencies=[Depends(verify_admin)]
+)
+
+
+@admin_router.get("/pool", response_model=AdminResponse)
+async def get_pool_stats() -> JSONResponse:
+    """
+    Connection pool statistics for this worker process.
+
+    Returns:
+      - 200 OK: Size, checked-out and overflow connections plus checkout
+        wait times for the async (request) and sync engines.
+    """
+    return envelope_response(
+        message="Pool statistics",
+        data={"async": pool_status(async_engine), "sync": pool_status(engine)},
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@admin_router.get("/token-cache", response_model=AdminResponse)
+async def get_token_cache_stats() -> JSONResponse:
+    """
+    Verified-token cache statistics for this worker process.
+
+    Returns:
+      - 200 OK: Size, capacity, hits, misses, evictions and hit ratio.
+    """
+    return envelope_response(
+        message="Token cache statistics",
+        data=token_cache.stats(),
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@admin_router.delete("/token-cache", response_model=AdminResponse)
+async def invalidate_token_cache(user_id: int = None) -> JSONResponse:
+    """
+    Drop verified tokens from this worker's cache, forcing them to be
+    checked again on their next use.
+
+    Query Param:
+    - `user_id`: Only drop the tokens of this user (optional).
+
+    Returns:
+      - 200 OK: The number of cached tokens dropped.
+    """
+    if user_id is None:
+        dropped = token_cache.stats()["size"]
+        token_cache.clear()
+    else:
+        dropped = token_cache.invalidate_user(user_id)
+
+    return envelope_response(
+        message="Token cache invalidated",
+        data={"dropped": dropped},
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@admin_router.get("/user-cache", response_model=AdminResponse)
+async def get_user_cache_stats() -> JSONResponse:
+    """
+    User profile cache statistics for this worker process.
+
+    Returns:
+      - 200 OK: Backend, hits, misses, backend errors, hit ratio and the
+        mean latency of hits and misses (database load included) in ms.
+    """
+    return envelope_response(
+        message="User cache statistics",
+        data=user_cache.stats(),
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@admin_router.post("/term-stats/rebuild", response_model=AdminResponse)
+async def rebuild_term_statistics(
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> JSONResponse:
+    """
+    Recompute the term analytics aggregates from the stored word counts.
+
+    New scrapes keep them up to date incrementally; this repairs them, with
+    each day's rows recounted from the articles scraped that day.
+
+    Returns:
+      - 200 OK: The aggregates were rebuilt.
+    """
+    await rebuild_term_stats(session)
+
+    return envelope_response(
+        message="Term statistics rebuilt",
+        data=None,
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@admin_router.get("/profiles", response_model=AdminResponse)
+async def list_profiles() -> JSONResponse:
+    """
+    Profiled requests kept by this worker process, newest first.
+
+    Requests are profiled when PROFILE_ENABLED is set and they send
+    `X-Profile: <PROFILE_TOKEN>`, or are picked by PROFILE_SAMPLE_RATE.
+    Profiles show source paths and call stacks, so like every admin
+    endpoint this only answers the users in ADMIN_USER_IDS.
+
+    Returns:
+      - 200 OK: Id, route, status, wall time, time the request's task ran
+        (`profiled_ms`) and its database queries and time, per profile.
+    """
+    return envelope_response(
+        message="Profiles",
+        data=profile_store.summaries(),
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@admin_router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: int,
+    format: Literal["text", "pstats", "collapsed"] = Query(
+        "text", description="output format"
+    ),
+) -> Response:
+    """
+    One request's profile.
+
+    Query Param:
+     - **format**: `text` (default, the top functions by cumulative time),
+       `pstats` (a file for `pstats.Stats` or snakeviz) or `collapsed`
+       (stacks for flamegraph.pl or speedscope).
+
+    Returns:
+      - 200 OK: The profile in the requested format.
+      - 404 Not Found: No such profile, or it has been dropped.
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
+        )
+    if format == "pstats":
+        return Response(
+            profile.pstats_bytes(),
+            media_type="application/octet-stream",
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="profile-{profile_id}.pstats"'
+                )
+            },
+        )
+    if format == "collapsed":
+        return PlainTextResponse(profile.collapsed())
+    return PlainTextResponse(profile.text())
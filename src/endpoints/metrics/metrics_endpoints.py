@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from starlette.responses import Response
+
+from src.common.metrics import CONTENT_TYPE, registry
+
+metrics_router = APIRouter(tags=["metrics"])
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    """
+    Request latency, database, bcrypt and scrape metrics of this worker
+    process, for Prometheus to scrape. Unauthenticated, like most scrape
+    targets; keep it off the public listener.
+
+    Returns:
+      - 200 OK: The metrics in the Prometheus text exposition format.
+    """
+    return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -1,16 +1,27 @@
 from operator import or_
-from typing import Annotated
+from typing import Annotated, Literal
 
 from fastapi import (APIRouter, Depends, Header, HTTPException, Query, Request,
                      status)
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.responses import JSONResponse
 
-from src.auth.hashing import Hash
+from src.auth.hashing import hash_password, verify_password
 from src.auth.token_access import create_access_token, verify_token
-from src.database.connection import Session
+from src.common.configuration import PAGE_LIMIT_MAX
+from src.common.export import export_response
+from src.common.pagination import keyset_page, ndjson_response, next_page_headers
+from src.common.record_stream import csv_records, jsonl_records
+from src.common.responses import envelope_response
+from src.database.connection import get_session
 from src.database.models import UserResponse, UserSignIn, UserSignUp
+from src.database.reads import USER_ROW_COLUMNS, user_rows, users_by_detail
 from src.database.schema import User
+from src.database.user_cache import user_cache
+from src.database.user_import import conflicting_field, import_users
 
 user_router = APIRouter(tags=["users"], prefix="/users")
 
@@ -21,55 +32,75 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
     "/", response_model=UserResponse
 )
 async def get_user(
-    current_user: Annotated[User, Depends(verify_token)]
+    current_user: Annotated[User, Depends(verify_token)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    limit: int = Query(None, gt=0, le=PAGE_LIMIT_MAX, description="page size"),
+    after: int = Query(None, description="return users with an id above this"),
+    stream: bool = Query(False, description="stream every user as NDJSON"),
 ) -> JSONResponse:
     """
-    Retrieve a User by Name or Phone Number.
+    Retrieve Users, ordered by id.
 
     Query Param:
-    - None
-
-    Parameters:
-    - None
+     - **limit**: Page size (optional). A full page sets the `X-Next-After`
+       header to the cursor for the next page.
+     - **after**: Only return users whose id is greater than this (optional).
+     - **stream**: Stream the users as NDJSON from a server-side cursor
+       instead of returning one JSON document (optional).
 
     Returns:
       - 200 OK: List of users.
       - 404 Not Found: If no user is found matching the query parameters.
     """
-    
-    session = Session()
-    query = session.query(User)
 
-    users = query.all()
+    if stream:
+        return ndjson_response(keyset_page(USER_ROW_COLUMNS, User.id, after, limit))
 
-    if users:
-        user_list = []
-        for user in users:
-            user_dict = {
-                "id": user.id,
-                "name": user.name,
-                "phone_number": user.phone_number,
-            }
-            user_list.append(user_dict)
-
-        response = UserResponse(
-            success=True,
+    users = await user_rows(session, after, limit)
+
+    if users or after is not None:
+        user_list = [user.as_dict() for user in users]
+
+        return envelope_response(
             message="Users found",
             data=user_list,
             status_code=status.HTTP_200_OK,
+            headers=next_page_headers(user_list, limit),
         )
-
-        return JSONResponse(content=response.dict(), status_code=status.HTTP_200_OK)
     else:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Users not found"
         )
 
 
+@user_router.get("/export")
+async def export_users(
+    current_user: Annotated[User, Depends(verify_token)],
+    format: Literal["csv", "xlsx", "parquet"] = Query(
+        "csv", description="file format"
+    ),
+):
+    """
+    Download every user (without passwords) as a CSV, XLSX or Parquet file.
+
+    Rows are read from a server-side cursor and sent as they are encoded,
+    so memory use does not grow with the number of users.
+
+    Query Param:
+     - **format**: `csv` (default), `xlsx` or `parquet`.
+
+    Returns:
+      - 200 OK: The file, sent with chunked transfer encoding.
+    """
+    query = select(User.id, User.name, User.email, User.phone_number).order_by(User.id)
+    return export_response(query, format, "users")
+
+
 @user_router.get("/by-detail", response_model=UserResponse)
 async def get_user_by_name(
     name: str = Query(None, description="user name"),
     phone_number: str = Query(None, description="user phone number"),
+    session: AsyncSession = Depends(get_session),
 ) -> JSONResponse:
     """
     Retrieve a User by Name or Phone Number.
@@ -82,32 +113,16 @@ async def get_user_by_name(
       - 200 OK: List of users matching the query parameters.
       - 404 Not Found: If no user is found matching the query parameters.
     """
-    session = Session()
-    query = session.query(User)
-    if name:
-        query = query.filter(User.name == name)
-    if phone_number:
-        query = query.filter(User.phone_number == phone_number)
-    users = query.all()
+    users = await users_by_detail(session, name, phone_number)
 
     if users:
-        user_list = []
-        for user in users:
-            user_dict = {
-                "id": user.id,
-                "name": user.name,
-                "phone_number": user.phone_number,
-            }
-            user_list.append(user_dict)
-
-        response = UserResponse(
-            success=True,
+        user_list = [user.as_dict() for user in users]
+
+        return envelope_response(
             message="Users found",
             data=user_list,
             status_code=status.HTTP_200_OK,
         )
-
-        return JSONResponse(content=response.dict(), status_code=status.HTTP_200_OK)
     else:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Users not found"
@@ -115,84 +130,120 @@ async def get_user_by_name(
 
 
 @user_router.post("/signup", response_model=UserResponse)
-async def create_user(user_data: UserSignUp, request: Request) -> JSONResponse:
-    session = Session()
-
-    data = await request.json()
-    name = data.get("name")
-    email = data.get("email")
-    phone_number = data.get("phone_number")
-    password = data.get("password")
-
-    user_with_email = session.query(User).filter(User.email == email).first()
-    if user_with_email:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="User with this email already exists",
-        )
-
-    user_with_phone = (
-        session.query(User).filter(User.phone_number == phone_number).first()
-    )
-    if user_with_phone:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="User with this phone number already exists",
-        )
-
-    hashed_password = Hash.bcrypt(password)  # Hash the password
+async def create_user(
+    user_data: UserSignUp,
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> JSONResponse:
+    hashed_password = await hash_password(user_data.password)  # Hash the password
 
-    # Create a new user with the hashed password
+    # Create a new user with the hashed password; the unique email and
+    # phone number indexes reject duplicates, so there is nothing to
+    # look up first
     user = User(
-        name=name,
-        email=email,
-        phone_number=phone_number,
+        name=user_data.name,
+        email=user_data.email,
+        phone_number=user_data.phone_number,
         password=hashed_password,
     )
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    try:
+        await session.commit()
+    except IntegrityError as e:
+        await session.rollback()
+        field = "phone number" if conflicting_field(e) == "phone_number" else "email"
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"User with this {field} already exists",
+        )
 
     user_list = [
         {"user_name": user.name, "email": user.email, "phone_number": user.phone_number}
     ]
 
-    response = UserResponse(
-        success=True,
+    return envelope_response(
         message="User created successfully",
         data=user_list,
         status_code=status.HTTP_201_CREATED,
     )
 
-    return JSONResponse(content=response.dict(), status_code=status.HTTP_201_CREATED)
 
+# Upload formats accepted by /users/import, by Content-Type
+IMPORT_FORMATS = {
+    "application/x-ndjson": jsonl_records,
+    "application/jsonl": jsonl_records,
+    "text/csv": csv_records,
+}
+
+
+@user_router.post("/import", response_model=UserResponse)
+async def import_users_upload(
+    request: Request,
+    current_user: Annotated[User, Depends(verify_token)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> JSONResponse:
+    """
+    Create users from a JSONL (`application/x-ndjson`) or CSV (`text/csv`)
+    upload, read as it streams in.
+
+    Each JSONL line or CSV row (with a `name,email,phone_number,password`
+    header) is a sign-up. Rows are checked against existing users and
+    each other, and created in batches; a bad row does not stop the
+    import.
+
+    Returns:
+      - 200 OK: Counts of created, conflicting and invalid rows, plus the
+        outcome of every row (`row` is its line number).
+      - 415 Unsupported Media Type: The Content-Type is not JSONL or CSV.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    records = IMPORT_FORMATS.get(media_type)
+    if records is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Upload JSONL or CSV, one of: {', '.join(IMPORT_FORMATS)}",
+        )
+
+    report = await import_users(session, records(request.stream()))
+
+    return envelope_response(
+        message="Users imported",
+        data=report,
+        status_code=status.HTTP_200_OK,
+    )
 
-@user_router.post("/signin", response_model=UserResponse)
-async def signin_user(signin_data: UserSignIn, request: Request) -> JSONResponse:
-    session = Session()
 
+@user_router.post("/signin", response_model=UserResponse)
+async def signin_user(
+    signin_data: UserSignIn,
+    request: Request,
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> JSONResponse:
     data = await request.json()
-    email = data.get("email")
+    email = signin_data.email  # normalised the same way as at sign-up
     phone_number = data.get("phone_number")
     password = data.get("password")
 
-    user = (
-        session.query(User)
-        .filter(or_(User.email == email, User.phone_number == phone_number))
-        .first()
+    result = await session.execute(
+        select(User).where(
+            or_(User.email == email, User.phone_number == phone_number)
+        )
     )
+    user = result.scalars().first()
     if user:
-        if Hash.verify(user.password, password):
+        valid, new_hash = await verify_password(user.password, password)
+        if valid:
+            if new_hash is not None:
+                # Stored with an outdated bcrypt cost; upgrade transparently
+                user.password = new_hash
+                await session.commit()
             jwt_token = create_access_token(user.id)
 
             user_data = {"jwt": jwt_token}
-            response = UserResponse(
-                success=True,
+            return envelope_response(
                 message="User signed in successfully",
                 data=[user_data],
                 status_code=status.HTTP_200_OK,
             )
-            return JSONResponse(content=response.dict(), status_code=status.HTTP_200_OK)
         else:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -206,7 +257,10 @@ async def signin_user(signin_data: UserSignIn, request: Request) -> JSONResponse
 
 
 @user_router.get("/get-me", response_model=UserResponse)
-async def get_user(user_id: Annotated[User, Depends(verify_token)]) -> JSONResponse:
+async def get_user(
+    user_id: Annotated[User, Depends(verify_token)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> JSONResponse:
     """
     Retrieve a User by ID encoded in JWT token.
 
@@ -219,25 +273,15 @@ async def get_user(user_id: Annotated[User, Depends(verify_token)]) -> JSONRespo
 
 
     if user_id is not None:
-        session = Session()
-        user = session.query(User).filter(User.id == user_id).first()
-        if user:
-            user_list = [
-                {
-                    "user_name": user.name,
-                    "email": user.email,
-                    "phone_number": user.phone_number,
-                }
-            ]
-
-            response = UserResponse(
-                success=True,
+        profile = await user_cache.profile(session, user_id)
+        if profile:
+            user_list = [profile]
+
+            return envelope_response(
                 message="User found successfully",
                 data=user_list,
                 status_code=status.HTTP_200_OK,
             )
-
-            return JSONResponse(content=response.dict(), status_code=status.HTTP_200_OK)
         else:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
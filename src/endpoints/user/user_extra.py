@@ -1,18 +1,26 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.responses import JSONResponse
 
+from src.auth.hashing import hash_password
 from src.auth.token_access import verify_token
-from src.database.connection import Session
+from src.common.responses import envelope_response
+from src.database.connection import get_session
 from src.database.models import UserResponse, UserUpdate
 from src.database.schema import User
+from src.database.user_cache import user_cache
+from src.database.user_import import conflicting_field
 
 user_router_extra = APIRouter(tags=["users_extra"], prefix="/users")
 
 
 @user_router_extra.get("/{user_id}", response_model=UserResponse)
 async def get_user(
-    user_id: int, current_user: Annotated[User, Depends(verify_token)]
+    user_id: int,
+    current_user: Annotated[User, Depends(verify_token)],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> JSONResponse:
     """
     Retrieve a User by ID.
@@ -24,25 +32,15 @@ async def get_user(
       - 200 OK: If the user with the provided ID is found.
       - 404 Not Found: If the user with the provided ID does not exist.
     """
-    session = Session()
-    user = session.query(User).filter(User.id == user_id).first()
-    if user:
-        user_list = [
-            {
-                "user_name": user.name,
-                "email": user.email,
-                "phone_number": user.phone_number,
-            }
-        ]
+    profile = await user_cache.profile(session, user_id)
+    if profile:
+        user_list = [profile]
 
-        response = UserResponse(
-            success=True,
+        return envelope_response(
             message="Users found successfully",
             data=user_list,
             status_code=status.HTTP_200_OK,
         )
-
-        return JSONResponse(content=response.dict(), status_code=status.HTTP_200_OK)
     else:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -52,7 +50,9 @@ async def get_user(
 @user_router_extra.put("/{user_id}", response_model=UserResponse)
 async def update_user(
     current_user: Annotated[User, Depends(verify_token)],
-    user_data: UserUpdate, request: Request, user_id: int, 
+    user_data: UserUpdate,
+    user_id: int,
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> JSONResponse:
     """
     Update a User.
@@ -66,30 +66,29 @@ async def update_user(
     Returns:
       - 200 OK: If the user is successfully updated.
       - 404 Not Found: If the user with the provided ID does not exist.
+      - 409 Conflict: If the email or phone number belongs to another user.
     """
-
-    print(user_id, "this is user id")
-    session = Session()
-    data = await request.json()
-
-    email = data.get("email")
-    phone_number = data.get("phone_number")
-    name = data.get("name")
-    password = data.get("password")
-
-    user = session.query(User).filter(User.id == user_id).first()
+    user = await session.get(User, user_id)
     if user:
-        if email is not None:
-            user.email = email
-        if name is not None:
-            user.name = name
-        if password is not None:
-            user.password = password
-        if phone_number is not None:
-            user.phone_number = phone_number
-        session.commit()
-        session.refresh(user)
-        print(type(user))
+        if user_data.email is not None:
+            user.email = user_data.email
+        if user_data.name is not None:
+            user.name = user_data.name
+        if user_data.password is not None:
+            user.password = await hash_password(user_data.password)
+        if user_data.phone_number is not None:
+            user.phone_number = user_data.phone_number
+        try:
+            await session.commit()
+        except IntegrityError as e:
+            await session.rollback()
+            field = conflicting_field(e).replace("_", " ")
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"User with this {field} already exists",
+            )
+        await user_cache.invalidate(user_id)
+        await session.refresh(user)
 
         user_list = [
             {
@@ -99,18 +98,11 @@ async def update_user(
             }
         ]
 
-        print(type(user_list))
-
-        response = UserResponse(
-            success=True,
+        return envelope_response(
             message="Users updated successfully",
             data=user_list,
             status_code=status.HTTP_200_OK,
         )
-
-        print(response)
-
-        return JSONResponse(content=response.dict(), status_code=status.HTTP_200_OK)
     else:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -121,7 +113,9 @@ async def update_user(
 
 
 async def delete_user(
-    user_id: int, current_user: Annotated[User, Depends(verify_token)]
+    user_id: int,
+    current_user: Annotated[User, Depends(verify_token)],
+    session: Annotated[AsyncSession, Depends(get_session)],
 ) -> JSONResponse:
     """
     Delete a User.
@@ -130,11 +124,11 @@ async def delete_user(
       - 200 OK: If the user is successfully deleted.
       - 404 Not Found: If the user with the provided ID does not exist.
     """
-    session = Session()
-    user = session.query(User).filter(User.id == user_id).first()
+    user = await session.get(User, user_id)
     if user:
-        session.delete(user)
-        session.commit()
+        await session.delete(user)
+        await session.commit()
+        await user_cache.invalidate(user_id)
         return JSONResponse(
             content={"message": "User deleted successfully"},
             status_code=status.HTTP_200_OK,
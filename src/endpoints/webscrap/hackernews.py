@@ -1,205 +1,300 @@
-from typing import Annotated
-import nltk
-import requests
-from bs4 import BeautifulSoup
+from typing import Annotated, Literal
 from fastapi import (APIRouter, Depends, Header, HTTPException, Query, Request,
                      status)
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.responses import JSONResponse
 
 from src.auth.token_access import verify_token
-from src.common.helper import (create_description_word_count,
-                               create_generalised_description,
-                               extract_post_data, fetch_content)
-from src.database.connection import Session
+from src.common.configuration import HACKERNEWS_URL, PAGE_LIMIT_MAX
+from src.common.export import export_response
+from src.common.pagination import keyset_page, ndjson_response, next_page_headers
+from src.common.responses import envelope_response
+from src.database.connection import get_session
 from src.database.models import WebscrapResponse
-from src.database.schema import (GeneralisedDescription, GeneralisedWordCount, User,
-                                 WebScraper)
+from src.database.reads import (ARTICLE_ROW_COLUMNS, article_detail,
+                                article_details, article_rows)
+from src.database.schema import User, WebScraper
+from src.database.search import search_webscraps
+from src.scraping.jobs import JobQueueFull, scrape_jobs
 
 hacker_news_router = APIRouter(tags=["hacker news api"], prefix="/hackernews")
 
 
 @hacker_news_router.get("/", response_model=WebscrapResponse)
 async def get_hacker_news_data(
-    current_user: Annotated[User, Depends(verify_token)]
+    current_user: Annotated[User, Depends(verify_token)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    limit: int = Query(None, gt=0, le=PAGE_LIMIT_MAX, description="page size"),
+    after: int = Query(None, description="return entries with an id above this"),
+    stream: bool = Query(False, description="stream every entry as NDJSON"),
 ) -> JSONResponse:
     """
-    Retrieve a webscrap.
+    Retrieve a webscrap, ordered by id.
 
     Query Param:
-    - None
-
-    Parameters:
-    - None
+    - `limit`: Page size (optional). A full page sets the `X-Next-After`
+      header to the cursor for the next page.
+    - `after`: Only return entries whose id is greater than this (optional).
+    - `stream`: Stream the entries as NDJSON from a server-side cursor
+      instead of returning one JSON document (optional).
 
     Returns:
       - 200 OK: List of users.
       - 404 : WebScrap not found.
     """
 
-    session = Session()
-    query = session.query(WebScraper)
+    if stream:
+        return ndjson_response(
+            keyset_page(ARTICLE_ROW_COLUMNS, WebScraper.id, after, limit)
+        )
 
-    webscrapers = query.all()
+    webscrapers = await article_rows(session, after, limit)
 
-    if webscrapers:
-        webscrapers_list = []
-        for webscrap in webscrapers:
-            webscraper_dict = {
-                "id": webscrap.id,
-                "description": webscrap.description,
-                "image": webscrap.image,
-                "titles": webscrap.titles,
-                "url": webscrap.url,
-            }
-            webscrapers_list.append(webscraper_dict)
+    if webscrapers or after is not None:
+        webscrapers_list = [webscrap.as_dict() for webscrap in webscrapers]
 
-        response = WebscrapResponse(
-            success=True,
+        return envelope_response(
             message="Web Scrap found",
             data=webscrapers_list,
             status_code=status.HTTP_200_OK,
+            headers=next_page_headers(webscrapers_list, limit),
         )
-
-        return JSONResponse(content=response.dict(), status_code=status.HTTP_200_OK)
     else:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="web scrap not found"
         )
 
 
-@hacker_news_router.post("/", response_model=WebscrapResponse)
+@hacker_news_router.post(
+    "/", response_model=WebscrapResponse, status_code=status.HTTP_202_ACCEPTED
+)
 async def create_hacker_news_entries(
-    n: int = Query(..., gt=0), current_user: User = Depends(verify_token)
+    n: int = Query(..., gt=0),
+    incremental: bool = Query(False),
+    current_user: User = Depends(verify_token),
 ) -> JSONResponse:
 
     """
-    Scrape and create new web scraping entries.
+    Queue a background job that scrapes and creates new web scraping entries.
+
+    The job fetches, parses, tokenizes and saves pages as a pipeline and
+    commits each page as soon as it is saved. Articles whose URL is
+    already stored are skipped, and pages unchanged since the last scrape
+    (ETag / Last-Modified) are not parsed again. Follow its progress with
+    `GET /api/hackernews/jobs/{job_id}`.
 
     Query Parameters:
-    - `n`: Number of pages to scrape.
+    - `n`: Maximum number of pages to scrape.
+    - `incremental`: Stop at the first page with no new articles.
 
     Returns:
-    - 200 OK: Successfully scraped and created web scraping entries.
+    - 202 Accepted: The job was queued; `data.job_id` identifies it.
+    - 503 Service Unavailable: Too many jobs are already queued.
     """
 
-    all_post_data = []
+    try:
+        job = await scrape_jobs.submit(HACKERNEWS_URL, n, incremental)
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
+        )
 
-    url = "https://thehackernews.com/"
+    return envelope_response(
+        message=f"Scrape job {job.id} queued for {n} pages",
+        data={"job_id": job.id, "status": job.status},
+        status_code=status.HTTP_202_ACCEPTED,
+    )
 
-    for _ in range(n):
-        soup = fetch_content(url)
-        post_data = extract_post_data(soup)
-        all_post_data.extend(post_data)
 
-        next_page_url = soup.find(class_="blog-pager-older-link-mobile")["href"]
+@hacker_news_router.get("/jobs/{job_id}", response_model=WebscrapResponse)
+async def get_scrape_job(
+    job_id: int, current_user: User = Depends(verify_token)
+) -> JSONResponse:
+    """
+    Progress of a scrape job.
 
-        url = next_page_url
+    Path Parameters:
+    - `job_id`: Id returned when the job was queued.
 
-    session = Session()
-    for data in all_post_data:
-        # Create WebScraper entry
-        new_entry = WebScraper(
-            description=data["description"],
-            image=data["image_source"],
-            titles=data["title"],
-            url=data["url"],
+    Returns:
+    - 200 OK: Status (queued, running, succeeded, failed, cancelled or
+      interrupted), pages fetched and saved, entries inserted, errors and
+      per-stage timings.
+    - 404 Not Found: No job with this id.
+    """
+    job = await scrape_jobs.status(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
         )
 
-        session.add(new_entry)
-        session.flush()  # Flush to get the ID before committing
-
-        # Create GeneralisedDescription entry
-        generalised_description = create_generalised_description(data["description"])
-        generalised_entry = GeneralisedDescription(
-            description=generalised_description, web_scraper=new_entry
-        )
-        session.add(generalised_entry)
-        session.flush()  # Flush to get the ID before committing
+    return envelope_response(
+        message=f"Scrape job {job['status']}",
+        data=job,
+        status_code=status.HTTP_200_OK,
+    )
 
-        generalised_description_words = create_description_word_count(
-            generalised_description
-        )
-        print(generalised_description_words)
-        print(type(generalised_description_words))
 
-        import json
+@hacker_news_router.delete("/jobs/{job_id}", response_model=WebscrapResponse)
+async def cancel_scrape_job(
+    job_id: int, current_user: User = Depends(verify_token)
+) -> JSONResponse:
+    """
+    Cancel a queued or running scrape job.
 
-        sample = json.dumps(generalised_description_words)
+    Pages the job already saved are kept. A job running in another worker
+    process stops after its current page.
 
-        word_count_entry = GeneralisedWordCount(
-            word_count_desc=sample,
-            generalised_description=generalised_entry,
+    Returns:
+    - 200 OK: The job's status after the cancellation request.
+    - 404 Not Found: No job with this id.
+    """
+    job = await scrape_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
         )
 
-        session.add(word_count_entry)
-        session.flush()  # Flush to get the ID before committing
-
-    session.commit()
-    session.close()
-
-    response = WebscrapResponse(
-        success=True,
-        message=f"{len(all_post_data)} web scraping entries created",
-        data=None,
+    return envelope_response(
+        message=f"Scrape job {job['status']}",
+        data=job,
         status_code=status.HTTP_200_OK,
     )
 
-    return JSONResponse(content=response.dict(), status_code=status.HTTP_200_OK)
-
 
 @hacker_news_router.get("/search/", response_model=WebscrapResponse)
 async def search_links_by_keyword(
     keyword: str = Query(..., title="Keyword to search"),
+    limit: int = Query(None, gt=0, le=PAGE_LIMIT_MAX, description="page size"),
+    offset: int = Query(0, ge=0, description="ranked results to skip"),
     current_user: User = Depends(verify_token),
+    session: AsyncSession = Depends(get_session),
 ) -> JSONResponse:
     """
-    Search links in the database by keyword.
+    Full-text search over the titles and descriptions of scraped links.
 
     Query Parameters:
-    - `keyword`: Keyword to search in the descriptions.
+    - `keyword`: One or more terms; a link must match all of them.
+    - `limit`: Page size (optional).
+    - `offset`: Number of ranked results to skip (optional).
 
     Returns:
-    - List of links whose description contains the keyword.
+    - List of matching links, most relevant first.
     """
 
     try:
-        session = Session()
-
-        links = (
-            session.query(WebScraper)
-            .filter(WebScraper.description.ilike(f"%{keyword}%"))
-            .all()
-        )
+        links = await search_webscraps(session, keyword, limit, offset)
 
         if not links:
             raise HTTPException(
                 status_code=404, detail="No links found with the given keyword"
             )
 
-        url_list = [{"url": link.url} for link in links]
+        url_list = [{"url": link["url"]} for link in links]
 
-        response = WebscrapResponse(
-            success=True,
+        return envelope_response(
             message="Links found",
             data=url_list,
             status_code=status.HTTP_200_OK,
         )
 
-        return JSONResponse(content=response.dict(), status_code=status.HTTP_200_OK)
+    except HTTPException:
+        raise
 
     except Exception as e:
-        response = WebscrapResponse(
+        return envelope_response(
             success=False,
             message=f"An error occurred: {str(e)}",
             data=None,
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
-        return JSONResponse(
-            content=response.dict(), status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+
+@hacker_news_router.get("/export")
+async def export_hacker_news_data(
+    current_user: Annotated[User, Depends(verify_token)],
+    format: Literal["csv", "xlsx", "parquet"] = Query(
+        "csv", description="file format"
+    ),
+):
+    """
+    Download every scraped entry as a CSV, XLSX or Parquet file.
+
+    Rows are read from a server-side cursor and sent as they are encoded,
+    so memory use does not grow with the number of entries.
+
+    Query Parameters:
+    - `format`: `csv` (default), `xlsx` or `parquet`.
+
+    Returns:
+    - The file, sent with chunked transfer encoding.
+    """
+    query = select(
+        WebScraper.id,
+        WebScraper.titles,
+        WebScraper.description,
+        WebScraper.image,
+        WebScraper.url,
+    ).order_by(WebScraper.id)
+    return export_response(query, format, "hackernews")
+
+
+@hacker_news_router.get("/articles", response_model=WebscrapResponse)
+async def get_article_details(
+    current_user: Annotated[User, Depends(verify_token)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    limit: int = Query(20, gt=0, le=PAGE_LIMIT_MAX, description="page size"),
+    after: int = Query(None, description="return entries with an id above this"),
+) -> JSONResponse:
+    """
+    Scraped entries with their generalised descriptions and word counts,
+    ordered by id.
+
+    The descriptions and word counts of a whole page are loaded with one
+    query each, so a page costs three queries whatever its size.
+
+    Query Parameters:
+    - `limit`: Page size (default 20). A full page sets the `X-Next-After`
+      header to the cursor for the next page.
+    - `after`: Only return entries whose id is greater than this (optional).
+
+    Returns:
+    - 200 OK: The entries, each with `generalised_descriptions` holding
+      their parsed `word_counts`.
+    """
+    articles = await article_details(session, after, limit)
+
+    return envelope_response(
+        message="Web Scrap found",
+        data=articles,
+        status_code=status.HTTP_200_OK,
+        headers=next_page_headers(articles, limit),
+    )
+
+
+@hacker_news_router.get("/articles/{article_id}", response_model=WebscrapResponse)
+async def get_article_detail(
+    article_id: int,
+    current_user: Annotated[User, Depends(verify_token)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> JSONResponse:
+    """
+    One scraped entry with its generalised descriptions and word counts.
+
+    Returns:
+    - 200 OK: The entry, with `generalised_descriptions` holding their
+      parsed `word_counts`.
+    - 404 Not Found: No entry with this id.
+    """
+    article = await article_detail(session, article_id)
+    if article is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="web scrap not found"
         )
 
-    finally:
-        session.close()
+    return envelope_response(
+        message="Web Scrap found",
+        data=article,
+        status_code=status.HTTP_200_OK,
+    )
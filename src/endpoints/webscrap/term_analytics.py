@@ -0,0 +1,99 @@
+from datetime import date
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import JSONResponse
+
+from src.auth.token_access import verify_token
+from src.common.configuration import PAGE_LIMIT_MAX
+from src.common.responses import envelope_response
+from src.database.connection import get_session
+from src.database.models import WebscrapResponse
+from src.database.schema import User
+from src.database.term_stats import document_frequency, term_timeline, top_terms
+
+term_analytics_router = APIRouter(
+    tags=["hacker news term analytics"], prefix="/hackernews/terms"
+)
+
+
+@term_analytics_router.get("/top", response_model=WebscrapResponse)
+async def get_top_terms(
+    current_user: Annotated[User, Depends(verify_token)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    limit: int = Query(20, gt=0, le=PAGE_LIMIT_MAX, description="number of terms"),
+    since: date = Query(None, description="first scrape day to include"),
+    until: date = Query(None, description="last scrape day to include"),
+) -> JSONResponse:
+    """
+    Most frequent terms across the scraped corpus.
+
+    Query Parameters:
+    - `limit`: Number of terms to return (default 20).
+    - `since` / `until`: Restrict to articles scraped in this date range
+      (optional, ISO dates).
+
+    Returns:
+    - 200 OK: Terms with their total occurrence count, most frequent first.
+    """
+    terms = await top_terms(session, limit, since, until)
+
+    return envelope_response(
+        message="Top terms found",
+        data=terms,
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@term_analytics_router.get("/{term}/timeline", response_model=WebscrapResponse)
+async def get_term_timeline(
+    term: str,
+    current_user: Annotated[User, Depends(verify_token)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    since: date = Query(None, description="first scrape day to include"),
+    until: date = Query(None, description="last scrape day to include"),
+) -> JSONResponse:
+    """
+    Daily frequency of a term.
+
+    Path Parameters:
+    - `term`: The term to look up (case-insensitive).
+
+    Returns:
+    - 200 OK: One entry per scrape day with the term's occurrence and
+      document counts.
+    """
+    timeline = await term_timeline(session, term, since, until)
+
+    return envelope_response(
+        message="Term timeline found",
+        data=timeline,
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@term_analytics_router.get(
+    "/{term}/document-frequency", response_model=WebscrapResponse
+)
+async def get_document_frequency(
+    term: str,
+    current_user: Annotated[User, Depends(verify_token)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> JSONResponse:
+    """
+    Number and share of scraped articles that contain a term.
+
+    Path Parameters:
+    - `term`: The term to look up (case-insensitive).
+
+    Returns:
+    - 200 OK: Document count, corpus size and their ratio.
+    """
+    frequency = await document_frequency(session, term)
+
+    return envelope_response(
+        message="Document frequency found",
+        data=frequency,
+        status_code=status.HTTP_200_OK,
+    )
@@ -0,0 +1,81 @@
+import time
+
+from src.common.metrics import (REQUEST_DB_QUERIES, REQUEST_DB_SECONDS,
+                                REQUEST_SECONDS, REQUESTS_IN_FLIGHT,
+                                RequestQueries, request_queries)
+
+UNMATCHED = "unmatched"
+# Anything else is counted as "other", so clients cannot mint label values
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording each request's latency, status and
+    database queries under its route template (`/api/users/{user_id}`,
+    never the raw path, so label values stay bounded).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.routes = None
+        # (method, endpoint, status) -> the samples a request adds to, so
+        # the hot path does one dict lookup instead of three label lookups
+        self.series = {}
+
+    def route_template(self, scope, endpoint) -> str:
+        if endpoint is None:
+            return UNMATCHED
+        if self.routes is None:
+            self.routes = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        return self.routes.get(endpoint, UNMATCHED)
+
+    def request_series(self, scope, method, status):
+        # The router leaves the matched endpoint in the scope
+        endpoint = scope.get("endpoint")
+        key = (method, endpoint, status)
+        series = self.series.get(key)
+        if series is None:
+            route = self.route_template(scope, endpoint)
+            series = self.series[key] = (
+                REQUEST_SECONDS.labels(method, route, status),
+                REQUEST_DB_QUERIES.labels(method, route),
+                REQUEST_DB_SECONDS.labels(method, route),
+            )
+        return series
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in METHODS else "other"
+        status = 500
+        queries = RequestQueries()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        token = request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            request_queries.reset(token)
+            in_flight.dec()
+            latency, query_count, query_seconds = self.request_series(
+                scope, method, status
+            )
+            latency.observe(elapsed)
+            query_count.observe(queries.count)
+            query_seconds.observe(queries.seconds)
@@ -0,0 +1,78 @@
+import cProfile
+import hmac
+import random
+import time
+
+from src.common.configuration import PROFILE_SAMPLE_RATE, PROFILE_TOKEN
+from src.common.metrics import request_queries
+from src.common.profiling import profile_store, profiled
+
+PROFILE_HEADER = b"x-profile"
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware that profiles a request when it carries
+    `X-Profile: <token>` or is picked by `sample_rate`, stores the profile
+    in `store` and names it in an `X-Profile-Id` response header.
+
+    Only mounted when PROFILE_ENABLED is set; requests that are not
+    profiled then cost one header lookup (and a random draw when
+    sampling).
+    """
+
+    def __init__(
+        self,
+        app,
+        token: str = PROFILE_TOKEN,
+        sample_rate: float = PROFILE_SAMPLE_RATE,
+        store=profile_store,
+    ):
+        self.app = app
+        self.token = token.encode()
+        self.sample_rate = sample_rate
+        self.store = store
+
+    def trigger(self, scope):
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    if hmac.compare_digest(value, self.token):
+                        return "header"
+                    break
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self.trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = self.store.new(scope["method"], scope["path"])
+        profile.trigger = trigger
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                headers = list(message.get("headers", ()))
+                headers.append((b"x-profile-id", str(profile.id).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        # Counted by MetricsMiddleware's query listeners, when it is mounted
+        queries = request_queries.get(None)
+        queries_before = (queries.count, queries.seconds) if queries else None
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            await profiled(self.app(scope, receive, send_with_id), profiler)
+        finally:
+            profile.wall_seconds = time.perf_counter() - start
+            if queries is not None:
+                profile.db_queries = queries.count - queries_before[0]
+                profile.db_seconds = queries.seconds - queries_before[1]
+            profiler.create_stats()
+            profile.stats = profiler.stats
+            self.store.add(profile)
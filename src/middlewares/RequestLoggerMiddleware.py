@@ -1,15 +1,55 @@
-from fastapi import Request
+import time
+
+from src.common.request_log import request_log
 
 
 class RequestLoggerMiddleware:
-    def __init__(self, app):
+    """
+    Pure ASGI middleware that times each request, reports the time in an
+    `X-Process-Time` header and hands a log record to `request_log`.
+
+    Messages pass straight through, so streamed responses are not
+    buffered; the header is the time until the response started, the log
+    record's `duration_ms` the time until its last byte was sent.
+    """
+
+    def __init__(self, app, log=request_log):
         self.app = app
+        self.log = log
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def __call__(self, request: Request, call_next):
-        # Log the incoming request
-        print(f"Incoming request: {request.method} {request.url}")
+        start = time.perf_counter()
+        status = 500
+        sent = 0
 
-        # Call the next middleware in the chain or the request handler
-        response = await call_next(request)
+        async def send_timed(message):
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = str(time.perf_counter() - start).encode()
+                headers = list(message.get("headers", ()))
+                headers.append((b"x-process-time", elapsed))
+                message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
 
-        return response
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            client = scope.get("client")
+            self.log.add(
+                (
+                    time.time(),
+                    scope["method"],
+                    scope["path"],
+                    status,
+                    round((time.perf_counter() - start) * 1000, 3),
+                    client[0] if client else None,
+                    sent,
+                )
+            )
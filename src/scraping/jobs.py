@@ -0,0 +1,332 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+
+from src.common.configuration import (SCRAPE_JOB_QUEUE_SIZE,
+                                      SCRAPE_JOB_RECOVER_INTERVAL,
+                                      SCRAPE_JOB_STALE_SECONDS,
+                                      SCRAPE_JOB_WORKERS)
+from src.database.connection import async_session
+from src.database.schema import ScrapeJob
+from src.scraping.pipeline import ScrapePipeline, ScrapeStats
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+INTERRUPTED = "interrupted"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+
+def job_progress(job: ScrapeJob, stats: ScrapeStats = None) -> dict:
+    """Status payload for a job, preferring live in-process stats if running."""
+    if stats is not None:
+        progress = stats.as_dict()
+        del progress["retries"]
+    else:
+        progress = {
+            "pages_fetched": job.pages_fetched,
+            "pages_unchanged": job.pages_unchanged,
+            "pages_persisted": job.pages_persisted,
+            "entries_inserted": job.entries_inserted,
+            "entries_skipped": job.entries_skipped,
+            "errors": json.loads(job.errors),
+            "stage_seconds": json.loads(job.stage_seconds),
+        }
+    finished = job.finished_at or (utcnow() if job.started_at else None)
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "pages_requested": job.pages_requested,
+        "incremental": job.incremental,
+        **progress,
+        "cancel_requested": job.cancel_requested,
+        "worker": job.worker,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "elapsed_seconds": (
+            (finished.replace(tzinfo=None) - job.started_at.replace(tzinfo=None))
+            .total_seconds()
+            if job.started_at
+            else None
+        ),
+    }
+
+
+def stats_columns(stats: ScrapeStats) -> dict:
+    return {
+        "pages_fetched": stats.pages_fetched,
+        "pages_unchanged": stats.pages_unchanged,
+        "pages_persisted": stats.pages_persisted,
+        "entries_inserted": stats.entries_inserted,
+        "entries_skipped": stats.entries_skipped,
+        "errors": json.dumps(stats.errors),
+        "stage_seconds": json.dumps(stats.stage_seconds),
+        "updated_at": utcnow(),
+    }
+
+
+class ScrapeJobManager:
+    """
+    Runs scrape jobs on a bounded pool of asyncio workers in this process.
+
+    Jobs are rows in `scrape_jobs`; the in-memory queue only holds their
+    ids. Running jobs write their progress back after every page, which
+    doubles as a heartbeat and as the point where cross-process
+    cancellation (`cancel_requested`) is honoured. `recover` keeps the
+    heartbeat of queued jobs and takes over those of dead processes.
+    """
+
+    def __init__(
+        self,
+        workers: int = SCRAPE_JOB_WORKERS,
+        queue_size: int = SCRAPE_JOB_QUEUE_SIZE,
+        stale_seconds: int = SCRAPE_JOB_STALE_SECONDS,
+        recover_interval: float = SCRAPE_JOB_RECOVER_INTERVAL,
+    ):
+        self.worker_count = workers
+        self.queue_size = queue_size
+        self.stale_seconds = stale_seconds
+        self.recover_interval = recover_interval
+        self.queue = None
+        self.workers = []
+        self.recovery = None
+        self.queued = set()  # ids of the jobs waiting in this process's queue
+        self.running = {}  # job id -> (task, live stats)
+        self.stopped = set()  # job ids whose task this manager cancelled
+        self.shutting_down = False
+
+    def _ensure_started(self):
+        # Bound to the running loop, so created on first use rather than import
+        if self.queue is None:
+            self.queue = asyncio.Queue(self.queue_size)
+            self.workers = [
+                asyncio.create_task(self._worker()) for _ in range(self.worker_count)
+            ]
+            self.recovery = asyncio.create_task(self._recover_periodically())
+
+    async def submit(
+        self, start_url: str, pages: int, incremental: bool = False
+    ) -> ScrapeJob:
+        self._ensure_started()
+        if self.queue.full():
+            raise JobQueueFull(f"{self.queue_size} scrape jobs are already queued")
+
+        now = utcnow()
+        async with async_session() as session:
+            job = ScrapeJob(
+                status=QUEUED,
+                start_url=start_url,
+                pages_requested=pages,
+                incremental=incremental,
+                worker=WORKER_ID,
+                created_at=now,
+                updated_at=now,
+            )
+            session.add(job)
+            await session.commit()
+        self.queued.add(job.id)
+        self.queue.put_nowait(job.id)
+        return job
+
+    async def status(self, job_id: int):
+        async with async_session() as session:
+            job = await session.get(ScrapeJob, job_id)
+        if job is None:
+            return None
+        _, stats = self.running.get(job_id, (None, None))
+        return job_progress(job, stats)
+
+    async def cancel(self, job_id: int):
+        """Request cancellation; returns the job's status payload or None."""
+        async with async_session() as session:
+            job = await session.get(ScrapeJob, job_id)
+            if job is None:
+                return None
+            if job.status in ACTIVE_STATUSES:
+                job.cancel_requested = True
+                job.updated_at = utcnow()
+                if job.status == QUEUED:
+                    job.status = CANCELLED
+                    job.finished_at = job.updated_at
+                await session.commit()
+
+        if job_id in self.running:
+            task, _ = self.running[job_id]
+            self.stopped.add(job_id)
+            task.cancel()
+            await asyncio.wait([task])
+        return await self.status(job_id)
+
+    async def recover(self):
+        """
+        Refresh the heartbeat of this process's jobs, then take over the
+        jobs of processes whose heartbeat stopped `stale_seconds` ago (a
+        crash or a restart): running ones are marked interrupted, and
+        queued ones, which never started, are queued here again as far as
+        the queue has room.
+
+        Runs at startup and every `recover_interval` seconds after.
+        """
+        self._ensure_started()
+        now = utcnow()
+        stale = now - timedelta(seconds=self.stale_seconds)
+        claimed = []
+        async with async_session() as session:
+            own = self.queued | set(self.running)
+            if own:
+                await session.execute(
+                    update(ScrapeJob)
+                    .where(ScrapeJob.id.in_(own), ScrapeJob.status.in_(ACTIVE_STATUSES))
+                    .values(updated_at=now)
+                )
+            await session.execute(
+                update(ScrapeJob)
+                .where(ScrapeJob.status == RUNNING, ScrapeJob.updated_at < stale)
+                .values(status=INTERRUPTED, finished_at=now, updated_at=now)
+            )
+            room = self.queue.maxsize - self.queue.qsize()
+            orphans = await session.scalars(
+                select(ScrapeJob.id)
+                .where(ScrapeJob.status == QUEUED, ScrapeJob.updated_at < stale)
+                .order_by(ScrapeJob.id)
+                .limit(max(room, 0))
+            )
+            for job_id in orphans.all():
+                # Conditional, so only one of the processes recovering claims it
+                result = await session.execute(
+                    update(ScrapeJob)
+                    .where(
+                        ScrapeJob.id == job_id,
+                        ScrapeJob.status == QUEUED,
+                        ScrapeJob.updated_at < stale,
+                    )
+                    .values(worker=WORKER_ID, updated_at=now)
+                )
+                if result.rowcount:
+                    claimed.append(job_id)
+            await session.commit()
+
+        for job_id in claimed:
+            if self.queue.full():
+                break  # claimed again once its new heartbeat goes stale
+            self.queued.add(job_id)
+            self.queue.put_nowait(job_id)
+
+    async def _recover_periodically(self):
+        while True:
+            await asyncio.sleep(self.recover_interval)
+            try:
+                await self.recover()
+            except Exception:
+                logger.exception("scrape job recovery failed")
+
+    async def shutdown(self):
+        self.shutting_down = True
+        for job_id, (task, _) in list(self.running.items()):
+            self.stopped.add(job_id)
+            task.cancel()
+        background = list(self.workers)
+        if self.recovery is not None:
+            background.append(self.recovery)
+        for task in background:
+            task.cancel()
+        await asyncio.gather(
+            *background, *(task for task, _ in self.running.values()),
+            return_exceptions=True,
+        )
+        self.queue, self.workers, self.recovery = None, [], None
+        self.queued, self.running = set(), {}
+        self.shutting_down = False
+
+    async def _worker(self):
+        while True:
+            job_id = await self.queue.get()
+            self.queued.discard(job_id)
+            stats = ScrapeStats()
+            task = asyncio.create_task(self._run(job_id, stats))
+            self.running[job_id] = (task, stats)
+            try:
+                await asyncio.wait([task])
+            finally:
+                self.running.pop(job_id, None)
+                self.stopped.discard(job_id)
+                self.queue.task_done()
+
+    def _stopped_status(self):
+        return INTERRUPTED if self.shutting_down else CANCELLED
+
+    async def _heartbeat(self, job_id: int, stats: ScrapeStats):
+        async with async_session() as session:
+            job = await session.get(ScrapeJob, job_id)
+            for column, value in stats_columns(stats).items():
+                setattr(job, column, value)
+            await session.commit()
+        if job.cancel_requested:
+            raise JobCancelled()
+
+    async def _finish(self, job_id: int, status: str, stats: ScrapeStats):
+        async with async_session() as session:
+            await session.execute(
+                update(ScrapeJob)
+                .where(ScrapeJob.id == job_id)
+                .values(status=status, finished_at=utcnow(), **stats_columns(stats))
+            )
+            await session.commit()
+
+    async def _run(self, job_id: int, stats: ScrapeStats):
+        async with async_session() as session:
+            job = await session.get(ScrapeJob, job_id)
+            if job is None or job.status != QUEUED:
+                return  # cancelled while it was waiting in the queue
+            job.status = RUNNING
+            job.worker = WORKER_ID
+            job.started_at = job.updated_at = utcnow()
+            await session.commit()
+
+        pipeline = ScrapePipeline(
+            job.start_url,
+            job.pages_requested,
+            stats=stats,
+            on_page_persisted=lambda stats: self._heartbeat(job_id, stats),
+            incremental=job.incremental,
+        )
+        try:
+            await pipeline.run()
+            # anyio task groups absorb a cancelled host task, so check too
+            status = self._stopped_status() if job_id in self.stopped else SUCCEEDED
+        except JobCancelled:
+            status = CANCELLED
+        except asyncio.CancelledError:
+            status = self._stopped_status()
+        except Exception as e:
+            if not stats.errors:
+                stats.errors.append(f"{type(e).__name__}: {e}")
+            status = FAILED
+        await self._finish(job_id, status, stats)
+
+
+scrape_jobs = ScrapeJobManager()
@@ -0,0 +1,277 @@
+import html as html_entities
+import re
+import time
+from datetime import date
+
+import anyio
+from anyio.to_thread import run_sync
+
+from src.common.configuration import (SCRAPE_HTTP_TIMEOUT,
+                                      SCRAPE_MAX_CONNECTIONS,
+                                      SCRAPE_QUEUE_SIZE, SCRAPE_RETRIES,
+                                      SCRAPE_RETRY_BACKOFF)
+from src.common.helper import extract_post_data
+from src.common.metrics import SCRAPE_STAGE_SECONDS
+from src.common.text_processing import process_descriptions
+from src.database.articles import (insert_articles, known_urls,
+                                   page_validators, save_page_validators)
+from src.database.connection import async_session
+from src.database.term_stats import record_terms
+
+# The pager anchor is all the fetch stage needs, so it skips a full parse
+OLDER_LINK_TAG = re.compile(r"<a\b[^>]*\bblog-pager-older-link-mobile\b[^>]*>")
+HREF_ATTRIBUTE = re.compile(r"""\bhref\s*=\s*["']([^"']+)["']""")
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+STAGES = ("fetch", "parse", "tokenize", "persist")
+
+
+class ScrapeError(Exception):
+    pass
+
+
+class ScrapeStats:
+    """Progress counters for one pipeline run."""
+
+    def __init__(self):
+        self.pages_fetched = 0
+        self.pages_unchanged = 0
+        self.pages_persisted = 0
+        self.entries_inserted = 0
+        self.entries_skipped = 0
+        self.retries = 0
+        self.errors = []
+        self.stage_seconds = dict.fromkeys(STAGES, 0.0)
+
+    def as_dict(self):
+        return {
+            "pages_fetched": self.pages_fetched,
+            "pages_unchanged": self.pages_unchanged,
+            "pages_persisted": self.pages_persisted,
+            "entries_inserted": self.entries_inserted,
+            "entries_skipped": self.entries_skipped,
+            "retries": self.retries,
+            "errors": list(self.errors),
+            "stage_seconds": dict(self.stage_seconds),
+        }
+
+
+class Page:
+    """A fetched listing page as it moves through the pipeline stages."""
+
+    def __init__(self, url: str, html: str, headers):
+        self.url = url
+        self.html = html
+        self.etag = headers.get("etag")
+        self.last_modified = headers.get("last-modified")
+        self.next_url = next_page_url(html)
+        self.articles = []
+
+
+def next_page_url(html: str):
+    tag = OLDER_LINK_TAG.search(html)
+    if tag is None:
+        return None
+    href = HREF_ATTRIBUTE.search(tag.group(0))
+    return html_entities.unescape(href.group(1)) if href else None
+
+
+def parse_page(html: str):
+    from bs4 import BeautifulSoup
+
+    return extract_post_data(BeautifulSoup(html, "html.parser"))
+
+
+def tokenize_posts(posts: list[dict]):
+    processed = process_descriptions([post["description"] for post in posts])
+    for post, (generalised_description, word_count) in zip(posts, processed):
+        post["generalised_description"] = generalised_description
+        post["word_count"] = word_count
+    return posts
+
+
+class ScrapePipeline:
+    """
+    Scrape `pages` listing pages starting at `start_url` as a staged pipeline.
+
+    fetch -> parse -> tokenize -> persist run concurrently, connected by
+    bounded streams, so page k+1 downloads while page k is parsed and
+    written. A full stream blocks the stage feeding it (backpressure).
+    Every page is committed as soon as it is persisted, after which the
+    optional `on_page_persisted(stats)` coroutine is awaited.
+
+    Pages are requested conditionally with the validators saved by earlier
+    scrapes; an unchanged page (304) is not parsed and pagination follows
+    its saved next link. Articles whose URL is already stored are dropped
+    before tokenizing. With `incremental`, the scrape stops at the first
+    unchanged page or page without new articles.
+    """
+
+    def __init__(
+        self,
+        start_url: str,
+        pages: int,
+        stats: ScrapeStats = None,
+        session_factory=async_session,
+        queue_size: int = None,
+        retries: int = None,
+        backoff: float = None,
+        timeout: float = None,
+        on_page_persisted=None,
+        incremental: bool = False,
+    ):
+        self.start_url = start_url
+        self.pages = pages
+        self.stats = stats or ScrapeStats()
+        self.session_factory = session_factory
+        self.queue_size = SCRAPE_QUEUE_SIZE if queue_size is None else queue_size
+        self.retries = SCRAPE_RETRIES if retries is None else retries
+        self.backoff = SCRAPE_RETRY_BACKOFF if backoff is None else backoff
+        self.timeout = SCRAPE_HTTP_TIMEOUT if timeout is None else timeout
+        self.on_page_persisted = on_page_persisted
+        self.incremental = incremental
+        self.caught_up = False
+
+    async def run(self) -> ScrapeStats:
+        # httpx is only imported once a scrape actually runs
+        import httpx
+
+        to_parse_send, to_parse = anyio.create_memory_object_stream(self.queue_size)
+        to_tokenize_send, to_tokenize = anyio.create_memory_object_stream(
+            self.queue_size
+        )
+        to_persist_send, to_persist = anyio.create_memory_object_stream(
+            self.queue_size
+        )
+
+        async with httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=SCRAPE_MAX_CONNECTIONS),
+            follow_redirects=True,
+        ) as client:
+            async with anyio.create_task_group() as stages:
+                stages.start_soon(self.fetch_stage, client, to_parse_send)
+                stages.start_soon(self.parse_stage, to_parse, to_tokenize_send)
+                stages.start_soon(self.tokenize_stage, to_tokenize, to_persist_send)
+                stages.start_soon(self.persist_stage, to_persist)
+        return self.stats
+
+    async def fetch(self, client, url: str, headers: dict = None):
+        import httpx
+
+        for attempt in range(self.retries + 1):
+            try:
+                response = await client.get(url, headers=headers)
+                if response.status_code == 304:
+                    return response
+                if response.status_code not in RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    return response
+                failure = f"HTTP {response.status_code}"
+            except httpx.TransportError as e:
+                failure = f"{type(e).__name__}: {e}"
+            except httpx.HTTPStatusError as e:
+                raise ScrapeError(f"{url}: HTTP {e.response.status_code}") from e
+
+            if attempt < self.retries:
+                self.stats.retries += 1
+                await anyio.sleep(self.backoff * 2**attempt)
+        raise ScrapeError(f"{url}: {failure} after {self.retries + 1} attempts")
+
+    def record_stage(self, stage: str, start: float):
+        elapsed = time.perf_counter() - start
+        self.stats.stage_seconds[stage] += elapsed
+        SCRAPE_STAGE_SECONDS.labels(stage).observe(elapsed)
+
+    async def fetch_stage(self, client, send):
+        url = self.start_url
+        async with send:
+            for _ in range(self.pages):
+                if self.caught_up:
+                    break
+                async with self.session_factory() as session:
+                    cached = await page_validators(session, url)
+                headers = {}
+                if cached is not None and cached.etag:
+                    headers["If-None-Match"] = cached.etag
+                if cached is not None and cached.last_modified:
+                    headers["If-Modified-Since"] = cached.last_modified
+
+                start = time.perf_counter()
+                try:
+                    response = await self.fetch(client, url, headers)
+                except ScrapeError as e:
+                    self.stats.errors.append(str(e))
+                    raise
+                self.record_stage("fetch", start)
+                self.stats.pages_fetched += 1
+
+                if response.status_code == 304:
+                    self.stats.pages_unchanged += 1
+                    if self.incremental:
+                        break
+                    url = cached.next_url
+                else:
+                    page = Page(url, response.text, response.headers)
+                    await send.send(page)
+                    url = page.next_url
+                if url is None:
+                    break
+
+    async def parse_stage(self, receive, send):
+        async with receive, send:
+            async for page in receive:
+                start = time.perf_counter()
+                posts = await run_sync(parse_page, page.html)
+                async with self.session_factory() as session:
+                    known = await known_urls(session, [post["url"] for post in posts])
+                page.articles = [post for post in posts if post["url"] not in known]
+                self.stats.entries_skipped += len(posts) - len(page.articles)
+                if self.incremental and posts and not page.articles:
+                    self.caught_up = True
+                self.record_stage("parse", start)
+                await send.send(page)
+
+    async def tokenize_stage(self, receive, send):
+        async with receive, send:
+            async for page in receive:
+                start = time.perf_counter()
+                await run_sync(tokenize_posts, page.articles)
+                self.record_stage("tokenize", start)
+                await send.send(page)
+
+    async def persist_stage(self, receive):
+        async with receive:
+            async for page in receive:
+                start = time.perf_counter()
+                async with self.session_factory() as session:
+                    inserted = await persist_articles(session, page.articles)
+                    if page.etag or page.last_modified:
+                        await save_page_validators(
+                            session,
+                            page.url,
+                            page.etag,
+                            page.last_modified,
+                            page.next_url,
+                        )
+                    await session.commit()
+                self.record_stage("persist", start)
+                self.stats.pages_persisted += 1
+                self.stats.entries_inserted += inserted
+                # Known to a concurrent scrape that committed after parsing
+                self.stats.entries_skipped += len(page.articles) - inserted
+                if self.on_page_persisted is not None:
+                    await self.on_page_persisted(self.stats)
+
+
+async def persist_articles(session, articles: list[dict]) -> int:
+    """Save new articles and their term counts; returns how many were new."""
+    # Dated once so the articles and their aggregates agree across midnight
+    day = date.today()
+    inserted = await insert_articles(session, articles, scraped_on=day)
+    await record_terms(
+        session,
+        [data["word_count"] for data in articles if data["url"] in inserted],
+        day,
+    )
+    return len(inserted)
@@ -0,0 +1,73 @@
+import json
+
+from src.database.schema import (GeneralisedDescription, GeneralisedWordCount,
+                                 WebScraper)
+
+
+def seed(session, count):
+    articles = [
+        WebScraper(
+            description=f"description {i}",
+            image=f"https://img.example.com/{i}.png",
+            titles=f"Title {i}",
+            url=f"https://example.com/{i}",
+            generalised_descriptions=[
+                GeneralisedDescription(
+                    description=f"generalised {i}",
+                    word_counts=[
+                        GeneralisedWordCount(
+                            word_count_desc=json.dumps({"generalised": 1, str(i): 1})
+                        )
+                    ],
+                )
+            ],
+        )
+        for i in range(count)
+    ]
+    session.add_all(articles)
+    session.commit()
+    return [article.id for article in articles]
+
+
+def test_page_query_count_does_not_grow_with_page_size(
+    client, session, auth_headers, record_statements
+):
+    seed(session, 40)
+    client.get("/api/hackernews/articles", headers=auth_headers)  # warm up
+    statements = record_statements()
+
+    counts = {}
+    for limit in (1, 10, 40):
+        statements.clear()
+        response = client.get(
+            "/api/hackernews/articles", params={"limit": limit}, headers=auth_headers
+        )
+        assert len(response.json()["data"]) == limit
+        counts[limit] = len(statements)
+
+    assert counts[1] == counts[10] == counts[40] == 3
+
+
+def test_articles_carry_their_parsed_word_counts(client, session, auth_headers):
+    ids = seed(session, 3)
+
+    page = client.get(
+        "/api/hackernews/articles",
+        params={"limit": 2, "after": ids[0]},
+        headers=auth_headers,
+    )
+    detail = client.get(f"/api/hackernews/articles/{ids[2]}", headers=auth_headers)
+
+    assert [article["id"] for article in page.json()["data"]] == ids[1:]
+    assert page.headers["X-Next-After"] == str(ids[2])
+    article = detail.json()["data"]
+    assert article["titles"] == "Title 2"
+    (generalised,) = article["generalised_descriptions"]
+    assert generalised["description"] == "generalised 2"
+    assert generalised["word_counts"] == [{"generalised": 1, "2": 1}]
+
+
+def test_unknown_article_is_404(client, auth_headers):
+    response = client.get("/api/hackernews/articles/123456", headers=auth_headers)
+
+    assert response.status_code == 404
@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import event
+
+from src.database.articles import insert_articles
+from src.database.connection import async_engine, async_session
+from src.database.schema import (GeneralisedDescription, GeneralisedWordCount,
+                                 WebScraper)
+
+ARTICLES = [
+    {
+        "title": f"Title {i}",
+        "description": f"Description {i}",
+        "image_source": f"https://img/{i}.png",
+        "url": f"https://news/{i}",
+        "generalised_description": f"description {i}",
+        "word_count": {"description": 1, str(i): 1},
+    }
+    for i in range(7)
+]
+
+
+def insert(articles=ARTICLES, **options):
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    async def main():
+        async with async_session() as session:
+            ids = await insert_articles(session, articles, **options)
+            await session.commit()
+        return ids
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+    try:
+        return asyncio.run(main()), statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count)
+        async_engine.sync_engine.dispose(close=False)
+
+
+@pytest.mark.parametrize("use_copy", [False, True])
+def test_dependent_rows_follow_their_article_across_batches(session, use_copy):
+    ids, _ = insert(batch_size=3, use_copy=use_copy)
+
+    assert list(ids) == [article["url"] for article in ARTICLES]
+    scraps = {row.id: row for row in session.query(WebScraper)}
+    for article in ARTICLES:
+        scrap = scraps[ids[article["url"]]]
+        assert scrap.url == article["url"]
+        (description,) = scrap.generalised_descriptions
+        (word_count,) = description.word_counts
+        assert description.description == article["generalised_description"]
+        assert json.loads(word_count.word_count_desc) == article["word_count"]
+    assert session.query(GeneralisedDescription).count() == len(ARTICLES)
+    assert session.query(GeneralisedWordCount).count() == len(ARTICLES)
+
+
+def test_one_statement_per_table_per_batch(session):
+    _, statements = insert(batch_size=3, use_copy=False)
+
+    inserts = [sql for sql in statements if sql.lstrip().startswith("INSERT")]
+    # 7 articles in batches of 3 -> 3 batches x 3 tables
+    assert len(inserts) == 9
+
+
+@pytest.mark.parametrize("use_copy", [False, True])
+def test_known_urls_are_skipped(session, use_copy):
+    insert(articles=ARTICLES[:3], use_copy=use_copy)
+
+    ids, _ = insert(articles=ARTICLES + ARTICLES[-1:], use_copy=use_copy)
+
+    assert list(ids) == [article["url"] for article in ARTICLES[3:]]
+    assert session.query(WebScraper).count() == len(ARTICLES)
+    assert session.query(GeneralisedDescription).count() == len(ARTICLES)
+    assert session.query(GeneralisedWordCount).count() == len(ARTICLES)
@@ -0,0 +1,36 @@
+import asyncio
+
+from benchmarks import suite
+
+
+def test_every_scenario_succeeds_on_a_small_dataset():
+    results = asyncio.run(suite.run(scale=20, requests=3, concurrency=2, warmup=0))
+
+    assert set(results["routes"]) == {scenario.name for scenario in suite.SCENARIOS}
+    for name, route in results["routes"].items():
+        assert route["errors"] == 0, name
+        assert route["requests"] == 3
+        assert route["p50_ms"] <= route["p95_ms"] <= route["p99_ms"]
+
+
+def test_every_route_has_a_scenario_or_a_reason():
+    covered = {scenario.name for scenario in suite.SCENARIOS}
+
+    assert suite.app_routes() - covered == set(suite.NOT_BENCHMARKED)
+
+
+def test_compare_flags_slower_routes_only():
+    route = {"p95_ms": 10.0, "requests_per_second": 100.0, "errors": 0}
+    baseline = {"routes": {"GET /a": route, "GET /b": route}}
+    results = {
+        "routes": {
+            "GET /a": {**route, "p95_ms": 11.0, "requests_per_second": 95.0},
+            "GET /b": {**route, "p95_ms": 15.0, "errors": 2},
+            "GET /new": route,
+        }
+    }
+
+    assert suite.compare(results, baseline, tolerance=0.2) == [
+        "GET /b: p95 10.00 -> 15.00 ms",
+        "GET /b: 2 errors",
+    ]
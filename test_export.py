@@ -0,0 +1,107 @@
+import asyncio
+import csv
+import io
+
+import pytest
+from openpyxl import load_workbook
+from sqlalchemy import select
+
+from src.common import export
+from src.database.connection import async_engine
+from src.database.schema import User, WebScraper
+
+USERS = [
+    User(name="alice", email="alice@example.com", phone_number="+1", password="x"),
+    User(name="bob, jr", email="bob@example.com", phone_number=None, password="x"),
+    User(name="carol", email="carol@example.com", phone_number="+3", password="x"),
+]
+
+
+@pytest.fixture
+def articles(session):
+    session.add_all(
+        WebScraper(
+            titles=f"Article {n}",
+            description="=1+1 formula-looking\x07 text" if n == 0 else f"About {n}",
+            image="i",
+            url=f"https://example.com/{n}",
+        )
+        for n in range(5)
+    )
+    session.commit()
+
+
+def test_users_csv(client, session, auth_headers):
+    session.add_all(USERS)
+    session.commit()
+
+    response = client.get("/api/users/export", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert "content-length" not in response.headers  # sent chunked
+    assert response.headers["content-disposition"] == (
+        'attachment; filename="users.csv"'
+    )
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "name", "email", "phone_number"]
+    assert [row[1:] for row in rows[1:]] == [
+        ["alice", "alice@example.com", "'+1"],
+        ["bob, jr", "bob@example.com", ""],
+        ["carol", "carol@example.com", "'+3"],
+    ]
+
+
+def test_articles_xlsx(client, articles, auth_headers):
+    response = client.get(
+        "/api/hackernews/export", params={"format": "xlsx"}, headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    sheet = load_workbook(io.BytesIO(response.content)).active
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0] == ("id", "titles", "description", "image", "url")
+    assert len(rows) == 6
+    assert rows[1][2] == "=1+1 formula-looking text"
+    assert sheet.cell(row=2, column=3).data_type == "s"  # not a formula
+    assert sheet.cell(row=2, column=3).quotePrefix
+
+
+def test_articles_parquet_row_groups(client, articles, auth_headers, monkeypatch):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(export, "STREAM_YIELD_PER", 2)
+    monkeypatch.setattr(export, "EXPORT_PARQUET_ROW_GROUP", 2)
+
+    response = client.get(
+        "/api/hackernews/export", params={"format": "parquet"}, headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    file = parquet.ParquetFile(io.BytesIO(response.content))
+    assert file.metadata.num_row_groups == 3
+    table = parquet.read_table(io.BytesIO(response.content), use_threads=False)
+    assert str(table.schema.field("id").type) == "int64"
+    assert table.column("url").to_pylist() == [
+        f"https://example.com/{n}" for n in range(5)
+    ]
+
+
+def test_rows_are_encoded_and_sent_batch_by_batch(articles, monkeypatch):
+    monkeypatch.setattr(export, "STREAM_YIELD_PER", 2)
+    query = select(WebScraper.id, WebScraper.url).order_by(WebScraper.id)
+
+    async def chunks():
+        csv_export = export.CsvExport(query.selected_columns)
+        sent = [chunk async for chunk in export.export_chunks(query, csv_export)]
+        await async_engine.dispose()  # its connections belong to this loop
+        return sent
+
+    sent = asyncio.run(chunks())
+    assert [chunk.count(b"\n") for chunk in sent] == [3, 2, 1]
+
+
+def test_unknown_format(client, auth_headers):
+    response = client.get(
+        "/api/users/export", params={"format": "pdf"}, headers=auth_headers
+    )
+    assert response.status_code == 422
@@ -0,0 +1,100 @@
+import pytest
+
+from src.common.metrics import Counter, Gauge, Histogram, Registry
+from src.database.schema import WebScraper
+
+
+def samples(client):
+    response = client.get("/metrics")
+    assert response.headers["content-type"] == (
+        "text/plain; version=0.0.4; charset=utf-8"
+    )
+    values = {}
+    for line in response.text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            values[name] = float(value)
+    return values
+
+
+def grown(before, after, name):
+    return after.get(name, 0.0) - before.get(name, 0.0)
+
+
+def test_render_uses_the_prometheus_text_format():
+    registry = Registry()
+    latency = registry.register(
+        Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1))
+    )
+    registry.register(Counter("jobs_total", "Jobs.")).inc(3)
+    depth = registry.register(Gauge("depth", "Depth."))
+    registry.on_collect(lambda: depth.set(7))
+    latency.labels('say "hi"\n').observe(0.1)
+    latency.labels('say "hi"\n').observe(0.5)
+    latency.labels('say "hi"\n').observe(2)
+
+    assert registry.render() == (
+        "# HELP latency_seconds Latency.\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{route="say \\"hi\\"\\n",le="0.1"} 1\n'
+        'latency_seconds_bucket{route="say \\"hi\\"\\n",le="1.0"} 2\n'
+        'latency_seconds_bucket{route="say \\"hi\\"\\n",le="+Inf"} 3\n'
+        'latency_seconds_sum{route="say \\"hi\\"\\n"} 2.6\n'
+        'latency_seconds_count{route="say \\"hi\\"\\n"} 3\n'
+        "# HELP jobs_total Jobs.\n"
+        "# TYPE jobs_total counter\n"
+        "jobs_total 3.0\n"
+        "# HELP depth Depth.\n"
+        "# TYPE depth gauge\n"
+        "depth 7\n"
+    )
+    with pytest.raises(ValueError):
+        latency.labels()
+
+
+def test_requests_are_timed_by_route_template_with_their_queries(
+    client, session, auth_headers, record_statements
+):
+    session.add(WebScraper(description="d", image="i", titles="t", url="u"))
+    session.commit()
+    labels = 'method="GET",route="/api/hackernews/'
+    before = samples(client)
+
+    statements = record_statements()
+    assert client.get("/api/hackernews/", headers=auth_headers).status_code == 200
+    queries = len(statements)
+    client.get("/api/hackernews/", headers=auth_headers)
+    client.get("/api/not-a-route")
+    after = samples(client)
+
+    count = f'http_request_duration_seconds_count{{{labels}",status="200"}}'
+    assert grown(before, after, count) == 2
+    assert queries > 0
+    assert grown(before, after, f"http_request_db_queries_sum{{{labels}\"}}") == (
+        2 * queries
+    )
+    assert grown(before, after, f"http_request_db_seconds_sum{{{labels}\"}}") > 0
+    assert grown(before, after, "db_query_duration_seconds_count") >= 2 * queries
+    unmatched = 'method="GET",route="unmatched",status="404"'
+    assert grown(before, after, f"http_request_duration_seconds_count{{{unmatched}}}")
+    # /metrics itself is still being served while it renders
+    assert after['http_requests_in_flight{method="GET"}'] == 1
+
+
+def test_bcrypt_and_scrape_stage_timings_are_recorded(client, scrape_job):
+    before = samples(client)
+
+    user = {"name": "a", "email": "a@example.com", "phone_number": "1", "password": "p"}
+    assert client.post("/api/users/signup", json=user).status_code == 201
+    signin = {"email": user["email"], "password": user["password"]}
+    assert client.post("/api/users/signin", json=signin).status_code == 200
+    assert scrape_job(pages=1)["status"] == "succeeded"
+    after = samples(client)
+
+    for operation in ("hash", "verify_and_update"):
+        labels = f'{{operation="{operation}"}}'
+        for metric in ("password_hash_duration_seconds", "password_hash_wait_seconds"):
+            assert grown(before, after, f"{metric}_count{labels}") == 1
+    for stage in ("fetch", "parse", "tokenize", "persist"):
+        name = f'scrape_stage_duration_seconds_count{{stage="{stage}"}}'
+        assert grown(before, after, name) == 1
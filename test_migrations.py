@@ -0,0 +1,170 @@
+import asyncio
+from datetime import date
+
+from sqlalchemy import inspect, text
+
+from src.database import articles
+from src.database.connection import (async_engine, async_session,
+                                     create_schema, engine)
+from src.database.migrations import deduplicate_articles
+from src.database.term_stats import term_updates
+
+
+def index_names(table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_create_schema_upgrades_an_old_database():
+    with engine.begin() as connection:
+        for index in ("ix_users_name", "ux_users_email", "ux_users_phone_number"):
+            connection.exec_driver_sql(f"DROP INDEX {index}")
+        connection.exec_driver_sql(
+            "DROP INDEX ix_generalised_descriptions_web_scraper_id"
+        )
+        connection.exec_driver_sql(
+            "ALTER TABLE scrape_jobs DROP COLUMN entries_skipped"
+        )
+        connection.execute(
+            text(
+                "INSERT INTO scrape_jobs (status, start_url, pages_requested, "
+                "incremental, pages_fetched, pages_unchanged, pages_persisted, "
+                "entries_inserted, errors, stage_seconds, cancel_requested, "
+                "created_at, updated_at) VALUES ('succeeded', 'https://x', 1, "
+                ":false, 1, 0, 1, 3, '[]', '{}', :false, :now, :now)"
+            ),
+            {"false": False, "now": "2024-03-14 10:00:00+00:00"},
+        )
+
+    with engine.begin() as connection:
+        create_schema(connection)
+
+    assert {"ix_users_name", "ux_users_email", "ux_users_phone_number"} <= (
+        index_names("users")
+    )
+    assert "ix_generalised_descriptions_web_scraper_id" in index_names(
+        "generalised_descriptions"
+    )
+    with engine.connect() as connection:
+        assert connection.execute(
+            text("SELECT entries_inserted, entries_skipped FROM scrape_jobs")
+        ).one() == (3, 0)
+
+
+def test_duplicates_keep_a_plain_index_until_resolved():
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX ux_users_email")
+        connection.execute(
+            text("INSERT INTO users (name, email) VALUES ('a', :email), ('b', :email)"),
+            {"email": "twice@example.com"},
+        )
+        create_schema(connection)
+    assert "ix_users_email" in index_names("users")
+    assert "ux_users_email" not in index_names("users")
+
+    with engine.begin() as connection:
+        connection.execute(text("DELETE FROM users WHERE name = 'b'"))
+        create_schema(connection)
+    assert "ix_users_email" not in index_names("users")
+    assert "ux_users_email" in index_names("users")
+
+
+def article_urls():
+    with engine.connect() as connection:
+        return connection.scalars(text("SELECT url FROM webscraps ORDER BY id")).all()
+
+
+def test_duplicate_articles_are_only_deleted_by_the_migration_script():
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX ux_webscraps_url")
+        connection.execute(
+            text(
+                "INSERT INTO webscraps (description, image, titles, url) "
+                "VALUES ('a', 'i', 't', :url), ('b', 'i', 't', :url)"
+            ),
+            {"url": "https://news/0"},
+        )
+        create_schema(connection)
+    assert "ix_webscraps_url" in index_names("webscraps")
+    assert article_urls() == ["https://news/0", "https://news/0"]
+
+    async def scrape():
+        scraped = [
+            {
+                "title": "t",
+                "description": "d",
+                "image_source": "i",
+                "url": f"https://news/{i}",
+                "generalised_description": "d",
+                "word_count": {"d": 1},
+            }
+            for i in range(2)
+        ]
+        async with async_session() as db:
+            ids = await articles.insert_articles(db, scraped)
+            await db.commit()
+        return ids
+
+    # Without the unique index known URLs are looked up instead
+    assert list(asyncio.run(scrape())) == ["https://news/1"]
+    async_engine.sync_engine.dispose(close=False)
+
+    with engine.begin() as connection:
+        assert deduplicate_articles(connection) == 1
+        create_schema(connection)
+    assert "ux_webscraps_url" in index_names("webscraps")
+    assert "ix_webscraps_url" not in index_names("webscraps")
+    assert articles.unique_urls
+    assert article_urls() == ["https://news/0", "https://news/1"]
+
+
+def test_deduplication_takes_duplicates_out_of_the_term_aggregates():
+    day = date(2024, 3, 14)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX ux_webscraps_url")
+        for _ in range(2):
+            scraper_id = connection.execute(
+                text(
+                    "INSERT INTO webscraps (description, image, titles, url, "
+                    "scraped_on) VALUES ('a', 'i', 't', 'https://news/0', :day) "
+                    "RETURNING id"
+                ),
+                {"day": day},
+            ).scalar_one()
+            description_id = connection.execute(
+                text(
+                    "INSERT INTO generalised_descriptions "
+                    "(description, web_scraper_id) VALUES ('a', :id) RETURNING id"
+                ),
+                {"id": scraper_id},
+            ).scalar_one()
+            connection.execute(
+                text(
+                    "INSERT INTO generalised_word_counts "
+                    "(word_count_desc, generalised_description_id) "
+                    """VALUES ('{"Router": 2}', :id)"""
+                ),
+                {"id": description_id},
+            )
+        for statement in term_updates(
+            connection.dialect.name, [{"router": 2}, {"router": 2}], day
+        ):
+            connection.execute(statement)
+
+    with engine.begin() as connection:
+        assert deduplicate_articles(connection) == 1
+        create_schema(connection)
+
+    with engine.connect() as connection:
+        assert connection.execute(
+            text("SELECT term, total_count, document_count FROM term_frequencies")
+        ).all() == [("router", 2, 1)]
+        assert connection.execute(
+            text(
+                "SELECT total_count, document_count FROM term_daily_frequencies "
+                "WHERE term = 'router' AND day = :day"
+            ),
+            {"day": day},
+        ).all() == [(2, 1)]
+        assert connection.execute(
+            text("SELECT document_count, term_count FROM corpus_daily_stats")
+        ).all() == [(1, 2)]
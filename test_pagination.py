@@ -0,0 +1,67 @@
+import json
+
+from src.database.schema import User, WebScraper
+
+
+def seed_users(session, count):
+    session.add_all(
+        User(name=f"user-{i}", email=f"user-{i}@example.com", phone_number=str(i))
+        for i in range(count)
+    )
+    session.commit()
+
+
+def test_users_keyset_pages_cover_every_row_once(client, session, auth_headers):
+    seed_users(session, 25)
+
+    seen = []
+    params = {"limit": 10}
+    while True:
+        response = client.get("/api/users/", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        seen.extend(user["id"] for user in response.json()["data"])
+        if "X-Next-After" not in response.headers:
+            break
+        params["after"] = response.headers["X-Next-After"]
+
+    assert len(seen) == 25
+    assert seen == sorted(seen)
+
+
+def test_users_page_past_the_end_is_empty(client, session, auth_headers):
+    seed_users(session, 3)
+    last_id = session.query(User.id).order_by(User.id.desc()).first()[0]
+
+    response = client.get(
+        "/api/users/", params={"after": last_id, "limit": 10}, headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"] == []
+    assert "X-Next-After" not in response.headers
+
+
+def test_users_without_limit_returns_everything(client, session, auth_headers):
+    seed_users(session, 3)
+
+    response = client.get("/api/users/", headers=auth_headers)
+
+    assert len(response.json()["data"]) == 3
+    assert "X-Next-After" not in response.headers
+
+
+def test_hackernews_stream_emits_ndjson_rows(client, session, auth_headers):
+    session.add_all(
+        WebScraper(description=f"d{i}", image="i", titles=f"t{i}", url=f"u{i}")
+        for i in range(5)
+    )
+    session.commit()
+
+    response = client.get(
+        "/api/hackernews/", params={"stream": True, "after": 0}, headers=auth_headers
+    )
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["titles"] for row in rows] == [f"t{i}" for i in range(5)]
+    assert set(rows[0]) == {"id", "description", "image", "titles", "url"}
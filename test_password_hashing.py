@@ -0,0 +1,79 @@
+import asyncio
+import threading
+
+import pytest
+from passlib.context import CryptContext
+
+from src.auth.hashing import HashExecutor, HashQueueFull
+from src.database.schema import User
+
+ALICE = {
+    "name": "alice",
+    "email": "alice@example.com",
+    "phone_number": "+15550001",
+    "password": "correct horse",
+}
+
+
+def signin(client, password):
+    return client.post(
+        "/api/users/signin",
+        json={"email": ALICE["email"], "password": password},
+    )
+
+
+def test_signup_then_signin(client, session):
+    assert client.post("/api/users/signup", json=ALICE).status_code == 201
+
+    assert signin(client, "correct horse").status_code == 200
+    assert signin(client, "wrong").status_code == 401
+    assert session.query(User).one().password.startswith("$2b$04$")
+
+
+def test_signin_rehashes_a_password_stored_with_another_cost(client, session):
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5).hash("correct horse")
+    session.add(User(**dict(ALICE, password=old_hash)))
+    session.commit()
+
+    assert signin(client, "correct horse").status_code == 200
+
+    session.expire_all()
+    new_hash = session.query(User).one().password
+    assert new_hash.startswith("$2b$04$")
+    assert signin(client, "correct horse").status_code == 200
+
+
+def test_updated_password_is_hashed(client, session, auth_headers):
+    client.post("/api/users/signup", json=ALICE)
+    user_id = session.query(User).one().id
+
+    client.put(
+        f"/api/users/{user_id}",
+        json={"password": "battery staple"},
+        headers=auth_headers,
+    )
+
+    session.expire_all()
+    assert session.query(User).one().password.startswith("$2b$")
+    assert signin(client, "battery staple").status_code == 200
+
+
+def test_executor_rejects_work_beyond_its_queue():
+    executor = HashExecutor(workers=1, queue_size=1)
+    release = threading.Event()
+
+    async def burst():
+        running = asyncio.gather(
+            executor.run(release.wait), executor.run(release.wait)
+        )
+        await asyncio.sleep(0)
+        with pytest.raises(HashQueueFull) as rejected:
+            await executor.run(release.wait)
+        release.set()
+        await running
+        return rejected.value
+
+    rejected = asyncio.run(burst())
+
+    assert rejected.status_code == 503
+    assert rejected.headers == {"Retry-After": "1"}
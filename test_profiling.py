@@ -0,0 +1,94 @@
+import pstats
+
+from src.auth.token_access import create_access_token
+from src.common.profiling import ProfileStore, collapsed_stacks, profile_store
+from src.database.schema import WebScraper
+
+PROFILE = {"X-Profile": "test-profile-token"}
+
+
+def seed_article(session):
+    session.add(WebScraper(description="d", image="i", titles="t", url="u"))
+    session.commit()
+
+
+def test_only_requests_with_the_token_are_profiled(client, session, auth_headers):
+    seed_article(session)
+    kept = len(profile_store.profiles)
+
+    plain = client.get("/api/hackernews/", headers=auth_headers)
+    wrong = client.get("/api/hackernews/", headers={**auth_headers, "X-Profile": "x"})
+
+    assert "X-Profile-Id" not in plain.headers
+    assert "X-Profile-Id" not in wrong.headers
+    assert len(profile_store.profiles) == kept
+
+
+def test_profiled_request_is_served_by_the_admin_endpoints(
+    client, session, auth_headers, tmp_path
+):
+    seed_article(session)
+
+    response = client.get("/api/hackernews/", headers={**auth_headers, **PROFILE})
+    assert response.status_code == 200
+    profile_id = int(response.headers["X-Profile-Id"])
+
+    listed = client.get("/api/admin/profiles", headers=auth_headers).json()["data"]
+    summary = next(entry for entry in listed if entry["id"] == profile_id)
+    assert summary["path"] == "/api/hackernews/"
+    assert summary["status"] == 200
+    assert summary["trigger"] == "header"
+    assert summary["db_queries"] >= 1
+    assert 0 < summary["profiled_ms"] <= summary["wall_ms"]
+
+    url = f"/api/admin/profiles/{profile_id}"
+    assert "get_hacker_news_data" in client.get(url, headers=auth_headers).text
+
+    dump = client.get(url, params={"format": "pstats"}, headers=auth_headers)
+    (tmp_path / "profile.pstats").write_bytes(dump.content)
+    stats = pstats.Stats(str(tmp_path / "profile.pstats")).stats
+    assert any(name == "get_hacker_news_data" for _, _, name in stats)
+
+    collapsed = client.get(url, params={"format": "collapsed"}, headers=auth_headers)
+    lines = collapsed.text.splitlines()
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+    assert any("get_hacker_news_data" in line for line in lines)
+
+    missing = client.get("/api/admin/profiles/0", headers=auth_headers)
+    assert missing.status_code == 404
+
+
+def test_profiles_are_only_served_to_admins(client, session, auth_headers):
+    seed_article(session)
+    response = client.get("/api/hackernews/", headers={**auth_headers, **PROFILE})
+    url = f"/api/admin/profiles/{response.headers['X-Profile-Id']}"
+    not_an_admin = {"token": f"Bearer {create_access_token(2)}"}
+
+    for path in ("/api/admin/profiles", url):
+        assert client.get(path, headers=not_an_admin).status_code == 403
+        assert client.get(path).status_code == 401
+
+
+def test_collapsed_stacks_split_shared_callees_by_call_site():
+    a, b, c = ("app.py", 1, "a"), ("app.py", 2, "b"), ("app.py", 3, "c")
+    stats = {
+        a: (1, 1, 0.1, 0.8, {}),
+        b: (1, 1, 0.2, 0.5, {a: (1, 1, 0.2, 0.5)}),
+        c: (2, 2, 0.4, 0.4, {a: (1, 1, 0.1, 0.1), b: (1, 1, 0.3, 0.3)}),
+    }
+
+    assert sorted(collapsed_stacks(stats).splitlines()) == [
+        "a (app.py:1) 100000",
+        "a (app.py:1);b (app.py:2) 200000",
+        "a (app.py:1);b (app.py:2);c (app.py:3) 300000",
+        "a (app.py:1);c (app.py:3) 100000",
+    ]
+
+
+def test_store_keeps_the_newest_profiles():
+    store = ProfileStore(keep=2)
+    for path in ("/a", "/b", "/c"):
+        store.add(store.new("GET", path))
+
+    assert [summary["path"] for summary in store.summaries()] == ["/c", "/b"]
+    assert store.get(1) is None
@@ -0,0 +1,74 @@
+from src.database.reads import ArticleRow, UserRow
+from src.database.schema import User, WebScraper
+
+
+def seed(session):
+    session.add_all(
+        User(
+            name="dup" if i < 2 else f"user-{i}",
+            email=f"user-{i}@example.com",
+            phone_number=f"+1555{i}",
+            password="secret-hash",
+        )
+        for i in range(4)
+    )
+    session.add_all(
+        WebScraper(
+            description=f"description {i}",
+            image=f"https://img.example.com/{i}.png",
+            titles=f"Title {i}",
+            url=f"https://example.com/{i}",
+        )
+        for i in range(3)
+    )
+    session.commit()
+
+
+def test_user_lists_select_only_public_columns(
+    client, session, auth_headers, record_statements
+):
+    seed(session)
+    user_selects = record_statements(
+        lambda sql: sql.lstrip().upper().startswith("SELECT") and "FROM users" in sql
+    )
+
+    listed = client.get("/api/users/", params={"limit": 3}, headers=auth_headers)
+    found = client.get("/api/users/by-detail", params={"name": "dup"})
+
+    assert [user["name"] for user in listed.json()["data"]] == [
+        "dup", "dup", "user-2"
+    ]
+    assert listed.json()["data"][0].keys() == {"id", "name", "phone_number"}
+    assert sorted(user["phone_number"] for user in found.json()["data"]) == [
+        "+15550", "+15551"
+    ]
+    assert len(user_selects) == 2
+    assert not any("password" in statement for statement in user_selects)
+
+
+def test_article_list_matches_stored_rows(client, session, auth_headers):
+    seed(session)
+
+    response = client.get("/api/hackernews/", params={"limit": 2}, headers=auth_headers)
+
+    stored = session.query(WebScraper).order_by(WebScraper.id).limit(2).all()
+    assert response.json()["data"] == [
+        {
+            "id": entry.id,
+            "description": entry.description,
+            "image": entry.image,
+            "titles": entry.titles,
+            "url": entry.url,
+        }
+        for entry in stored
+    ]
+    assert response.headers["X-Next-After"] == str(stored[-1].id)
+
+
+def test_records_are_slotted():
+    user = UserRow(1, "alice", None)
+    article = ArticleRow(2, "d", "i", "t", "u")
+
+    assert not hasattr(user, "__dict__") and not hasattr(article, "__dict__")
+    assert user.as_dict() == {"id": 1, "name": "alice", "phone_number": None}
+    assert list(article.as_dict()) == ["id", "description", "image", "titles", "url"]
@@ -0,0 +1,61 @@
+import asyncio
+import random
+import statistics
+
+from benchmarks import replay
+from benchmarks.replay import Histogram
+
+
+def test_histogram_percentiles_stay_within_bucket_precision():
+    generator = random.Random(3)
+    samples = [generator.lognormvariate(-4, 1) for _ in range(20000)]
+    histogram = Histogram()
+    for sample in samples:
+        histogram.record(sample)
+
+    cuts = statistics.quantiles(samples, n=1000, method="inclusive")
+    for percentile, exact in ((50, cuts[499]), (99, cuts[989]), (99.9, cuts[998])):
+        assert abs(histogram.percentile(percentile) - exact * 1000) <= exact * 8
+    assert histogram.percentile(100) == round(max(samples) * 1e6) / 1000
+
+    rows = histogram.distribution()
+    assert rows[-1][1:3] == (1.0, 20000)
+    assert [row[0] for row in rows] == sorted(row[0] for row in rows)
+
+
+def test_schedule_scales_log_time_or_draws_arrivals():
+    entries = [{"ts": 100.0}, {"ts": 101.0}, {"ts": 103.0}]
+
+    assert replay.schedule(entries, time_scale=2) == [0.0, 0.5, 1.5]
+    offsets = replay.schedule(entries * 1000, rate=200, seed=1)
+    assert offsets == sorted(offsets)
+    assert 2900 / 200 < offsets[-1] < 3100 / 200
+
+
+def test_requests_are_grouped_by_route_template():
+    assert replay.route_name("GET", "/api/users/42") == "GET /api/users/{user_id}"
+    assert replay.route_name("GET", "/api/users/?limit=5") == "GET /api/users/"
+    assert replay.route_name("GET", "/nowhere") == "GET /nowhere (no route)"
+
+
+def test_replay_counts_unexpected_statuses_as_errors():
+    entries = [
+        {"ts": 0.0, "path": "/api/hackernews/articles"},
+        {"ts": 0.01, "path": "/api/users/get-me", "status": 404},
+        {"ts": 0.02, "path": "/api/users/999"},
+        {
+            "ts": 0.02,
+            "path": "/api/hackernews/articles",
+            "headers": {"token": "Bearer x"},
+        },
+    ]
+
+    result = asyncio.run(
+        replay.replay(entries, replay.schedule(entries), user_id=999, max_in_flight=2)
+    )
+
+    assert result["requests"] == 4
+    assert result["routes"]["GET /api/hackernews/articles"]["errors"] == 1
+    assert result["routes"]["GET /api/users/get-me"]["errors"] == 0
+    assert result["routes"]["GET /api/users/{user_id}"]["error_rate"] == 1.0
+    assert result["peak_in_flight"] <= 2
@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+from src.common.request_log import RequestLog
+from src.middlewares.RequestLoggerMiddleware import RequestLoggerMiddleware
+
+
+def read_records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def record(status=200, path="/api/users/"):
+    return (1700000000.0, "GET", path, status, 1.5, "127.0.0.1", 10)
+
+
+def test_records_are_written_as_json_lines(tmp_path):
+    log = RequestLog(str(tmp_path / "requests.log"), flush_interval=0.01)
+    log.add(record())
+    log.add(record(404, "/nowhere"))
+    log.close()
+
+    assert read_records(tmp_path / "requests.log") == [
+        {
+            "ts": 1700000000.0,
+            "method": "GET",
+            "path": "/api/users/",
+            "status": 200,
+            "duration_ms": 1.5,
+            "client": "127.0.0.1",
+            "bytes": 10,
+        },
+        {
+            "ts": 1700000000.0,
+            "method": "GET",
+            "path": "/nowhere",
+            "status": 404,
+            "duration_ms": 1.5,
+            "client": "127.0.0.1",
+            "bytes": 10,
+        },
+    ]
+    assert log.stats() == {"queued": 0, "written": 2, "dropped": 0, "sampled_out": 0}
+
+
+def test_sampling_keeps_server_errors(tmp_path):
+    log = RequestLog(str(tmp_path / "requests.log"), sample_rate=0.0)
+    for _ in range(10):
+        log.add(record())
+    log.add(record(503))
+    log.close()
+
+    assert [r["status"] for r in read_records(tmp_path / "requests.log")] == [503]
+    assert log.stats()["sampled_out"] == 10
+
+
+def test_a_full_queue_drops_and_counts_records(tmp_path):
+    # The writer only wakes up on close, so nothing drains in between
+    log = RequestLog(str(tmp_path / "requests.log"), queue_size=2, flush_interval=60)
+    for _ in range(5):
+        log.add(record())
+    log.close()
+
+    assert log.stats() == {"queued": 0, "written": 2, "dropped": 3, "sampled_out": 0}
+
+
+def test_streamed_responses_pass_through_unbuffered(tmp_path):
+    log = RequestLog(str(tmp_path / "requests.log"), flush_interval=0.01)
+    release = asyncio.Event()
+    sent = []
+
+    async def streaming_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"first", "more_body": True})
+        await release.wait()
+        await send({"type": "http.response.body", "body": b"last"})
+
+    async def send(message):
+        sent.append(message)
+        if message.get("body") == b"first":
+            release.set()
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    scope = {"type": "http", "method": "GET", "path": "/stream", "client": None}
+    middleware = RequestLoggerMiddleware(streaming_app, log)
+    asyncio.run(asyncio.wait_for(middleware(scope, receive, send), timeout=5))
+    log.close()
+
+    assert [message.get("body") for message in sent] == [None, b"first", b"last"]
+    header = dict(sent[0]["headers"])[b"x-process-time"]
+    assert float(header) >= 0
+    (logged,) = read_records(tmp_path / "requests.log")
+    assert logged["path"] == "/stream"
+    assert logged["bytes"] == 9
+
+
+def test_app_responses_carry_the_process_time(client):
+    response = client.get("/metrics")
+
+    assert float(response.headers["X-Process-Time"]) > 0
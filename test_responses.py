@@ -0,0 +1,104 @@
+import json
+
+import pytest
+from starlette.responses import JSONResponse
+
+from src.common import responses
+from src.common.responses import envelope_response
+from src.database.models import WebscrapResponse
+from src.database.schema import WebScraper
+
+PAYLOADS = [
+    None,
+    [],
+    [{"user_name": "Zoë", "email": "zoe@example.com", "phone_number": None}],
+    [{"jwt": "eyJhbGciOiJIUzI1NiJ9.e30.sig"}],
+    {"job_id": 3, "errors": ["HTTP 503 after 4 attempts"], "incremental": False},
+    {"hit_ratio": 0.75, "hit_ms": 0.123, "stage_seconds": {"fetch": 12.5}},
+    [{"titles": 'quotes " and \\ slashes\n', "url": "https://example.com/ü?a=1"}],
+    [{"text": "emoji 🔐, CJK 漢字, control \x00\x1f, separators \u2028\u2029"}],
+]
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(responses, "orjson", None)
+    else:
+        pytest.importorskip("orjson")
+    return request.param
+
+
+def model_response(data, status_code=200, success=True):
+    # What the endpoints sent before the envelope helper
+    response = WebscrapResponse(
+        success=success, message="Links found", data=data, status_code=status_code
+    )
+    return JSONResponse(content=response.dict(), status_code=status_code)
+
+
+@pytest.mark.parametrize("data", PAYLOADS)
+def test_envelope_matches_the_model_response_byte_for_byte(encoder, data):
+    expected = model_response(data)
+    response = envelope_response(message="Links found", data=data)
+
+    assert response.body == expected.body
+    assert response.status_code == expected.status_code
+    assert response.headers["content-type"] == expected.headers["content-type"]
+
+
+def test_error_envelope(encoder):
+    expected = model_response(None, status_code=500, success=False)
+    response = envelope_response(
+        success=False, message="Links found", status_code=500
+    )
+
+    assert response.body == expected.body
+    assert response.status_code == 500
+
+
+def test_content_orjson_rejects_falls_back_to_the_stdlib(encoder):
+    data = {"big": 2**70, "by_id": {1: "one"}}
+
+    response = envelope_response(message="Links found", data=data)
+
+    assert response.body == model_response(data).body
+
+
+def test_floats_keep_their_value(encoder):
+    data = {"tiny": 1.5e-05, "huge": 3e20, "third": 1 / 3}
+
+    response = envelope_response(message="Links found", data=data)
+
+    assert json.loads(response.body)["data"] == data
+
+
+def test_endpoint_body_is_unchanged(client, session, auth_headers):
+    session.add_all(
+        WebScraper(
+            description=f"déscription {i}",
+            image=f"https://img.example.com/{i}.png",
+            titles=f"Title {i}",
+            url=f"https://example.com/{i}",
+        )
+        for i in range(3)
+    )
+    session.commit()
+
+    response = client.get("/api/hackernews/", params={"limit": 3}, headers=auth_headers)
+
+    rows = [
+        {
+            "id": entry.id,
+            "description": entry.description,
+            "image": entry.image,
+            "titles": entry.titles,
+            "url": entry.url,
+        }
+        for entry in session.query(WebScraper).order_by(WebScraper.id)
+    ]
+    expected = WebscrapResponse(
+        success=True, message="Web Scrap found", data=rows, status_code=200
+    )
+    assert response.content == JSONResponse(content=expected.dict()).body
+    assert response.headers["X-Next-After"] == str(rows[-1]["id"])
@@ -0,0 +1,118 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from src.database.connection import async_engine
+from src.database.schema import ScrapeJob, WebScraper
+
+PAGE_2 = "/search?updated-max=2024-03-14T10:00:00%2B05:30&max-results=12"
+
+
+def wait_for(client, auth_headers, job_id, predicate):
+    for _ in range(500):
+        job = client.get(f"/api/hackernews/jobs/{job_id}", headers=auth_headers)
+        if predicate(job.json()["data"]):
+            return job.json()["data"]
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached the expected state")
+
+
+def test_post_returns_a_job_id_immediately(client, auth_headers, stub_site):
+    stub_site.delays["/"] = 0.5
+
+    started = time.perf_counter()
+    response = client.post("/api/hackernews/", params={"n": 1}, headers=auth_headers)
+
+    assert time.perf_counter() - started < 0.5
+    assert response.status_code == 202
+    assert response.json()["data"]["status"] == "queued"
+
+
+def test_cancel_stops_a_running_job_and_keeps_saved_pages(
+    client, auth_headers, session, stub_site
+):
+    stub_site.delays[PAGE_2] = 1
+    job_id = client.post(
+        "/api/hackernews/", params={"n": 3}, headers=auth_headers
+    ).json()["data"]["job_id"]
+    wait_for(client, auth_headers, job_id, lambda job: job["pages_persisted"] == 1)
+
+    response = client.delete(f"/api/hackernews/jobs/{job_id}", headers=auth_headers)
+
+    assert response.json()["data"]["status"] == "cancelled"
+    assert response.json()["data"]["cancel_requested"] is True
+    assert session.query(WebScraper).count() == 2
+
+
+def test_unknown_job_is_404(client, auth_headers):
+    response = client.get("/api/hackernews/jobs/999", headers=auth_headers)
+
+    assert response.status_code == 404
+
+
+def test_restart_marks_stale_in_flight_jobs_interrupted(session, auth_headers):
+    from main import app
+
+    stale = datetime.now(timezone.utc) - timedelta(hours=1)
+    job = ScrapeJob(
+        status="running",
+        start_url="https://thehackernews.com/",
+        pages_requested=5,
+        created_at=stale,
+        started_at=stale,
+        updated_at=stale,
+    )
+    session.add(job)
+    session.commit()
+
+    with TestClient(app) as client:
+        status = client.get(f"/api/hackernews/jobs/{job.id}", headers=auth_headers)
+    async_engine.sync_engine.dispose(close=False)
+
+    assert status.json()["data"]["status"] == "interrupted"
+
+
+def stale_job(session, status, start_url="https://thehackernews.com/"):
+    stale = datetime.now(timezone.utc) - timedelta(hours=1)
+    job = ScrapeJob(
+        status=status,
+        start_url=start_url,
+        pages_requested=1,
+        worker="crashed:1",
+        created_at=stale,
+        started_at=stale if status == "running" else None,
+        updated_at=stale,
+    )
+    session.add(job)
+    session.commit()
+    return job.id
+
+
+def test_jobs_of_a_crashed_process_are_recovered_while_serving(
+    session, auth_headers, stub_site, monkeypatch
+):
+    from main import app
+    from src.scraping.jobs import WORKER_ID, scrape_jobs
+
+    monkeypatch.setattr(scrape_jobs, "recover_interval", 0.05)
+    with TestClient(app) as client:
+        # Left behind after this process started, so only a periodic
+        # recovery can find them
+        running = stale_job(session, "running")
+        queued = stale_job(session, "queued", stub_site.url + "/")
+        interrupted = wait_for(
+            client, auth_headers, running, lambda job: job["status"] != "running"
+        )
+        requeued = wait_for(
+            client,
+            auth_headers,
+            queued,
+            lambda job: job["status"] not in ("queued", "running"),
+        )
+    async_engine.sync_engine.dispose(close=False)
+
+    assert interrupted["status"] == "interrupted"
+    assert requeued["status"] == "succeeded"
+    assert requeued["worker"] == WORKER_ID
+    assert requeued["pages_persisted"] == 1
@@ -0,0 +1,102 @@
+from src.database.schema import (GeneralisedDescription, GeneralisedWordCount,
+                                 WebScraper)
+from src.scraping.pipeline import next_page_url
+
+PAGE_2 = "/search?updated-max=2024-03-14T10:00:00%2B05:30&max-results=12"
+PAGE_3 = "/search?updated-max=2024-03-13T10:00:00%2B05:30&max-results=12"
+
+
+def test_scrapes_every_page_with_dependent_rows(session, stub_site, scrape_job):
+    job = scrape_job(pages=3)
+
+    assert job["status"] == "succeeded"
+    assert job["pages_fetched"] == job["pages_persisted"] == 3
+    assert job["entries_inserted"] == 5
+    assert session.query(WebScraper).count() == 5
+    assert session.query(GeneralisedDescription).count() == 5
+    assert session.query(GeneralisedWordCount).count() == 5
+    first = session.query(WebScraper).order_by(WebScraper.id).first()
+    assert first.url == f"{stub_site.url}/2024/03/router-flaw-exploited.html"
+    assert first.image == "https://blogger.googleusercontent.com/img/router.png"
+
+
+def test_stops_at_the_last_page(stub_site, scrape_job):
+    job = scrape_job(pages=10)
+
+    assert job["entries_inserted"] == 5
+    assert len(stub_site.requests) == 3
+
+
+def test_retries_transient_failures(stub_site, scrape_job):
+    stub_site.failures["/"] = 2
+
+    job = scrape_job(pages=1)
+
+    assert job["status"] == "succeeded"
+    assert stub_site.requests == ["/", "/", "/"]
+
+
+def test_gives_up_but_keeps_pages_saved_before_the_failure(
+    session, stub_site, scrape_job
+):
+    stub_site.failures[PAGE_2] = 100
+
+    job = scrape_job(pages=3)
+
+    assert job["status"] == "failed"
+    assert job["pages_persisted"] == 1
+    assert "HTTP 503 after" in job["errors"][0]
+    assert session.query(WebScraper).count() == 2
+
+
+def test_rescrape_skips_known_articles_and_unchanged_pages(
+    session, stub_site, scrape_job
+):
+    scrape_job(pages=3)
+
+    stub_site.etags = False
+    changed = scrape_job(pages=3)
+    stub_site.etags = True
+    unchanged = scrape_job(pages=3)
+
+    assert (changed["entries_inserted"], changed["entries_skipped"]) == (0, 5)
+    # Nothing to parse; pagination follows the next links saved earlier
+    assert unchanged["pages_unchanged"] == 3
+    assert unchanged["entries_skipped"] == 0
+    assert len(stub_site.not_modified) == 3
+    assert session.query(WebScraper).count() == 5
+
+
+def test_incremental_scrape_stops_at_a_page_of_known_articles(
+    stub_site, scrape_job
+):
+    scrape_job(pages=1)
+    stub_site.etags = False
+    stub_site.delays[PAGE_2] = 0.5
+    stub_site.requests.clear()
+
+    job = scrape_job(pages=3, incremental=True)
+
+    assert job["status"] == "succeeded"
+    assert job["entries_skipped"] == 2
+    assert PAGE_3 not in stub_site.requests
+
+
+def test_incremental_scrape_stops_at_an_unchanged_page(stub_site, scrape_job):
+    scrape_job(pages=3)
+    stub_site.requests.clear()
+
+    job = scrape_job(pages=3, incremental=True)
+
+    assert job["pages_unchanged"] == 1
+    assert stub_site.requests == ["/"]
+
+
+def test_next_page_url_unescapes_the_pager_link():
+    html = (
+        '<a id="older" class="blog-pager-older-link-mobile" '
+        'href="https://x/search?a=1&amp;b=2">Next</a>'
+    )
+
+    assert next_page_url(html) == "https://x/search?a=1&b=2"
+    assert next_page_url("<a class='home-title'>no pager</a>") is None
@@ -0,0 +1,84 @@
+from src.database.schema import WebScraper
+
+
+def seed_articles(session):
+    session.add_all(
+        [
+            WebScraper(
+                titles="Router flaw exploited",
+                description="Attackers exploit a router vulnerability in the wild.",
+                image="i",
+                url="https://example.com/router",
+            ),
+            WebScraper(
+                titles="Ransomware hits hospitals",
+                description="A ransomware gang targets hospitals; routers unaffected.",
+                image="i",
+                url="https://example.com/ransomware",
+            ),
+            WebScraper(
+                titles="Patch Tuesday",
+                description="Microsoft ships fixes for dozens of bugs.",
+                image="i",
+                url="https://example.com/patch",
+            ),
+        ]
+    )
+    session.commit()
+
+
+def search(client, auth_headers, **params):
+    return client.get("/api/hackernews/search/", params=params, headers=auth_headers)
+
+
+def test_title_matches_rank_above_description_matches(client, session, auth_headers):
+    seed_articles(session)
+
+    response = search(client, auth_headers, keyword="router")
+
+    assert response.status_code == 200
+    assert [link["url"] for link in response.json()["data"]] == [
+        "https://example.com/router",
+        "https://example.com/ransomware",
+    ]
+
+
+def test_every_term_must_match(client, session, auth_headers):
+    seed_articles(session)
+
+    response = search(client, auth_headers, keyword="ransomware hospitals")
+
+    assert [link["url"] for link in response.json()["data"]] == [
+        "https://example.com/ransomware"
+    ]
+
+
+def test_search_pages_with_limit_and_offset(client, session, auth_headers):
+    seed_articles(session)
+
+    response = search(client, auth_headers, keyword="router", limit=1, offset=1)
+
+    assert [link["url"] for link in response.json()["data"]] == [
+        "https://example.com/ransomware"
+    ]
+
+
+def test_search_index_follows_updates_and_deletes(client, session, auth_headers):
+    seed_articles(session)
+    patch = session.query(WebScraper).filter_by(titles="Patch Tuesday").one()
+    patch.description = "Router firmware update released."
+    session.query(WebScraper).filter_by(titles="Router flaw exploited").delete()
+    session.commit()
+
+    response = search(client, auth_headers, keyword="router")
+
+    assert {link["url"] for link in response.json()["data"]} == {
+        "https://example.com/ransomware",
+        "https://example.com/patch",
+    }
+
+
+def test_no_match_is_404(client, session, auth_headers):
+    seed_articles(session)
+
+    assert search(client, auth_headers, keyword="kubernetes").status_code == 404
@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+IMPORT_MAIN = """
+import sys
+import main
+print(sorted(m for m in ("nltk", "httpx", "bs4") if m in sys.modules))
+"""
+
+
+def test_importing_the_app_needs_no_database_and_no_heavy_modules():
+    env = dict(os.environ, DATABASE_URI="postgresql://nobody@127.0.0.1:1/nowhere")
+
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_MAIN], capture_output=True, text=True, env=env
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
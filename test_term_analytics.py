@@ -0,0 +1,92 @@
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from src.auth.token_access import create_access_token
+from src.database.connection import engine
+
+
+def test_top_terms_are_updated_by_each_scrape(client, auth_headers, scrape_job):
+    scrape_job(pages=1)
+    scrape_job(pages=2)
+
+    response = client.get(
+        "/api/hackernews/terms/top", params={"limit": 1}, headers=auth_headers
+    )
+
+    # "router" x2 and "Router" on page 1, "router" again on page 2; the
+    # second scrape must not count page 1 twice
+    assert response.json()["data"] == [{"term": "router", "total_count": 4}]
+
+
+def test_document_frequency_and_timeline(client, auth_headers, scrape_job):
+    scrape_job(pages=2)
+
+    frequency = client.get(
+        "/api/hackernews/terms/Ransomware/document-frequency", headers=auth_headers
+    ).json()["data"]
+    timeline = client.get(
+        "/api/hackernews/terms/router/timeline", headers=auth_headers
+    ).json()["data"]
+
+    assert frequency["document_count"] == 1
+    assert frequency["total_documents"] == 4
+    assert frequency["document_frequency"] == 0.25
+    assert [(day["total_count"], day["document_count"]) for day in timeline] == [
+        (4, 3)
+    ]
+
+
+def test_rebuild_matches_incremental_aggregates(client, auth_headers, scrape_job):
+    scrape_job(pages=3)
+    top = client.get("/api/hackernews/terms/top", headers=auth_headers).json()
+
+    rebuilt = client.post("/api/admin/term-stats/rebuild", headers=auth_headers)
+
+    assert rebuilt.status_code == 200
+    assert client.get("/api/hackernews/terms/top", headers=auth_headers).json() == top
+
+
+def test_rebuild_keeps_the_timeline(client, auth_headers, scrape_job):
+    scrape_job(pages=1)
+    # Page 1 moves to two days ago, and a week ago is only known from the
+    # aggregates, as if its articles predated their scrape date
+    with engine.begin() as connection:
+        for table, column in (
+            ("webscraps", "scraped_on"),
+            ("term_daily_frequencies", "day"),
+            ("corpus_daily_stats", "day"),
+        ):
+            connection.execute(
+                text(f"UPDATE {table} SET {column} = :day"),
+                {"day": date.today() - timedelta(days=2)},
+            )
+        connection.execute(
+            text(
+                "INSERT INTO term_daily_frequencies "
+                "(term, day, total_count, document_count) "
+                "VALUES ('router', :day, 5, 2)"
+            ),
+            {"day": date.today() - timedelta(days=7)},
+        )
+    scrape_job(pages=2)
+    timeline = client.get(
+        "/api/hackernews/terms/router/timeline", headers=auth_headers
+    ).json()["data"]
+
+    rebuilt = client.post("/api/admin/term-stats/rebuild", headers=auth_headers)
+
+    assert rebuilt.status_code == 200
+    assert len(timeline) == 3
+    assert client.get(
+        "/api/hackernews/terms/router/timeline", headers=auth_headers
+    ).json()["data"] == timeline
+
+
+def test_only_admins_can_rebuild(client):
+    not_an_admin = {"token": f"Bearer {create_access_token(2)}"}
+
+    rebuilt = client.post("/api/admin/term-stats/rebuild", headers=not_an_admin)
+
+    assert rebuilt.status_code == 403
+    assert client.post("/api/admin/term-stats/rebuild").status_code == 401
@@ -0,0 +1,60 @@
+import pytest
+from faker import Faker
+from nltk.corpus import stopwords
+from nltk.tokenize import word_tokenize
+
+from src.common.text_processing import (count_words, generalise_description,
+                                        process_descriptions)
+
+EDGE_CASES = [
+    "Attackers exploit router flaw and router vendors ship patch",
+    "The U.S. agency warned: patch now. Attackers cannot wait, they're gonna act.",
+    'He said "update 1,000 routers" (today) -- or else... Really?! Yes.',
+    "Zero-day in e-mail gateway, CVE-2024-1234: 3.88 score; $5 bounty & more.",
+    "Mr. Smith's team 'tis wanna-be hackers\tand\nnew lines. End,",
+    "“Smart quotes” and «guillemets» in a café.",
+    "",
+]
+
+
+def legacy_generalise(description):
+    stop_words = set(stopwords.words("english"))
+    words = word_tokenize(description)
+    return " ".join(word for word in words if word.lower() not in stop_words)
+
+
+def legacy_count(description):
+    ignore_chars = {".", ",", ":", ";", "'", '"', "`"}
+    hmap = {}
+    for word in description.split():
+        if any(char in ignore_chars for char in word):
+            continue
+        hmap[word] = hmap.get(word, 0) + 1
+    return dict(sorted(hmap.items(), key=lambda item: item[1], reverse=True))
+
+
+def descriptions():
+    fake = Faker()
+    Faker.seed(0)
+    return EDGE_CASES + [fake.paragraph(nb_sentences=5) for _ in range(300)]
+
+
+@pytest.mark.parametrize("description", EDGE_CASES)
+def test_matches_the_nltk_helpers_exactly(description):
+    generalised = generalise_description(description)
+
+    assert generalised == legacy_generalise(description)
+    assert list(count_words(generalised).items()) == list(
+        legacy_count(generalised).items()
+    )
+
+
+def test_batch_matches_one_at_a_time_in_and_out_of_process():
+    batch = descriptions()
+    expected = [
+        (legacy_generalise(text), legacy_count(legacy_generalise(text)))
+        for text in batch
+    ]
+
+    assert process_descriptions(batch, workers=0) == expected
+    assert process_descriptions(batch, workers=2) == expected
@@ -0,0 +1,107 @@
+import time
+from datetime import timedelta
+
+import pytest
+
+from src.auth import token_access
+from src.auth.token_access import TokenCache, create_access_token, token_cache
+from src.common.cache import LRUCache
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    calls = []
+    decode = token_access.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(token_access.jwt, "decode", counting_decode)
+    token_cache.clear()
+    return calls
+
+
+def test_repeat_requests_skip_token_decoding(client, decodes):
+    headers = {"token": f"Bearer {create_access_token(7)}"}
+    before = token_cache.stats()
+
+    for _ in range(3):
+        response = client.get("/api/hackernews/articles", headers=headers)
+        assert response.status_code == 200
+
+    assert len(decodes) == 1
+    stats = token_cache.stats()
+    assert stats["hits"] - before["hits"] == 2
+    assert stats["misses"] - before["misses"] == 1
+
+
+def test_rejected_tokens_are_not_cached(client, decodes):
+    expired = create_access_token(7, expires_delta=timedelta(seconds=-1))
+    for token in (expired, "not-a-jwt"):
+        headers = {"token": f"Bearer {token}"}
+        response = client.get("/api/hackernews/articles", headers=headers)
+        assert response.status_code == 401
+    assert token_cache.stats()["size"] == 0
+
+
+def test_entries_never_outlive_the_token():
+    cache = TokenCache(maxsize=10, ttl=300)
+    cache.add("expired", 1, exp=time.time() - 1)
+    cache.add("valid", 2, exp=time.time() + 60)
+
+    assert cache.get("expired") is None
+    assert cache.get("valid") == 2
+    assert cache.stats()["size"] == 1
+
+
+def test_lru_bound_and_expiry():
+    now = [100.0]
+    cache = LRUCache(2, clock=lambda: now[0])
+    cache.set("a", 1, expires_at=110)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    now[0] = 110
+    assert cache.get("a") is None
+    assert cache.get("c") == 3
+    assert cache.stats() == {
+        "size": 1,
+        "maxsize": 2,
+        "hits": 2,
+        "misses": 2,
+        "evictions": 1,
+        "hit_ratio": 0.5,
+    }
+
+
+def test_add_only_fills_missing_or_expired_keys():
+    now = [100.0]
+    cache = LRUCache(2, clock=lambda: now[0])
+
+    assert cache.add("a", 1, expires_at=110)
+    assert not cache.add("a", 2)
+    now[0] = 110
+    assert cache.add("a", 3)
+    assert cache.get("a") == 3
+
+
+def test_invalidation(client, auth_headers):
+    cache = TokenCache(maxsize=10)
+    for token, user_id in (("t1", 1), ("t2", 1), ("t3", 2)):
+        cache.add(token, user_id)
+    cache.invalidate("t3")
+    assert cache.invalidate_user(1) == 2
+    assert cache.stats()["size"] == 0
+
+    token = create_access_token(8)
+    headers = {"token": f"Bearer {token}"}
+    response = client.get("/api/hackernews/articles", headers=headers)
+    assert response.status_code == 200
+    response = client.delete(
+        "/api/admin/token-cache", params={"user_id": 8}, headers=auth_headers
+    )
+    assert response.json()["data"] == {"dropped": 1}
+    assert token_cache.get(token) is None
@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+from src.auth.token_access import create_access_token
+from src.common.cache import RedisBackend
+from src.database.schema import User
+from src.database.user_cache import UserCache, user_cache
+
+
+@pytest.fixture
+def alice(session):
+    user = User(
+        name="alice", email="alice@example.com", phone_number="+15550001", password="x"
+    )
+    session.add(user)
+    session.commit()
+    return user.id, {"token": f"Bearer {create_access_token(user.id)}"}
+
+
+@pytest.fixture
+def user_queries(record_statements):
+    return record_statements(lambda statement: "FROM users" in statement)
+
+
+def profile(client, headers, user_id=None):
+    path = "/api/users/get-me" if user_id is None else f"/api/users/{user_id}"
+    return client.get(path, headers=headers)
+
+
+def test_profile_reads_hit_the_database_once(
+    client, alice, auth_headers, user_queries
+):
+    user_id, headers = alice
+    for _ in range(3):
+        assert profile(client, headers).status_code == 200
+        assert profile(client, headers, user_id).status_code == 200
+
+    assert len(user_queries) == 1
+    stats = client.get("/api/admin/user-cache", headers=auth_headers).json()["data"]
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (5, 1, 5 / 6)
+    assert stats["hit_ms"] is not None and stats["miss_ms"] is not None
+
+
+def test_update_invalidates_the_profile(client, alice):
+    user_id, headers = alice
+    assert profile(client, headers).status_code == 200
+
+    response = client.put(
+        f"/api/users/{user_id}", json={"email": "new@example.com"}, headers=headers
+    )
+    assert response.status_code == 200
+
+    assert profile(client, headers).json()["data"][0]["email"] == "new@example.com"
+    assert profile(client, headers, user_id).json()["data"][0]["email"] == (
+        "new@example.com"
+    )
+
+
+def test_delete_invalidates_the_profile(client, alice):
+    user_id, headers = alice
+    assert profile(client, headers, user_id).status_code == 200
+
+    assert client.delete(f"/api/users/{user_id}", headers=headers).status_code == 200
+
+    assert profile(client, headers, user_id).status_code == 404
+    assert profile(client, headers).status_code == 404
+
+
+def test_redis_backend(client, alice, redis_stand_in, monkeypatch, user_queries):
+    monkeypatch.setattr(user_cache, "backend", RedisBackend(redis_stand_in.url, 60))
+    user_id, headers = alice
+
+    assert profile(client, headers).status_code == 200
+    assert profile(client, headers, user_id).status_code == 200
+    assert len(user_queries) == 1
+    assert f"user:{user_id}".encode() in redis_stand_in.data
+
+    client.put(f"/api/users/{user_id}", json={"name": "alicia"}, headers=headers)
+    assert redis_stand_in.data[f"user:{user_id}".encode()][0] == b""  # tombstone
+    assert profile(client, headers).json()["data"][0]["user_name"] == "alicia"
+    assert redis_stand_in.commands[:2] == ["SELECT", "GET"]
+
+
+def test_a_read_racing_another_workers_write_cannot_cache_the_old_row(
+    redis_stand_in,
+):
+    # Two workers, each with its own connection to the shared backend
+    reader = UserCache(RedisBackend(redis_stand_in.url, 60))
+    writer = UserCache(RedisBackend(redis_stand_in.url, 60))
+
+    class ReadBeforeTheWrite:
+        async def get(self, model, user_id):
+            old_row = User(name="alice", email="old@example.com")
+            # The writer commits and invalidates while the old row is in flight
+            await writer.invalidate(user_id)
+            return old_row
+
+    async def race():
+        profile = await reader.profile(ReadBeforeTheWrite(), 1)
+        cached = await reader.backend.get(UserCache.key(1))
+        await reader.close()
+        await writer.close()
+        return profile, cached
+
+    profile, cached = asyncio.run(race())
+    assert profile["email"] == "old@example.com"
+    assert cached == b""  # still the tombstone, so the next read loads the new row
+
+
+def test_a_cancelled_command_does_not_leave_its_reply_behind(redis_stand_in):
+    redis_stand_in.data[b"user:1"] = (b"alice", None)
+    redis_stand_in.data[b"user:2"] = (b"bob", None)
+    backend = RedisBackend(redis_stand_in.url, 60)
+
+    async def cancel_mid_reply():
+        await backend.get("user:1")  # connects
+        redis_stand_in.reply_delay = 0.2
+        lookup = asyncio.create_task(backend.get("user:1"))
+        await asyncio.sleep(0.05)  # sent, reply not yet read
+        lookup.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await lookup
+        redis_stand_in.reply_delay = 0.0
+        value = await backend.get("user:2")
+        await backend.close()
+        return value
+
+    assert asyncio.run(cancel_mid_reply()) == b"bob"
+
+
+def test_unreachable_backend_falls_back_to_the_database(
+    client, alice, redis_stand_in, monkeypatch
+):
+    url = redis_stand_in.url
+    redis_stand_in.server.shutdown()
+    redis_stand_in.server.server_close()
+    monkeypatch.setattr(user_cache, "backend", RedisBackend(url, 60, timeout=0.2))
+    errors = user_cache.errors
+    _, headers = alice
+
+    assert profile(client, headers).status_code == 200
+    assert user_cache.errors > errors
@@ -0,0 +1,205 @@
+import json
+
+from sqlalchemy import event
+
+from src.auth.token_access import create_access_token
+from src.common import record_stream
+from src.database import user_import
+from src.database.connection import async_engine
+from src.database.schema import User
+
+ALICE = {
+    "name": "alice",
+    "email": "alice@example.com",
+    "phone_number": "+15550001",
+    "password": "correct horse",
+}
+
+
+def verbs(statements):
+    return [statement.split()[0].upper() for statement in statements]
+
+
+def upload(client, auth_headers, body: bytes, content_type: str, chunk_size=7):
+    # Sent in small chunks so records straddle chunk boundaries
+    chunks = (body[i : i + chunk_size] for i in range(0, len(body), chunk_size))
+    return client.post(
+        "/api/users/import",
+        content=chunks,
+        headers={**auth_headers, "Content-Type": content_type},
+    )
+
+
+def user(n, **overrides):
+    return {
+        "name": f"user{n}",
+        "email": f"user{n}@example.com",
+        "phone_number": f"+1555100{n}",
+        "password": f"secret{n}",
+        **overrides,
+    }
+
+
+def test_jsonl_import_reports_every_row(client, session, auth_headers):
+    assert client.post("/api/users/signup", json=ALICE).status_code == 201
+    lines = [
+        json.dumps(user(1)),
+        json.dumps(user(2, phone_number=None)),
+        "{not json",
+        json.dumps(user(3, email="not-an-email")),
+        "",
+        json.dumps(user(4, email="user1@example.com")),
+        json.dumps(user(5, phone_number=ALICE["phone_number"])),
+        json.dumps(user(6)),
+    ]
+    body = "\n".join(lines).encode()
+
+    response = upload(client, auth_headers, body, "application/x-ndjson")
+
+    assert response.status_code == 200
+    report = response.json()["data"]
+    assert (report["created"], report["conflict"], report["invalid"]) == (3, 2, 2)
+    outcomes = [(row["row"], row["status"], row.get("error")) for row in report["rows"]]
+    assert outcomes[0][:2] == (1, "created") and outcomes[1][:2] == (2, "created")
+    assert outcomes[2][:2] == (3, "invalid")
+    assert outcomes[2][2].startswith("invalid JSON")
+    assert outcomes[3] == (4, "invalid", "email: value is not a valid email address")
+    assert outcomes[4] == (6, "conflict", "email repeats row 1")
+    assert outcomes[5] == (7, "conflict", "phone_number already registered")
+    assert outcomes[6][:2] == (8, "created")
+
+    created = session.query(User).filter(User.name.like("user%")).all()
+    assert sorted(u.name for u in created) == ["user1", "user2", "user6"]
+    assert all(u.password.startswith("$2b$04$") for u in created)
+    assert {row["id"] for row in report["rows"] if "id" in row} == {
+        u.id for u in created
+    }
+
+
+def test_csv_import(client, session, auth_headers):
+    body = (
+        b"name,email,phone_number,password\r\n"
+        b'"Smith, Jo",jo@example.com,,"multi\nline"\r\n'
+        b"short,row\r\n"
+        b"ann,ann@example.com,+15550009,pw\r\n"
+    )
+
+    response = upload(client, auth_headers, body, "text/csv; charset=utf-8")
+    report = response.json()["data"]
+
+    assert [(row["row"], row["status"]) for row in report["rows"]] == [
+        (2, "created"),
+        (4, "invalid"),
+        (5, "created"),
+    ]
+    jo = session.query(User).filter_by(email="jo@example.com").one()
+    assert (jo.name, jo.phone_number) == ("Smith, Jo", None)
+    signin = client.post(
+        "/api/users/signin", json={"email": "jo@example.com", "password": "multi\nline"}
+    )
+    assert signin.status_code == 200
+
+
+def test_overlong_lines_are_invalid_rows(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(record_stream, "USER_IMPORT_MAX_LINE_BYTES", 200)
+    lines = [json.dumps(user(1)), json.dumps(user(2, name="x" * 200))]
+    jsonl = "\n".join([*lines, json.dumps(user(3))]).encode()
+    csv_body = (
+        "name,email,phone_number,password\n"
+        f"user4,user4@example.com,+15551004,{'x' * 200}\n"
+        "user5,user5@example.com,+15551005,secret5\n"
+    ).encode()
+
+    reports = [
+        upload(client, auth_headers, jsonl, "application/x-ndjson").json()["data"],
+        upload(client, auth_headers, csv_body, "text/csv").json()["data"],
+    ]
+
+    assert [(row["row"], row["status"]) for row in reports[0]["rows"]] == [
+        (1, "created"),
+        (2, "invalid"),
+        (3, "created"),
+    ]
+    assert reports[0]["rows"][1]["error"] == "line longer than 200 bytes"
+    assert [(row["row"], row["status"]) for row in reports[1]["rows"]] == [
+        (2, "invalid"),
+        (3, "created"),
+    ]
+
+
+def test_each_batch_is_one_conflict_query_and_one_insert(
+    client, auth_headers, record_statements, monkeypatch
+):
+    monkeypatch.setattr(user_import, "USER_IMPORT_BATCH_SIZE", 3)
+    body = "\n".join(json.dumps(user(n)) for n in range(7)).encode()
+    statements = record_statements()
+
+    report = upload(client, auth_headers, body, "application/x-ndjson").json()["data"]
+
+    assert report["created"] == 7
+    assert verbs(statements) == ["SELECT", "INSERT"] * 3
+
+
+def test_passwords_are_hashed_outside_a_transaction(
+    client, auth_headers, record_statements, monkeypatch
+):
+    statements = record_statements()
+    hash_passwords = user_import.hash_passwords
+
+    async def recorded_hashing(passwords):
+        statements.append("HASH")
+        return await hash_passwords(passwords)
+
+    def record_commit(connection):
+        statements.append("COMMIT")
+
+    monkeypatch.setattr(user_import, "hash_passwords", recorded_hashing)
+    event.listen(async_engine.sync_engine, "commit", record_commit)
+    try:
+        upload(client, auth_headers, json.dumps(user(1)).encode(), "application/jsonl")
+    finally:
+        event.remove(async_engine.sync_engine, "commit", record_commit)
+
+    assert verbs(statements) == ["SELECT", "COMMIT", "HASH", "INSERT", "COMMIT"]
+
+
+def test_unsupported_upload_type(client, auth_headers):
+    response = upload(client, auth_headers, b"{}", "application/json")
+    assert response.status_code == 415
+
+
+def test_signup_relies_on_unique_indexes(client, record_statements):
+    statements = record_statements()
+    assert client.post("/api/users/signup", json=ALICE).status_code == 201
+    assert verbs(statements) == ["INSERT"]
+
+    same_email = client.post("/api/users/signup", json=dict(ALICE, phone_number="+1"))
+    same_phone = client.post(
+        "/api/users/signup", json=dict(ALICE, email="other@example.com")
+    )
+    assert same_email.status_code == same_phone.status_code == 409
+    assert same_email.json()["detail"] == "User with this email already exists"
+    assert same_phone.json()["detail"] == "User with this phone number already exists"
+
+
+def test_updates_relying_on_unique_indexes_conflict(client, session):
+    bob = dict(ALICE, email="bob@example.com", phone_number="+15550002")
+    for user in (ALICE, bob):
+        assert client.post("/api/users/signup", json=user).status_code == 201
+    bob_id = session.query(User.id).filter_by(email=bob["email"]).scalar()
+    headers = {"token": f"Bearer {create_access_token(bob_id)}"}
+
+    same_email = client.put(
+        f"/api/users/{bob_id}", json={"email": ALICE["email"]}, headers=headers
+    )
+    same_phone = client.put(
+        f"/api/users/{bob_id}",
+        json={"phone_number": ALICE["phone_number"]},
+        headers=headers,
+    )
+    assert same_email.status_code == same_phone.status_code == 409
+    assert same_email.json()["detail"] == "User with this email already exists"
+    assert same_phone.json()["detail"] == "User with this phone number already exists"
+    assert client.get(f"/api/users/{bob_id}", headers=headers).json()["data"] == [
+        {"user_name": "alice", "email": bob["email"], "phone_number": "+15550002"}
+    ]